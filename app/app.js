@@ -42,6 +42,9 @@ const promptPrefix = "model/prompts/";
 const modelPrefix = "model/models/";
 const srtPrefix   = "model/transcribe/";
 const mdPrefix    = "model/resumo/";
+// Mantidos pelas Lambdas (pipeline_manifest.py): catálogo de todos os vídeos e manifesto por vídeo
+const manifestPrefix = "model/manifest/";
+const catalogKey  = "model/catalog.json";
 
 const srtListDiv = document.getElementById("srtList");
 const mdListDiv  = document.getElementById("mdList");
@@ -58,6 +61,29 @@ const modelSelect     = document.getElementById("modelSelect");
 let currentSelected = null;
 let availableModels = [];
 
+const ALL_MODELS_VALUE = "__all__";
+
+const MODEL_OPTIONAL_KEYS = [
+  "chunkThresholdTokens", "chunkTokens", "chunkOverlapTokens", "chunkConcurrency",
+  "maxTokens", "stream", "promptCache", "fallback"
+];
+
+// Config do modelo enviada para model/models/{base}.json (id, temperature, topP, topK + opcionais)
+function buildModelBody(modelConfig) {
+  const modelBody = {
+    id: modelConfig.id,
+    temperature: modelConfig.temperature ?? 0.3,
+    topP: modelConfig.topP ?? 0.9,
+    topK: modelConfig.topK ?? 0
+  };
+  // Opcionais aceitos pela Lambda (_parse_model_config em lambda_bedrock_summary.py): modo chunked
+  // (map-reduce), limite de saída, streaming, prompt caching e cadeia de fallback
+  MODEL_OPTIONAL_KEYS.forEach(k => {
+    if (modelConfig[k] !== undefined && modelConfig[k] !== null) modelBody[k] = modelConfig[k];
+  });
+  return modelBody;
+}
+
 // Carregar modelos do JSON
 async function loadModels() {
   try {
@@ -82,6 +108,15 @@ async function loadModels() {
       modelSelect.appendChild(option);
     });
     
+    // Fan-out: um único upload/evento resume a transcrição com todos os modelos
+    if (availableModels.length > 1) {
+      const option = document.createElement("option");
+      option.value = ALL_MODELS_VALUE;
+      option.textContent = "Todos os modelos (comparar)";
+      option.title = "Gera um resumo por modelo a partir da mesma transcrição";
+      modelSelect.appendChild(option);
+    }
+    
     // Selecionar o primeiro modelo por padrão
     if (availableModels.length > 0) {
       modelSelect.value = availableModels[0].id;
@@ -303,18 +338,26 @@ uploadBtn.addEventListener("click", async () => {
     try {
       const videoHead = await s3.headObject({ Bucket: config.videoBucket, Key: videoKey }).promise();
       videoExisted = true;
-      try {
-        await s3.headObject({ Bucket: config.videoBucket, Key: canonicalSrtKey }).promise();
-        const etagKey = srtPrefix + baseName + ".video-etag";
-        let storedEtag = "";
+      const currentEtag = (videoHead.ETag || "").replace(/"/g, "");
+      // Manifesto do vídeo (um GET) registra a legenda canônica e o ETag do vídeo transcrito.
+      // Manifesto sem video_etag (ex.: semeado pelo backfill) cai no .video-etag, como sem manifesto
+      const manifest = await getJsonObject(manifestPrefix + baseName + ".json");
+      const transcript = manifest && manifest.transcript;
+      if (transcript && transcript.srt_key === canonicalSrtKey && transcript.video_etag) {
+        subtitleValid = Boolean(currentEtag && transcript.video_etag === currentEtag);
+      } else {
         try {
-          const etagObj = await s3.getObject({ Bucket: config.videoBucket, Key: etagKey }).promise();
-          storedEtag = (etagObj.Body && etagObj.Body.toString()) ? etagObj.Body.toString().trim() : "";
-        } catch (_) {}
-        const currentEtag = (videoHead.ETag || "").replace(/"/g, "");
-        subtitleValid = storedEtag && currentEtag && storedEtag === currentEtag;
-      } catch (e) {
-        if (e.code !== "NotFound" && e.code !== "NoSuchKey") throw e;
+          await s3.headObject({ Bucket: config.videoBucket, Key: canonicalSrtKey }).promise();
+          const etagKey = srtPrefix + baseName + ".video-etag";
+          let storedEtag = "";
+          try {
+            const etagObj = await s3.getObject({ Bucket: config.videoBucket, Key: etagKey }).promise();
+            storedEtag = (etagObj.Body && etagObj.Body.toString()) ? etagObj.Body.toString().trim() : "";
+          } catch (_) {}
+          subtitleValid = storedEtag && currentEtag && storedEtag === currentEtag;
+        } catch (e) {
+          if (e.code !== "NotFound" && e.code !== "NoSuchKey") throw e;
+        }
       }
     } catch (e) {
       if (e.code !== "NotFound" && e.code !== "NoSuchKey") throw e;
@@ -350,23 +393,24 @@ uploadBtn.addEventListener("click", async () => {
       await s3.upload(promptParams).promise();
     }
     
-    // Upload da config do modelo (id, temperature, topP, topK)
-    const modelConfig = availableModels.find(m => m.id === selectedModel) || {
-      id: selectedModel,
-      temperature: 0.3,
-      topP: 0.9,
-      topK: 0
-    };
+    // Upload da config do modelo (id, temperature, topP, topK) ou lista de modelos (fan-out)
     const modelKey = modelPrefix + baseName + ".json";
+    let modelBody;
+    if (selectedModel === ALL_MODELS_VALUE) {
+      modelBody = { models: availableModels.map(buildModelBody) };
+    } else {
+      const modelConfig = availableModels.find(m => m.id === selectedModel) || {
+        id: selectedModel,
+        temperature: 0.3,
+        topP: 0.9,
+        topK: 0
+      };
+      modelBody = buildModelBody(modelConfig);
+    }
     const modelParams = {
       Bucket: config.videoBucket,
       Key: modelKey,
-      Body: JSON.stringify({
-        id: modelConfig.id,
-        temperature: modelConfig.temperature ?? 0.3,
-        topP: modelConfig.topP ?? 0.9,
-        topK: modelConfig.topK ?? 0
-      }),
+      Body: JSON.stringify(modelBody),
       ContentType: "application/json"
     };
     
@@ -400,7 +444,7 @@ uploadBtn.addEventListener("click", async () => {
 
     // Mensagem de sucesso
     if (skipTranscribe) {
-      uploadStatus.innerText = "✅ Vídeo e legenda já existiam. Resumo sendo gerado com o modelo selecionado. Aguarde alguns minutos.";
+      uploadStatus.innerText = "✅ Vídeo e legenda já existiam. Resumo sendo gerado com o(s) modelo(s) selecionado(s). Aguarde alguns minutos.";
     } else if (videoExisted) {
       uploadStatus.innerText = "✅ Vídeo já existia. Transcrição e resumo sendo gerados. Aguarde alguns minutos.";
     } else if (promptFile) {
@@ -445,20 +489,46 @@ uploadBtn.addEventListener("click", async () => {
   }
 });
 
-async function loadFileList(prefix, ext, container) {
-  const result = await s3.listObjectsV2({ Bucket: config.videoBucket, Prefix: prefix }).promise();
+// JSON do bucket ou null (inexistente, sem permissão ou inválido)
+async function getJsonObject(key) {
+  try {
+    const data = await s3.getObject({ Bucket: config.videoBucket, Key: key }).promise();
+    return JSON.parse(data.Body.toString());
+  } catch (_) {
+    return null;
+  }
+}
+
+function renderFileList(keys, type, container) {
   container.innerHTML = "";
-  (result.Contents || [])
-    .filter(obj => obj.Key?.toLowerCase().endsWith(ext))
-    .forEach(obj => container.appendChild(createFileItem(obj.Key, config.videoBucket, ext === ".srt" ? "srt" : "md")));
+  keys.forEach(key => container.appendChild(createFileItem(key, config.videoBucket, type)));
 }
 
-async function loadSRTFiles() {
-  await loadFileList(srtPrefix, ".srt", srtListDiv);
+// Keys do catálogo: legendas, resumos e parciais em streaming (.partial.md) registrados pelas Lambdas
+function catalogKeys(catalog) {
+  const entries = Object.keys(catalog.videos).sort().map(base => catalog.videos[base]);
+  return {
+    srt: entries.filter(v => v.srt_key).map(v => v.srt_key),
+    md: entries.flatMap(v => [...Object.values(v.summaries || {}), ...Object.values(v.partials || {})])
+  };
 }
 
-async function loadMDFiles() {
-  await loadFileList(mdPrefix, ".md", mdListDiv);
+// Keys de um prefixo com a extensão (listagem paginada)
+async function listKeys(prefix, ext) {
+  const keys = [];
+  let token;
+  do {
+    const result = await s3.listObjectsV2({ Bucket: config.videoBucket, Prefix: prefix, ContinuationToken: token }).promise();
+    (result.Contents || []).forEach(obj => {
+      if (obj.Key?.toLowerCase().endsWith(ext)) keys.push(obj.Key);
+    });
+    token = result.IsTruncated ? result.NextContinuationToken : undefined;
+  } while (token);
+  return keys;
+}
+
+function mergeKeys(...lists) {
+  return [...new Set(lists.flat())].sort();
 }
 
 function createFileItem(key, bucket, type) {
@@ -471,6 +541,11 @@ function createFileItem(key, bucket, type) {
   const label = document.createElement("span");
   label.className = "file-item-label";
   label.textContent = key.split("/").pop();
+  // Resumo parcial (streaming): substituído pelo .md definitivo quando o modelo terminar
+  if (key.toLowerCase().endsWith(".partial.md")) {
+    label.textContent += " (gerando…)";
+    el.classList.add("file-item-partial");
+  }
 
   const deleteBtn = document.createElement("button");
   deleteBtn.className = "file-item-delete";
@@ -669,6 +744,9 @@ async function loadFilePreview(key, type) {
       if (codeBlock) {
         hljs.highlightElement(codeBlock);
       }
+      if (type === "srt") {
+        attachTranscriptSearch(key, text);
+      }
     }
   } catch (err) {
     console.error(err);
@@ -676,6 +754,88 @@ async function loadFilePreview(key, type) {
   }
 }
 
+// Busca na transcrição pelo índice {base}.search.json (search_index.py): termos sem acento,
+// todos presentes na legenda (AND), último termo por prefixo. Resultado: instantes da palestra
+function foldSearchText(str) {
+  return str.toLowerCase().normalize("NFD").replace(/[\u0300-\u036f]/g, "");
+}
+
+function deltaDecode(values) {
+  let total = 0;
+  return values.map(value => (total += value));
+}
+
+function searchTranscriptIndex(index, query) {
+  const stopwords = new Set(index.stopwords || []);
+  const terms = (foldSearchText(query).match(/[a-z0-9]+/g) || [])
+    .filter(term => term.length >= 2 && !stopwords.has(term));
+  if (!terms.length) return [];
+  let matched = null;
+  terms.forEach((term, position) => {
+    if (matched && !matched.size) return;
+    const keys = position === terms.length - 1
+      ? Object.keys(index.terms).filter(key => key.startsWith(term))
+      : (index.terms[term] ? [term] : []);
+    const ordinals = new Set();
+    keys.forEach(key => deltaDecode(index.terms[key]).forEach(ordinal => ordinals.add(ordinal)));
+    matched = matched ? new Set([...matched].filter(ordinal => ordinals.has(ordinal))) : ordinals;
+  });
+  const starts = index.decodedStarts || (index.decodedStarts = deltaDecode(index.starts));
+  return [...matched].sort((a, b) => a - b).map(ordinal => starts[ordinal]);
+}
+
+function formatTimestamp(ms, srtFormat) {
+  const pad = (n, size = 2) => String(n).padStart(size, "0");
+  const h = Math.floor(ms / 3600000), m = Math.floor(ms / 60000) % 60, s = Math.floor(ms / 1000) % 60;
+  if (srtFormat) return `${pad(h)}:${pad(m)}:${pad(s)},${pad(ms % 1000, 3)}`;
+  return h ? `${h}:${pad(m)}:${pad(s)}` : `${m}:${pad(s)}`;
+}
+
+function attachTranscriptSearch(srtKey, srtText) {
+  const MAX_RESULTS = 100;
+  const box = document.createElement("div");
+  box.className = "transcript-search";
+  box.innerHTML = '<input type="search" placeholder="Buscar na transcrição..." aria-label="Buscar na transcrição" /><div class="transcript-search-results"></div>';
+  previewContent.prepend(box);
+  const input = box.querySelector("input");
+  const results = box.querySelector(".transcript-search-results");
+  const pre = previewContent.querySelector("pre");
+  let indexPromise = null;
+
+  input.addEventListener("input", async () => {
+    indexPromise = indexPromise || getJsonObject(srtKey.replace(/\.srt$/i, ".search.json"));
+    const index = await indexPromise;
+    results.innerHTML = "";
+    if (!input.value.trim()) return;
+    if (!index || !index.terms) {
+      results.textContent = "Índice de busca indisponível para esta transcrição.";
+      return;
+    }
+    const starts = searchTranscriptIndex(index, input.value);
+    if (!starts.length) {
+      results.textContent = "Nenhuma ocorrência.";
+      return;
+    }
+    starts.slice(0, MAX_RESULTS).forEach(start => {
+      const btn = document.createElement("button");
+      btn.className = "transcript-search-hit";
+      btn.textContent = formatTimestamp(start, false);
+      btn.addEventListener("click", () => {
+        // Rola o preview até a linha de tempo da legenda
+        const offset = srtText.indexOf(formatTimestamp(start, true) + " -->");
+        if (offset < 0 || !pre) return;
+        const line = srtText.slice(0, offset).split("\n").length - 1;
+        const lineHeight = parseFloat(getComputedStyle(pre).lineHeight) || 18;
+        previewContent.scrollTop = pre.offsetTop + line * lineHeight - lineHeight;
+      });
+      results.appendChild(btn);
+    });
+    if (starts.length > MAX_RESULTS) {
+      results.appendChild(document.createTextNode(` +${starts.length - MAX_RESULTS}`));
+    }
+  });
+}
+
 function escapeHtml(str) {
   return str
     .replace(/&/g, "&amp;")
@@ -708,8 +868,19 @@ downloadBtn.addEventListener("click", async () => {
   }
 });
 
+// Catálogo completo (acervo anterior já semeado): um GET. Sem catálogo ou ainda não semeado, une o
+// catálogo com a listagem dos prefixos para não esconder legendas e resumos anteriores a ele
 async function loadAllLists() {
-  await Promise.all([loadSRTFiles(), loadMDFiles()]);
+  const catalog = await getJsonObject(catalogKey);
+  const fromCatalog = catalog && catalog.videos ? catalogKeys(catalog) : { srt: [], md: [] };
+  if (catalog && catalog.complete) {
+    renderFileList(fromCatalog.srt, "srt", srtListDiv);
+    renderFileList(fromCatalog.md, "md", mdListDiv);
+    return;
+  }
+  const [srtListed, mdListed] = await Promise.all([listKeys(srtPrefix, ".srt"), listKeys(mdPrefix, ".md")]);
+  renderFileList(mergeKeys(fromCatalog.srt, srtListed), "srt", srtListDiv);
+  renderFileList(mergeKeys(fromCatalog.md, mdListed), "md", mdListDiv);
 }
 
   refreshBtn.addEventListener("click", loadAllLists);
@@ -0,0 +1,115 @@
+"""
+Benchmark de cold start das duas Lambdas: clients AWS criados no import (LAZY_AWS_CLIENTS=0,
+comportamento anterior) versus sob demanda (LAZY_AWS_CLIENTS=1, padrão).
+
+Cada amostra roda num interpretador novo (como um container novo da Lambda) e mede:
+- import_ms: import do módulo da Lambda
+- ignored_event_ms: primeira invocação com evento ignorado (key com outra extensão)
+- clients_after_ignored: clients AWS criados até aqui (deve ser vazio no modo lazy)
+- first_client_ms: import do boto3 + criação do primeiro client (custo que o modo lazy adia)
+- all_clients_ms: criação de todos os clients do módulo
+
+Nenhuma chamada de rede é feita (criar um client não chama a AWS). Uso (na raiz do repositório):
+
+    python benchmark/bench_cold_start.py
+    python benchmark/bench_cold_start.py --samples 20 --json /tmp/cold_start.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(ROOT_DIR, "terraform", "lambda")
+
+LAMBDAS = {
+    "transcribe": ("lambda_function", "model/video/notas.txt"),
+    "summary": ("lambda_bedrock_summary", "model/transcribe/notas.txt"),
+}
+
+_PROBE = r"""
+import contextlib, io, json, sys, time
+started = time.perf_counter()
+import {module} as handler_module
+imported = time.perf_counter()
+import aws_clients
+event = {{"detail": {{"bucket": {{"name": "bucket"}}, "object": {{"key": "{ignored_key}"}}}}}}
+with contextlib.redirect_stdout(io.StringIO()):
+    handler_module.lambda_handler(event, None)
+ignored = time.perf_counter()
+clients_after_ignored = aws_clients.initialized_clients()
+clients = list(aws_clients._CLIENTS)
+clients[0].get()
+first_client = time.perf_counter()
+for client in clients[1:]:
+    client.get()
+done = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "ignored_event_ms": (ignored - imported) * 1000,
+    "clients_after_ignored": clients_after_ignored,
+    "first_client_ms": (first_client - ignored) * 1000,
+    "all_clients_ms": (done - ignored) * 1000,
+}}))
+"""
+
+
+def _sample(module: str, ignored_key: str, lazy: bool) -> dict:
+    env = {
+        **os.environ,
+        "LAZY_AWS_CLIENTS": "1" if lazy else "0",
+        "AWS_DEFAULT_REGION": os.environ.get("AWS_DEFAULT_REGION", "us-east-2"),
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, ignored_key=ignored_key)],
+        cwd=LAMBDA_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(samples: int = 10) -> list:
+    results = []
+    for name, (module, ignored_key) in LAMBDAS.items():
+        for lazy in (False, True):
+            runs = [_sample(module, ignored_key, lazy) for _ in range(samples)]
+            result = {"lambda": name, "mode": "lazy" if lazy else "eager", "samples": samples}
+            for metric in ("import_ms", "ignored_event_ms", "first_client_ms", "all_clients_ms"):
+                result[metric] = round(statistics.median(r[metric] for r in runs), 1)
+            result["cold_start_ignored_ms"] = round(result["import_ms"] + result["ignored_event_ms"], 1)
+            result["clients_after_ignored"] = runs[0]["clients_after_ignored"]
+            results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=10, help="interpretadores novos por modo (mediana)")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = run(args.samples)
+    print(
+        f"{'lambda':<11} {'modo':<6} {'import ms':>10} {'ignorado ms':>12} {'cold ignorado':>14} "
+        f"{'1º client ms':>13} {'todos ms':>9}  clients após evento ignorado"
+    )
+    for r in results:
+        print(
+            f"{r['lambda']:<11} {r['mode']:<6} {r['import_ms']:>10.1f} {r['ignored_event_ms']:>12.1f} "
+            f"{r['cold_start_ignored_ms']:>14.1f} {r['first_client_ms']:>13.1f} {r['all_clients_ms']:>9.1f}  "
+            f"{', '.join(r['clients_after_ignored']) or '-'}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
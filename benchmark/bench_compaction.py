@@ -0,0 +1,70 @@
+"""
+Benchmark da compactação da transcrição (compact_transcript) em SRTs sintéticos de tamanho real.
+
+Mostra, por duração de vídeo, caracteres e tokens estimados antes/depois, redução percentual e
+tempo de processamento. Uso (na raiz do repositório):
+
+    python benchmark/bench_compaction.py
+    python benchmark/bench_compaction.py --minutes 60 480 --json /tmp/compaction.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+# Os clients AWS só são criados no primeiro uso (aws_clients.py); não há chamadas AWS neste benchmark
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+
+import lambda_bedrock_summary as summary
+import srt_parser
+from synthetic import generate_srt
+
+
+def run(minutes_list: list) -> list:
+    results = []
+    for minutes in minutes_list:
+        srt_text = generate_srt(minutes)
+        plain_text = srt_parser.extract_plain_text_from_srt(srt_text)
+        start = time.perf_counter()
+        compacted = summary.compact_transcript(plain_text)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        before_tokens = summary.estimate_tokens(plain_text)
+        after_tokens = summary.estimate_tokens(compacted)
+        results.append({
+            "minutes": minutes,
+            "srt_bytes": len(srt_text.encode("utf-8")),
+            "chars_before": len(plain_text),
+            "chars_after": len(compacted),
+            "tokens_before": before_tokens,
+            "tokens_after": after_tokens,
+            "reduction_pct": round(100.0 * (1 - after_tokens / before_tokens), 1),
+            "compaction_ms": round(elapsed_ms, 1),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[60, 180, 480], help="durações (minutos) dos SRTs sintéticos")
+    parser.add_argument("--json", help="grava os resultados em JSON neste caminho")
+    args = parser.parse_args()
+
+    results = run(args.minutes)
+    print(f"{'min':>6} {'chars antes':>12} {'chars depois':>13} {'tokens antes':>13} {'tokens depois':>14} {'redução':>8} {'tempo ms':>9}")
+    for r in results:
+        print(
+            f"{r['minutes']:>6g} {r['chars_before']:>12} {r['chars_after']:>13} {r['tokens_before']:>13} "
+            f"{r['tokens_after']:>14} {r['reduction_pct']:>7}% {r['compaction_ms']:>9}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+Benchmark ponta a ponta dos dois lambda_handler com clients AWS em memória (fake_aws.py).
+
+Cada cenário monta o estado do bucket/Transcribe/SQS, roda o handler com o evento real do
+EventBridge e mede tempo de parede (mediana e mínimo de --repeat execuções), pico de memória alocada
+(tracemalloc, execução separada) e as chamadas AWS feitas pelo evento, por operação.
+Os logs dos handlers são descartados. Uso (na raiz do repositório):
+
+    python benchmark/bench_handlers.py
+    python benchmark/bench_handlers.py --minutes 10 480 --repeat 5 --json /tmp/handlers.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+
+BUCKET = "meetup-benchmark"
+# Mesmo ambiente que o Terraform configura nas Lambdas (ver terraform/main.tf)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+os.environ.setdefault("TRANSCRIBE_OUTPUT_BUCKET", BUCKET)
+os.environ.setdefault("TRANSCRIBE_OUTPUT_PREFIX", "model/transcribe/")
+os.environ.setdefault("SUMMARY_OUTPUT_BUCKET", BUCKET)
+os.environ.setdefault("SUMMARY_OUTPUT_PREFIX", "model/resumo/")
+os.environ.setdefault("MODEL_PREFIX", "model/")
+# Token bucket do Bedrock não deve limitar execuções repetidas do benchmark
+os.environ.setdefault("BEDROCK_RATE_PER_SECOND", "1000000")
+os.environ.setdefault("BEDROCK_BURST", "1000000")
+
+import lambda_bedrock_summary as summary
+import lambda_function as transcribe
+from fake_aws import FakeAws, FakeLambdaContext, s3_object_created_event
+from synthetic import generate_srt
+
+DEFAULT_MINUTES = [10, 60, 480]
+VIDEO_BASE = "CommunityDayCPS"
+VIDEO_KEY = f"model/video/{VIDEO_BASE}.mp4"
+TRANSCRIBE_SRT_KEY = f"model/transcribe/meetup-{VIDEO_BASE}-1763239925.srt"
+CANONICAL_SRT_KEY = f"model/transcribe/{VIDEO_BASE}.srt"
+FANOUT_MODELS = [
+    {"id": "amazon.nova-lite-v1:0", "temperature": 0.3, "topP": 0.9},
+    {"id": "anthropic.claude-haiku-4-5-20251001-v1:0", "temperature": 0.3},
+    {"id": "deepseek.r1-v1:0", "temperature": 0.3, "topP": 0.9},
+]
+QUEUE_URL = "https://sqs.us-east-2.amazonaws.com/000000000000/transcribe-pending-jobs"
+
+
+def _reset_module_state():
+    """Estado de container quente que não deve vazar entre cenários."""
+    summary._CONFIG_CACHE.clear()
+    summary._PROMPT_CACHE_REJECTED.clear()
+    with summary._CIRCUIT_BREAKERS_LOCK:
+        summary._CIRCUIT_BREAKERS.clear()
+    transcribe.TRANSCRIBE_QUEUE_URL = QUEUE_URL
+
+
+# --- Cenários: setup(fakes, srt_bytes) -> (módulo, evento). O setup não entra nas medições ---
+
+def _put_video(fakes) -> str:
+    return fakes.s3.put_object(Bucket=BUCKET, Key=VIDEO_KEY, Body=b"\x00" * 1024, ContentType="video/mp4")["ETag"]
+
+
+def _canonical_srt_event(fakes) -> dict:
+    """Evento da legenda canônica com o ETag do objeto (como o S3 envia)."""
+    etag = fakes.s3.head_object(Bucket=BUCKET, Key=CANONICAL_SRT_KEY)["ETag"]
+    return s3_object_created_event(BUCKET, CANONICAL_SRT_KEY, etag.strip('"'))
+
+
+def _summary_first_run(fakes, srt_bytes):
+    """Legenda recém-gerada pelo Transcribe, modelo padrão, sem cache."""
+    _put_video(fakes)
+    fakes.s3.put_object(Bucket=BUCKET, Key=TRANSCRIBE_SRT_KEY, Body=srt_bytes)
+    return summary, s3_object_created_event(BUCKET, TRANSCRIBE_SRT_KEY)
+
+
+def _summary_duplicate_event(fakes, srt_bytes):
+    """Evento da própria cópia da legenda canônica: descartado pelo ledger de idempotência."""
+    module, event = _summary_first_run(fakes, srt_bytes)
+    with contextlib.redirect_stdout(_DEVNULL):
+        module.lambda_handler(event, FakeLambdaContext())
+    return summary, _canonical_srt_event(fakes)
+
+
+def _summary_cache_hit(fakes, srt_bytes):
+    """
+    Mesma transcrição já resumida (ledger expirado), como ao reprocessar pelo app: transcrição limpa
+    lida do artefato .transcript.json.gz e resumo copiado do cache, sem Bedrock.
+    """
+    module, event = _summary_first_run(fakes, srt_bytes)
+    with contextlib.redirect_stdout(_DEVNULL):
+        module.lambda_handler(event, FakeLambdaContext())
+    ledger = fakes.s3.list_objects_v2(Bucket=BUCKET, Prefix=summary.IDEMPOTENCY_PREFIX)["Contents"]
+    for item in ledger:
+        fakes.s3.delete_object(Bucket=BUCKET, Key=item["Key"])
+    summary._CONFIG_CACHE.clear()
+    return summary, _canonical_srt_event(fakes)
+
+
+def _summary_fanout(fakes, srt_bytes):
+    """Três modelos em model/models/{base}.json (fan-out)."""
+    module, event = _summary_first_run(fakes, srt_bytes)
+    fakes.s3.put_object(
+        Bucket=BUCKET,
+        Key=f"model/models/{VIDEO_BASE}.json",
+        Body=json.dumps({"models": FANOUT_MODELS}).encode("utf-8"),
+    )
+    return module, event
+
+
+def _transcribe_new_video(fakes, srt_bytes):
+    """Upload de vídeo novo com capacidade livre: inicia o job."""
+    etag = _put_video(fakes)
+    return transcribe, s3_object_created_event(BUCKET, VIDEO_KEY, etag.strip('"'))
+
+
+def _transcribe_same_video(fakes, srt_bytes):
+    """Vídeo reenviado sem mudança: pula o Transcribe e redispara o resumo."""
+    etag = _put_video(fakes)
+    fakes.s3.put_object(Bucket=BUCKET, Key=CANONICAL_SRT_KEY, Body=srt_bytes)
+    fakes.s3.put_object(Bucket=BUCKET, Key=f"model/transcribe/{VIDEO_BASE}.video-etag", Body=etag.strip('"').encode())
+    return transcribe, s3_object_created_event(BUCKET, VIDEO_KEY, etag.strip('"'))
+
+
+def _fill_transcribe(fakes, jobs: int):
+    for i in range(jobs):
+        fakes.transcribe.jobs[f"meetup-outro-{i}-1763239925"] = "IN_PROGRESS"
+
+
+def _transcribe_queued(fakes, srt_bytes):
+    """Teto de jobs simultâneos atingido: o pedido vai para a fila SQS."""
+    _fill_transcribe(fakes, transcribe.TRANSCRIBE_MAX_CONCURRENT_JOBS)
+    return _transcribe_new_video(fakes, srt_bytes)
+
+
+def _transcribe_drain(fakes, srt_bytes):
+    """Fim de job do Transcribe com 10 pedidos na fila: drena até o teto."""
+    _fill_transcribe(fakes, transcribe.TRANSCRIBE_MAX_CONCURRENT_JOBS)
+    for i in range(10):
+        fakes.sqs.send_message(
+            QueueUrl=QUEUE_URL,
+            MessageBody=json.dumps({
+                "bucket": BUCKET,
+                "key": f"model/video/fila-{i}.mp4",
+                "base_name": f"fila-{i}",
+                "enqueued_at": time.time(),
+            }),
+        )
+    for i in range(5):
+        fakes.transcribe.complete(f"meetup-outro-{i}-1763239925")
+    return transcribe, {
+        "source": "aws.transcribe",
+        "detail-type": "Transcribe Job State Change",
+        "detail": {"TranscriptionJobName": "meetup-outro-0-1763239925", "TranscriptionJobStatus": "COMPLETED"},
+    }
+
+
+# (nome, setup, depende do tamanho do SRT)
+SCENARIOS = [
+    ("summary_first_run", _summary_first_run, True),
+    ("summary_duplicate_event", _summary_duplicate_event, True),
+    ("summary_cache_hit", _summary_cache_hit, True),
+    ("summary_fanout_3_models", _summary_fanout, True),
+    ("transcribe_new_video", _transcribe_new_video, False),
+    ("transcribe_same_video", _transcribe_same_video, False),
+    ("transcribe_queued", _transcribe_queued, False),
+    ("transcribe_drain", _transcribe_drain, False),
+]
+
+_DEVNULL = open(os.devnull, "w")
+
+
+def _run_once(setup, srt_bytes: bytes, trace_memory: bool = False) -> tuple:
+    """Executa o cenário num estado novo. Retorna (status, segundos, pico de bytes, chamadas AWS)."""
+    _reset_module_state()
+    fakes = FakeAws(transcribe_max_concurrent=transcribe.TRANSCRIBE_MAX_CONCURRENT_JOBS * 5)
+    fakes.install(summary)
+    fakes.install(transcribe)
+    module, event = setup(fakes, srt_bytes)
+    fakes.counter.reset()
+
+    peak = None
+    with contextlib.redirect_stdout(_DEVNULL):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = module.lambda_handler(event, FakeLambdaContext())
+        elapsed = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    return result.get("status"), elapsed, peak, dict(sorted(fakes.calls.items()))
+
+
+def run(minutes_list: list = None, repeat: int = 3, scenario_filter: list = None) -> list:
+    results = []
+    for name, setup, sized in SCENARIOS:
+        if scenario_filter and name not in scenario_filter:
+            continue
+        for minutes in (minutes_list or DEFAULT_MINUTES) if sized else [None]:
+            srt_bytes = generate_srt(minutes or 10).encode("utf-8")
+            timings, calls, status = [], None, None
+            for _ in range(repeat):
+                status, elapsed, _, calls = _run_once(setup, srt_bytes)
+                timings.append(elapsed)
+            _, _, peak, _ = _run_once(setup, srt_bytes, trace_memory=True)
+            results.append({
+                "scenario": name,
+                "minutes": minutes,
+                "status": status,
+                "wall_ms": round(statistics.median(timings) * 1000, 2),
+                "wall_ms_min": round(min(timings) * 1000, 2),
+                "peak_bytes": peak,
+                "aws_calls_total": sum(calls.values()),
+                "aws_calls": calls,
+            })
+    return results
+
+
+def print_table(results: list):
+    print(f"{'cenário':<26} {'min':>5} {'status':<20} {'ms':>9} {'pico MB':>8} {'AWS':>4}  chamadas")
+    for r in results:
+        minutes = r["minutes"] if r["minutes"] is not None else "-"
+        calls = " ".join(f"{op}={n}" for op, n in r["aws_calls"].items())
+        print(
+            f"{r['scenario']:<26} {minutes:>5} {r['status']:<20} {r['wall_ms']:>9.1f} "
+            f"{r['peak_bytes'] / 1e6:>8.2f} {r['aws_calls_total']:>4}  {calls}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=DEFAULT_MINUTES)
+    parser.add_argument("--repeat", type=int, default=3, help="execuções por cenário (mediana do tempo)")
+    parser.add_argument("--scenario", nargs="+", choices=[name for name, _, _ in SCENARIOS])
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = run(args.minutes, args.repeat, args.scenario)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Micro-benchmarks das funções puras do caminho quente da Lambda de resumo:
+extract_plain_text_from_srt e build_search_index (SRTs sintéticos de 1 min a 8 h),
+extract_video_base_name, get_model_slug, get_inference_config_for_model e
+select_model_for_transcript (registro de modelos e roteamento por tamanho).
+
+Para cada caso: mediana do tempo por chamada (várias rodadas de timeit) e, para a extração do
+SRT e o índice de busca, o pico de memória alocada (tracemalloc, em execução separada). Uso (na raiz do repositório):
+
+    python benchmark/bench_micro.py
+    python benchmark/bench_micro.py --minutes 1 60 480 --json /tmp/micro.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+# Os clients AWS só são criados no primeiro uso (aws_clients.py); não há chamadas AWS neste benchmark
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+
+import lambda_bedrock_summary as summary
+import search_index
+import srt_parser
+from synthetic import generate_srt
+
+DEFAULT_MINUTES = [1, 10, 60, 180, 480]
+
+SRT_FILENAMES = [
+    "meetup-CommunityDayCPS-1763239925.srt",
+    "meetup-palla-1763239925.srt",
+    "CommunityDayCPS.srt",
+    "meetup-aws-summit-sp-2025-keynote-1763239925.srt",
+]
+MODEL_IDS = [
+    "amazon.nova-lite-v1:0",
+    "anthropic.claude-haiku-4-5-20251001-v1:0",
+    "us.deepseek.r1-v1:0",
+    "meta.llama3-70b-instruct-v1:0",
+]
+MODEL_PARAMS = {"temperature": 0.2, "topP": 0.8, "topK": 40}
+# Transcrições de ~2 min a ~8 h (tokens estimados)
+TRANSCRIPT_TOKENS = [500, 15000, 60000, 250000]
+
+
+def _time_per_call(fn, rounds: int = 5, min_seconds: float = 0.2) -> float:
+    """Mediana do tempo por chamada (segundos) em `rounds` rodadas de ~min_seconds cada."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds / rounds or number >= 1_000_000:
+            break
+        number *= 10
+    samples = [timer.timeit(number) / number for _ in range(rounds)]
+    return statistics.median(samples)
+
+
+def _peak_bytes(fn) -> int:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _result(name: str, params: dict, seconds: float, peak: int = None) -> dict:
+    result = {"benchmark": name, **params, "per_call_us": round(seconds * 1e6, 3)}
+    if peak is not None:
+        result["peak_bytes"] = peak
+    return result
+
+
+def run(minutes_list: list = None) -> list:
+    results = []
+    for minutes in minutes_list or DEFAULT_MINUTES:
+        srt_text = generate_srt(minutes)
+        fn = lambda: srt_parser.extract_plain_text_from_srt(srt_text)
+        results.append(_result(
+            "extract_plain_text_from_srt",
+            {"minutes": minutes, "srt_bytes": len(srt_text.encode("utf-8"))},
+            _time_per_call(fn, rounds=3),
+            _peak_bytes(fn),
+        ))
+        cues = list(srt_parser.iter_srt_cues(srt_text.splitlines()))
+        fn = lambda: search_index.build_search_index(cues)
+        results.append(_result(
+            "build_search_index",
+            {"minutes": minutes, "cues": len(cues)},
+            _time_per_call(fn, rounds=3),
+            _peak_bytes(fn),
+        ))
+
+    results.append(_result(
+        "extract_video_base_name",
+        {"inputs": len(SRT_FILENAMES)},
+        _time_per_call(lambda: [summary.extract_video_base_name(name) for name in SRT_FILENAMES]),
+    ))
+    results.append(_result(
+        "get_model_slug",
+        {"inputs": len(MODEL_IDS)},
+        _time_per_call(lambda: [summary.get_model_slug(model_id) for model_id in MODEL_IDS]),
+    ))
+    results.append(_result(
+        "get_inference_config_for_model",
+        {"inputs": len(MODEL_IDS)},
+        _time_per_call(lambda: [summary.get_inference_config_for_model(model_id, MODEL_PARAMS) for model_id in MODEL_IDS]),
+    ))
+    results.append(_result(
+        "select_model_for_transcript",
+        {"inputs": len(TRANSCRIPT_TOKENS)},
+        _time_per_call(lambda: [summary.select_model_for_transcript(tokens) for tokens in TRANSCRIPT_TOKENS]),
+    ))
+    return results
+
+
+def print_table(results: list):
+    print(f"{'benchmark':<32} {'parâmetros':<28} {'µs/chamada':>12} {'pico MB':>9}")
+    for r in results:
+        params = ", ".join(f"{k}={v}" for k, v in r.items() if k not in ("benchmark", "per_call_us", "peak_bytes"))
+        peak = f"{r['peak_bytes'] / 1e6:.2f}" if "peak_bytes" in r else "-"
+        print(f"{r['benchmark']:<32} {params:<28} {r['per_call_us']:>12.1f} {peak:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=DEFAULT_MINUTES)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = run(args.minutes)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
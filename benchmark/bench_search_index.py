@@ -0,0 +1,87 @@
+"""
+Benchmark do índice de busca da transcrição (search_index.py) em SRTs sintéticos de tamanho real.
+
+Mostra, por duração de vídeo: legendas, termos distintos, tamanho do SRT, do índice em JSON e
+com gzip (o que o navegador baixa), tempo de construção, pico de memória e tempo médio de
+consulta (mesma semântica do app.js). Uso (na raiz do repositório):
+
+    python benchmark/bench_search_index.py
+    python benchmark/bench_search_index.py --minutes 60 480 --json /tmp/search_index.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+
+import search_index
+import srt_parser
+from synthetic import generate_srt
+
+QUERIES = ["bedrock", "lambda", "infraestrutura", "custo", "cloudfront evento", "conc"]
+
+
+def run(minutes_list: list) -> list:
+    results = []
+    for minutes in minutes_list:
+        srt_text = generate_srt(minutes)
+        cues = list(srt_parser.iter_srt_cues(srt_text.splitlines()))
+
+        start = time.perf_counter()
+        index = search_index.build_search_index(cues)
+        build_ms = (time.perf_counter() - start) * 1000
+        tracemalloc.start()
+        search_index.build_search_index(cues)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        raw = json.dumps(index, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+        encoded = search_index.encode_search_index(index)
+        start = time.perf_counter()
+        hits = sum(len(search_index.search(index, query)) for query in QUERIES)
+        query_ms = (time.perf_counter() - start) * 1000 / len(QUERIES)
+        results.append({
+            "minutes": minutes,
+            "cues": len(cues),
+            "terms": len(index["terms"]),
+            "srt_bytes": len(srt_text.encode("utf-8")),
+            "index_json_bytes": len(raw),
+            "index_gzip_bytes": len(encoded),
+            "build_ms": round(build_ms, 1),
+            "peak_bytes": peak,
+            "query_ms": round(query_ms, 2),
+            "hits": hits,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[60, 180, 480], help="durações (minutos) dos SRTs sintéticos")
+    parser.add_argument("--json", help="grava os resultados em JSON neste caminho")
+    args = parser.parse_args()
+
+    results = run(args.minutes)
+    print(
+        f"{'min':>6} {'legendas':>9} {'termos':>7} {'SRT KB':>8} {'JSON KB':>8} {'gzip KB':>8} "
+        f"{'build ms':>9} {'pico MB':>8} {'consulta ms':>12}"
+    )
+    for r in results:
+        print(
+            f"{r['minutes']:>6g} {r['cues']:>9} {r['terms']:>7} {r['srt_bytes'] / 1024:>8.0f} "
+            f"{r['index_json_bytes'] / 1024:>8.0f} {r['index_gzip_bytes'] / 1024:>8.0f} {r['build_ms']:>9} "
+            f"{r['peak_bytes'] / 1e6:>8.2f} {r['query_ms']:>12}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
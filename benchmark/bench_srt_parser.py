@@ -0,0 +1,122 @@
+"""
+Benchmark da leitura do SRT: caminho antigo (read() inteiro → decode → splitlines → strip do
+cabeçalho) versus parse_srt_stream (um único buffer, parser incremental) versus a transcrição
+limpa persistida ({base}.transcript.json.gz, lida ao reprocessar a legenda canônica).
+
+Mostra, por duração de vídeo, bytes lidos do S3, tempo e pico de memória alocada (tracemalloc)
+até ter o texto limpo para o LLM e o hash de idempotência. Uso (na raiz do repositório):
+
+    python benchmark/bench_srt_parser.py
+    python benchmark/bench_srt_parser.py --minutes 60 480 --json /tmp/srt_parser.json
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+
+import srt_parser
+import transcript_artifacts
+from synthetic import generate_srt
+
+HEADER = "# Modelo LLM: amazon.nova-lite-v1:0\n\n"
+ETAG = "0123456789abcdef0123456789abcdef"
+
+
+def _legacy(stream) -> tuple:
+    """Reprodução do fluxo anterior do handler."""
+    srt_text = stream.read().decode("utf-8", errors="ignore")
+    content = srt_text
+    if srt_text.lstrip().startswith("# Modelo LLM:"):
+        first_blank = srt_text.find("\n\n")
+        if first_blank >= 0:
+            content = srt_text[first_blank + 2 :].lstrip()
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    lines = []
+    for line in srt_text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("# Modelo LLM:") or stripped.isdigit() or "-->" in stripped:
+            continue
+        lines.append(stripped)
+    plain_text = "\n".join(lines)
+    return plain_text, digest
+
+
+def _streaming(stream) -> tuple:
+    doc = srt_parser.parse_srt_stream(stream)
+    return doc.plain_text(), doc.digest
+
+
+def _artifact(stream) -> tuple:
+    doc = transcript_artifacts.decode_transcript_artifact(stream.read(), ETAG)
+    return doc.plain_text(), doc.digest
+
+
+def _measure(fn, payload: bytes) -> tuple:
+    # Tempo e memória em execuções separadas: tracemalloc distorce o tempo das alocações
+    start = time.perf_counter()
+    result = fn(io.BytesIO(payload))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    fn(io.BytesIO(payload))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_ms, peak
+
+
+def run(minutes_list: list) -> list:
+    results = []
+    for minutes in minutes_list:
+        payload = (HEADER + generate_srt(minutes)).encode("utf-8")
+        legacy, legacy_ms, legacy_peak = _measure(_legacy, payload)
+        streaming, streaming_ms, streaming_peak = _measure(_streaming, payload)
+        artifact_payload = transcript_artifacts.encode_transcript_artifact(srt_parser.parse_srt_stream(io.BytesIO(payload)), "k.srt", ETAG)
+        artifact, artifact_ms, artifact_peak = _measure(_artifact, artifact_payload)
+        if not legacy == streaming == artifact:
+            raise SystemExit(f"Resultados divergentes para {minutes} min")
+        results.append({
+            "minutes": minutes,
+            "srt_bytes": len(payload),
+            "artifact_bytes": len(artifact_payload),
+            "legacy_ms": round(legacy_ms, 1),
+            "legacy_peak_bytes": legacy_peak,
+            "streaming_ms": round(streaming_ms, 1),
+            "streaming_peak_bytes": streaming_peak,
+            "artifact_ms": round(artifact_ms, 1),
+            "artifact_peak_bytes": artifact_peak,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=int, nargs="+", default=[60, 180, 480])
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = run(args.minutes)
+    print(
+        f"{'min':>6} {'SRT MB':>8} {'antigo ms':>10} {'antigo pico MB':>15} {'stream ms':>10} {'stream pico MB':>15} "
+        f"{'artefato MB':>12} {'artefato ms':>12} {'artefato pico MB':>17}"
+    )
+    for r in results:
+        print(
+            f"{r['minutes']:>6} {r['srt_bytes'] / 1e6:>8.2f} {r['legacy_ms']:>10.1f} {r['legacy_peak_bytes'] / 1e6:>15.2f} "
+            f"{r['streaming_ms']:>10.1f} {r['streaming_peak_bytes'] / 1e6:>15.2f} "
+            f"{r['artifact_bytes'] / 1e6:>12.2f} {r['artifact_ms']:>12.1f} {r['artifact_peak_bytes'] / 1e6:>17.2f}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
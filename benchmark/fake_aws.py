@@ -0,0 +1,382 @@
+"""
+Clients AWS em memória (S3, Transcribe, SQS, Bedrock Runtime) para benchmarks offline das Lambdas.
+
+Implementam só as operações usadas pelas Lambdas, com os mesmos nomes de parâmetros e formatos de
+resposta do boto3, e contam as chamadas por "serviço.operação". O botocore Stubber exige a sequência
+exata de respostas e não combina com as leituras paralelas do S3IOExecutor nem com o fan-out de
+modelos; por isso os fakes mantêm estado (objetos, jobs, mensagens) e respondem a qualquer ordem.
+
+    fakes = FakeAws()
+    fakes.install(summary_module)        # troca s3_client/bedrock_client/... do módulo
+    fakes.s3.put_object(Bucket="b", Key="model/transcribe/x.srt", Body=b"...")
+    ...
+    fakes.calls                          # Counter({"s3.get_object": 3, "bedrock.converse": 1, ...})
+"""
+
+import hashlib
+import io
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+
+def client_error(code: str, operation: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": code}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        operation,
+    )
+
+
+class CallCounter:
+    """Contador thread-safe de chamadas, compartilhado pelos fakes de uma mesma execução."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = Counter()
+
+    def add(self, name: str):
+        with self._lock:
+            self.calls[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self.calls = Counter()
+
+
+class _StreamingBody(io.BytesIO):
+    """Equivalente mínimo do botocore StreamingBody (read/iter_chunks/close)."""
+
+    def iter_chunks(self, chunk_size: int = 1024):
+        while True:
+            chunk = self.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class _Paginator:
+    def __init__(self, method):
+        self.method = method
+
+    def paginate(self, **kwargs):
+        while True:
+            page = self.method(**kwargs)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+
+class FakeS3:
+    def __init__(self, counter: CallCounter):
+        self.counter = counter
+        self._lock = threading.Lock()
+        self.objects = {}  # (bucket, key) -> dict(body, etag, metadata, content_type, last_modified)
+
+    def _get(self, bucket: str, key: str, operation: str, missing_code: str = "NoSuchKey") -> dict:
+        with self._lock:
+            obj = self.objects.get((bucket, key))
+        if obj is None:
+            raise client_error(missing_code, operation, 404)
+        return obj
+
+    def put_object(self, Bucket, Key, Body=b"", ContentType="binary/octet-stream", Metadata=None, **kwargs):
+        self.counter.add("s3.put_object")
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        elif not isinstance(Body, (bytes, bytearray)):
+            Body = Body.read()
+        body = bytes(Body)
+        with self._lock:
+            current = self.objects.get((Bucket, Key))
+            if kwargs.get("IfNoneMatch") == "*" and current is not None:
+                raise client_error("PreconditionFailed", "PutObject", 412)
+            if "IfMatch" in kwargs and (current is None or current["etag"] != kwargs["IfMatch"]):
+                raise client_error("PreconditionFailed" if current else "NoSuchKey", "PutObject", 412 if current else 404)
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            self.objects[(Bucket, Key)] = {
+                "body": body,
+                "etag": etag,
+                "metadata": dict(Metadata or {}),
+                "content_type": ContentType,
+                "content_encoding": kwargs.get("ContentEncoding"),
+                "last_modified": datetime.now(timezone.utc),
+            }
+        return {"ETag": etag}
+
+    def _head_response(self, obj: dict) -> dict:
+        response = {
+            "ETag": obj["etag"],
+            "ContentLength": len(obj["body"]),
+            "ContentType": obj["content_type"],
+            "Metadata": dict(obj["metadata"]),
+            "LastModified": obj["last_modified"],
+        }
+        if obj.get("content_encoding"):
+            response["ContentEncoding"] = obj["content_encoding"]
+        return response
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.counter.add("s3.get_object")
+        obj = self._get(Bucket, Key, "GetObject")
+        if kwargs.get("IfNoneMatch") and kwargs["IfNoneMatch"] == obj["etag"]:
+            raise client_error("304", "GetObject", 304)
+        if kwargs.get("IfMatch") and kwargs["IfMatch"] != obj["etag"]:
+            raise client_error("PreconditionFailed", "GetObject", 412)
+        return {**self._head_response(obj), "Body": _StreamingBody(obj["body"])}
+
+    def head_object(self, Bucket, Key, **kwargs):
+        self.counter.add("s3.head_object")
+        return self._head_response(self._get(Bucket, Key, "HeadObject", missing_code="404"))
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective="COPY", Metadata=None, **kwargs):
+        self.counter.add("s3.copy_object")
+        source = self._get(CopySource["Bucket"], CopySource["Key"], "CopyObject")
+        with self._lock:
+            self.objects[(Bucket, Key)] = {
+                **source,
+                "metadata": dict(Metadata or {}) if MetadataDirective == "REPLACE" else dict(source["metadata"]),
+                "content_type": kwargs.get("ContentType", source["content_type"]),
+                "last_modified": datetime.now(timezone.utc),
+            }
+            etag = source["etag"]
+        return {"CopyObjectResult": {"ETag": etag}}
+
+    def delete_object(self, Bucket, Key, **kwargs):
+        self.counter.add("s3.delete_object")
+        with self._lock:
+            self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def delete_objects(self, Bucket, Delete, **kwargs):
+        self.counter.add("s3.delete_objects")
+        with self._lock:
+            for item in Delete.get("Objects", []):
+                self.objects.pop((Bucket, item["Key"]), None)
+        return {"Deleted": [{"Key": item["Key"]} for item in Delete.get("Objects", [])]}
+
+    def list_objects_v2(self, Bucket, Prefix="", MaxKeys=1000, ContinuationToken=None, StartAfter=None, **kwargs):
+        self.counter.add("s3.list_objects_v2")
+        with self._lock:
+            keys = sorted(k for b, k in self.objects if b == Bucket and k.startswith(Prefix))
+            after = ContinuationToken or StartAfter
+            if after:
+                keys = [k for k in keys if k > after]
+            page, rest = keys[:MaxKeys], keys[MaxKeys:]
+            contents = [
+                {
+                    "Key": k,
+                    "Size": len(self.objects[(Bucket, k)]["body"]),
+                    "ETag": self.objects[(Bucket, k)]["etag"],
+                    "LastModified": self.objects[(Bucket, k)]["last_modified"],
+                }
+                for k in page
+            ]
+        response = {"Contents": contents, "KeyCount": len(contents), "IsTruncated": bool(rest)}
+        if rest:
+            response["NextContinuationToken"] = page[-1]
+        return response
+
+    def get_paginator(self, operation_name: str):
+        if operation_name != "list_objects_v2":
+            raise NotImplementedError(operation_name)
+        return _Paginator(self.list_objects_v2)
+
+
+class FakeTranscribe:
+    def __init__(self, counter: CallCounter, max_concurrent: int = 100):
+        self.counter = counter
+        self.max_concurrent = max_concurrent
+        self._lock = threading.Lock()
+        self.jobs = {}  # nome -> status
+        self.tags = {}  # nome -> Tags do start_transcription_job
+
+    def start_transcription_job(self, TranscriptionJobName, Tags=None, **kwargs):
+        self.counter.add("transcribe.start_transcription_job")
+        with self._lock:
+            active = sum(1 for status in self.jobs.values() if status in ("QUEUED", "IN_PROGRESS"))
+            if active >= self.max_concurrent:
+                raise client_error("LimitExceededException", "StartTranscriptionJob")
+            if TranscriptionJobName in self.jobs:
+                raise client_error("ConflictException", "StartTranscriptionJob")
+            self.jobs[TranscriptionJobName] = "IN_PROGRESS"
+            self.tags[TranscriptionJobName] = list(Tags or [])
+        return {"TranscriptionJob": {"TranscriptionJobName": TranscriptionJobName, "TranscriptionJobStatus": "IN_PROGRESS"}}
+
+    def get_transcription_job(self, TranscriptionJobName, **kwargs):
+        self.counter.add("transcribe.get_transcription_job")
+        with self._lock:
+            if TranscriptionJobName not in self.jobs:
+                raise client_error("BadRequestException", "GetTranscriptionJob")
+            job = {"TranscriptionJobName": TranscriptionJobName, "TranscriptionJobStatus": self.jobs[TranscriptionJobName]}
+            if self.tags.get(TranscriptionJobName):
+                job["Tags"] = list(self.tags[TranscriptionJobName])
+        return {"TranscriptionJob": job}
+
+    def list_transcription_jobs(self, Status=None, JobNameContains="", MaxResults=100, NextToken=None, **kwargs):
+        self.counter.add("transcribe.list_transcription_jobs")
+        with self._lock:
+            names = sorted(
+                name for name, status in self.jobs.items()
+                if (Status is None or status == Status) and JobNameContains in name
+            )
+        start = int(NextToken or 0)
+        page = names[start : start + MaxResults]
+        response = {
+            "TranscriptionJobSummaries": [
+                {"TranscriptionJobName": name, "TranscriptionJobStatus": self.jobs[name]} for name in page
+            ]
+        }
+        if start + MaxResults < len(names):
+            response["NextToken"] = str(start + MaxResults)
+        return response
+
+    def complete(self, job_name: str, status: str = "COMPLETED"):
+        """Simula o fim de um job (sem contar como chamada de API)."""
+        with self._lock:
+            self.jobs[job_name] = status
+
+
+class FakeSqs:
+    def __init__(self, counter: CallCounter):
+        self.counter = counter
+        self._lock = threading.Lock()
+        self.visible = []
+        self.in_flight = {}
+
+    def send_message(self, QueueUrl, MessageBody, **kwargs):
+        self.counter.add("sqs.send_message")
+        message_id = uuid.uuid4().hex
+        with self._lock:
+            self.visible.append({"MessageId": message_id, "Body": MessageBody})
+        return {"MessageId": message_id}
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages=1, **kwargs):
+        self.counter.add("sqs.receive_message")
+        with self._lock:
+            batch, self.visible = self.visible[:MaxNumberOfMessages], self.visible[MaxNumberOfMessages:]
+            messages = []
+            for message in batch:
+                handle = uuid.uuid4().hex
+                self.in_flight[handle] = message
+                messages.append({**message, "ReceiptHandle": handle})
+        return {"Messages": messages} if messages else {}
+
+    def delete_message(self, QueueUrl, ReceiptHandle, **kwargs):
+        self.counter.add("sqs.delete_message")
+        with self._lock:
+            self.in_flight.pop(ReceiptHandle, None)
+        return {}
+
+    def change_message_visibility(self, QueueUrl, ReceiptHandle, VisibilityTimeout, **kwargs):
+        self.counter.add("sqs.change_message_visibility")
+        with self._lock:
+            message = self.in_flight.pop(ReceiptHandle, None)
+            if message is not None and VisibilityTimeout == 0:
+                self.visible.insert(0, message)
+        return {}
+
+    def get_queue_attributes(self, QueueUrl, AttributeNames=None, **kwargs):
+        self.counter.add("sqs.get_queue_attributes")
+        with self._lock:
+            return {
+                "Attributes": {
+                    "ApproximateNumberOfMessages": str(len(self.visible)),
+                    "ApproximateNumberOfMessagesNotVisible": str(len(self.in_flight)),
+                }
+            }
+
+
+class FakeBedrock:
+    """
+    Bedrock Runtime determinístico: o resumo é um Markdown fixo e o uso de tokens é estimado a
+    partir do tamanho da entrada (3,5 caracteres por token, como na Lambda).
+    """
+
+    def __init__(self, counter: CallCounter, output_chars: int = 4000):
+        self.counter = counter
+        self.output_text = ("# Resumo\n\n" + "- ponto discutido na palestra\n" * (output_chars // 30))[:output_chars]
+
+    def _usage(self, system, messages) -> dict:
+        chars = sum(len(block.get("text", "")) for block in system or [])
+        for message in messages:
+            chars += sum(len(block.get("text", "")) for block in message.get("content", []))
+        return {
+            "inputTokens": int(chars / 3.5),
+            "outputTokens": int(len(self.output_text) / 3.5),
+            "totalTokens": int((chars + len(self.output_text)) / 3.5),
+        }
+
+    def converse(self, modelId, messages, system=None, inferenceConfig=None, **kwargs):
+        self.counter.add("bedrock.converse")
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": self.output_text}]}},
+            "stopReason": "end_turn",
+            "usage": self._usage(system, messages),
+            "metrics": {"latencyMs": 0},
+        }
+
+    def converse_stream(self, modelId, messages, system=None, inferenceConfig=None, **kwargs):
+        self.counter.add("bedrock.converse_stream")
+        text, usage = self.output_text, self._usage(system, messages)
+
+        def events():
+            yield {"messageStart": {"role": "assistant"}}
+            for i in range(0, len(text), 200):
+                yield {"contentBlockDelta": {"delta": {"text": text[i : i + 200]}, "contentBlockIndex": 0}}
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            yield {"metadata": {"usage": usage, "metrics": {"latencyMs": 0}}}
+
+        return {"stream": events()}
+
+
+class FakeAws:
+    """Conjunto de fakes com um contador único; install() troca os clients de um módulo de Lambda."""
+
+    CLIENT_ATTRIBUTES = {
+        "s3_client": "s3",
+        "transcribe_client": "transcribe",
+        "sqs_client": "sqs",
+        "bedrock_client": "bedrock",
+    }
+
+    def __init__(self, transcribe_max_concurrent: int = 100, bedrock_output_chars: int = 4000):
+        self.counter = CallCounter()
+        self.s3 = FakeS3(self.counter)
+        self.transcribe = FakeTranscribe(self.counter, transcribe_max_concurrent)
+        self.sqs = FakeSqs(self.counter)
+        self.bedrock = FakeBedrock(self.counter, bedrock_output_chars)
+
+    @property
+    def calls(self) -> Counter:
+        return self.counter.calls
+
+    def install(self, module):
+        for attribute, fake in self.CLIENT_ATTRIBUTES.items():
+            if hasattr(module, attribute):
+                setattr(module, attribute, getattr(self, fake))
+
+
+class FakeLambdaContext:
+    def __init__(self, timeout_seconds: float = 900):
+        self.timeout_seconds = timeout_seconds
+        self.function_name = "benchmark"
+        self.aws_request_id = "benchmark"
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int(self.timeout_seconds * 1000)
+
+
+def s3_object_created_event(bucket: str, key: str, etag: str = None) -> dict:
+    """Evento EventBridge "Object Created" do S3, como recebido pelas duas Lambdas."""
+    obj = {"key": key}
+    if etag:
+        obj["etag"] = etag
+    return {
+        "source": "aws.s3",
+        "detail-type": "Object Created",
+        "detail": {"bucket": {"name": bucket}, "object": obj},
+    }
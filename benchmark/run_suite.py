@@ -0,0 +1,143 @@
+"""
+Suite de benchmarks offline (micro + handlers) com resultados em JSON por commit.
+
+Grava benchmark/results/{commit}.json (commit, Python, data e os resultados de bench_micro e
+bench_handlers). Com --compare, compara com um resultado anterior: tempo/memória acima de
+--threshold (padrão 20%, ignorando diferenças absolutas mínimas) e aumento no número de chamadas
+AWS por evento são listados como regressão (--fail-on-regression retorna código 1). Uso (na raiz do repositório):
+
+    python benchmark/run_suite.py
+    python benchmark/run_suite.py --compare benchmark/results/1a141e0.json --fail-on-regression
+    python benchmark/run_suite.py --quick   # durações menores, 1 execução por cenário
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import bench_handlers
+import bench_micro
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIR, capture_output=True, text=True
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _micro_key(r: dict) -> tuple:
+    return ("micro", r["benchmark"], r.get("minutes"))
+
+
+def _handler_key(r: dict) -> tuple:
+    return ("handler", r["scenario"], r.get("minutes"))
+
+
+# Diferenças absolutas abaixo destes valores são ruído de medição, mesmo acima do threshold relativo
+MIN_DELTA = {"per_call_us": 1.0, "wall_ms_min": 1.0, "peak_bytes": 16 * 1024}
+
+
+def _regressed(metric: str, was, now, threshold: float) -> bool:
+    return now > was * (1 + threshold) and now - was > MIN_DELTA.get(metric, 0)
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Lista de (chave, métrica, antes, depois, regressão?) para os casos presentes nos dois resultados.
+    Tempo dos handlers comparado pelo mínimo das execuções (menos sensível a ruído que a mediana).
+    """
+    rows = []
+    before = {_micro_key(r): r for r in baseline.get("micro", [])}
+    for r in current.get("micro", []):
+        old = before.get(_micro_key(r))
+        if old:
+            rows.append((_micro_key(r), "per_call_us", old["per_call_us"], r["per_call_us"],
+                         _regressed("per_call_us", old["per_call_us"], r["per_call_us"], threshold)))
+    before = {_handler_key(r): r for r in baseline.get("handlers", [])}
+    for r in current.get("handlers", []):
+        old = before.get(_handler_key(r))
+        if not old:
+            continue
+        for metric in ("wall_ms_min", "peak_bytes"):
+            rows.append((_handler_key(r), metric, old[metric], r[metric], _regressed(metric, old[metric], r[metric], threshold)))
+        for op in sorted(set(old["aws_calls"]) | set(r["aws_calls"])):
+            was, now = old["aws_calls"].get(op, 0), r["aws_calls"].get(op, 0)
+            if was != now:
+                rows.append((_handler_key(r), op, was, now, now > was))
+    return rows
+
+
+def print_comparison(rows: list, baseline_commit: str):
+    print(f"\nComparação com {baseline_commit}:")
+    print(f"{'caso':<52} {'métrica':<34} {'antes':>12} {'depois':>12} {'Δ%':>8}")
+    for key, metric, was, now, regressed in rows:
+        case = f"{key[1]}" + (f" ({key[2]} min)" if key[2] is not None else "")
+        delta = f"{(now - was) / was * 100:+.1f}" if was else "novo"
+        flag = "  ← regressão" if regressed else ""
+        print(f"{case:<52} {metric:<34} {was:>12} {now:>12} {delta:>8}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="durações menores e 1 execução por cenário")
+    parser.add_argument("--json", help="arquivo de saída (padrão: benchmark/results/{commit}.json)")
+    parser.add_argument("--compare", help="resultado anterior (JSON desta suite) para comparar")
+    parser.add_argument("--threshold", type=float, default=0.2, help="variação tolerada de tempo/memória (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    micro_minutes = [1, 10, 60] if args.quick else bench_micro.DEFAULT_MINUTES
+    handler_minutes = [10, 60] if args.quick else bench_handlers.DEFAULT_MINUTES
+    repeat = 1 if args.quick else 3
+
+    commit = _git_commit()
+    print(f"== Micro-benchmarks ({commit}) ==")
+    micro = bench_micro.run(micro_minutes)
+    bench_micro.print_table(micro)
+    print(f"\n== Handlers ({commit}) ==")
+    handlers = bench_handlers.run(handler_minutes, repeat)
+    bench_handlers.print_table(handlers)
+
+    current = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "micro": micro,
+        "handlers": handlers,
+    }
+    output = args.json or os.path.join(BENCHMARK_DIR, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResultados gravados em {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(baseline, current, args.threshold)
+        print_comparison(rows, baseline.get("commit", args.compare))
+        regressions = [row for row in rows if row[4]]
+        print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%} ou com mais chamadas AWS")
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
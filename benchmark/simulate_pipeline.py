@@ -0,0 +1,605 @@
+"""
+Simulador local do pipeline (upload → Transcribe → resumo) para teste de carga, sem AWS.
+
+Liga os dois lambda_handler reais (lambda_function e lambda_bedrock_summary) por um barramento de
+eventos em processo com as regras do EventBridge de terraform/main.tf:
+
+- Object Created em model/video/                   → Lambda de transcrição
+- Object Created em model/transcribe/              → Lambda de resumo
+- Object Deleted em model/transcribe/ e resumo/    → Lambda de resumo
+- Transcribe Job State Change (COMPLETED/FAILED) e rate(5 minutes) → Lambda de transcrição (drena a fila)
+
+Os clients são os de fake_aws.py com comportamento no tempo: o S3 publica um evento a cada
+escrita/remoção, o Transcribe grava um SRT sintético (synthetic.py, um por vídeo) depois de um
+atraso proporcional à duração do vídeo e emite o fim do job, e o Bedrock responde com latência
+configurável (fixa + por token de saída), taxa de throttling aleatória e teto de requisições
+simultâneas (acima dele: ThrottlingException). Cada Lambda tem um teto de execuções simultâneas
+(reserved concurrency): eventos acima dele esperam na fila do barramento, e erros são reexecutados
+como na invocação assíncrona (até 2 vezes, após 1 e 2 min).
+
+--time-scale comprime o tempo (padrão 0.02: 1 s simulado dura 20 ms de relógio). Atrasos, latências,
+backoff, circuit breaker, limitador de taxa e timeouts das Lambdas são escalados; o tempo de CPU
+dos handlers não (é ampliado por 1/time-scale no relatório: use uma escala maior para vídeos
+longos). Os tempos do relatório são simulados. O limitador de taxa do Bedrock e os caches de
+container são compartilhados pelas execuções simultâneas (um processo). Uso (na raiz do repositório):
+
+    python benchmark/simulate_pipeline.py --uploads 50
+    python benchmark/simulate_pipeline.py --uploads 200 --arrival-rate 0.5 --minutes 30 60 120 \\
+        --summary-concurrency 5 --bedrock-max-concurrency 4 --bedrock-throttle-rate 0.05 --json /tmp/sim.json
+"""
+
+import argparse
+import contextlib
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+
+BUCKET = "meetup-simulation"
+QUEUE_URL = "https://sqs.us-east-2.amazonaws.com/000000000000/transcribe-pending-jobs"
+VIDEO_PREFIX = "model/video/"
+TRANSCRIBE_PREFIX = "model/transcribe/"
+SUMMARY_PREFIX = "model/resumo/"
+
+# Timeouts das funções em terraform/main.tf (segundos)
+TRANSCRIBE_TIMEOUT_SECONDS = 60
+SUMMARY_TIMEOUT_SECONDS = 120
+# Invocação assíncrona: até 2 novas tentativas após erro
+LAMBDA_RETRY_DELAYS_SECONDS = (60, 120)
+DRAIN_SCHEDULE_SECONDS = 300
+
+# Parâmetros de tempo das Lambdas (env → default) escalados por --time-scale; int: lidos com int()
+SCALED_ENV_SECONDS = {
+    "CONFIG_CACHE_TTL_SECONDS": 15.0,
+    "STREAM_FLUSH_SECONDS": 5.0,
+    "STREAM_DEADLINE_MARGIN_SECONDS": 10.0,
+    "BEDROCK_BACKOFF_BASE_SECONDS": 1.0,
+    "BEDROCK_BACKOFF_MAX_SECONDS": 20.0,
+    "BEDROCK_DEADLINE_RESERVE_SECONDS": 15.0,
+    "CIRCUIT_RESET_SECONDS": 60.0,
+    "IDEMPOTENCY_TTL_SECONDS": 21600,
+    "IDEMPOTENCY_FAILED_COOLDOWN_SECONDS": 300,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=20, help="número de vídeos enviados")
+    parser.add_argument("--arrival-rate", type=float, default=0, help="uploads por segundo simulado (0 = todos de uma vez)")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 30, 60], help="durações dos vídeos (ciclo)")
+    parser.add_argument("--time-scale", type=float, default=0.02, help="segundos de relógio por segundo simulado")
+    parser.add_argument("--transcribe-delay", type=float, default=30, help="atraso fixo de um job do Transcribe (s)")
+    parser.add_argument("--transcribe-factor", type=float, default=0.25, help="atraso do job por segundo de vídeo")
+    parser.add_argument("--transcribe-quota", type=int, default=100, help="jobs simultâneos aceitos pela conta (LimitExceededException)")
+    parser.add_argument("--transcribe-max-jobs", type=int, default=20, help="TRANSCRIBE_MAX_CONCURRENT_JOBS da Lambda")
+    parser.add_argument("--transcribe-concurrency", type=int, default=10, help="execuções simultâneas da Lambda de transcrição")
+    parser.add_argument("--summary-concurrency", type=int, default=10, help="execuções simultâneas da Lambda de resumo")
+    parser.add_argument("--bedrock-latency-ms", type=float, default=800, help="latência fixa por chamada ao Bedrock (ms)")
+    parser.add_argument("--bedrock-ms-per-token", type=float, default=15, help="latência por token de saída (ms)")
+    parser.add_argument("--bedrock-output-tokens", type=int, default=1200, help="tokens de saída por chamada")
+    parser.add_argument("--bedrock-throttle-rate", type=float, default=0.0, help="fração de chamadas com ThrottlingException")
+    parser.add_argument("--bedrock-max-concurrency", type=int, default=0, help="chamadas simultâneas aceitas (0 = sem teto)")
+    parser.add_argument("--bedrock-rate", type=float, help="BEDROCK_RATE_PER_SECOND (padrão: 2 × --summary-concurrency)")
+    parser.add_argument("--s3-latency-ms", type=float, default=0, help="latência por chamada ao S3 (ms)")
+    parser.add_argument("--max-seconds", type=float, default=6 * 3600, help="encerra a simulação após N segundos simulados")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="grava o relatório em JSON neste caminho")
+    parser.add_argument("--verbose", action="store_true", help="mostra os logs dos handlers")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Ambiente das Lambdas (terraform/main.tf) com os tempos escalados; lido no import dos módulos."""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+    os.environ["TRANSCRIBE_OUTPUT_BUCKET"] = BUCKET
+    os.environ["TRANSCRIBE_OUTPUT_PREFIX"] = TRANSCRIBE_PREFIX
+    os.environ["TRANSCRIBE_MAX_CONCURRENT_JOBS"] = str(args.transcribe_max_jobs)
+    os.environ["SUMMARY_OUTPUT_BUCKET"] = BUCKET
+    os.environ["SUMMARY_OUTPUT_PREFIX"] = SUMMARY_PREFIX
+    os.environ["MODEL_PREFIX"] = "model/"
+    os.environ["GUARDRAILS_PATH"] = os.path.join(ROOT_DIR, "prompt", "guardrails.md")
+    os.environ["BEDROCK_STREAMING"] = "0"
+    bedrock_rate = args.bedrock_rate if args.bedrock_rate is not None else 2.0 * args.summary_concurrency
+    os.environ["BEDROCK_RATE_PER_SECOND"] = str(bedrock_rate / args.time_scale)
+    os.environ["BEDROCK_BURST"] = str(max(4, args.summary_concurrency))
+    for name, default in SCALED_ENV_SECONDS.items():
+        value = float(os.environ.get(name, default)) * args.time_scale
+        os.environ[name] = str(max(1, round(value)) if isinstance(default, int) else value)
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def pick(fraction):
+        return round(ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))], 2)
+
+    return {"count": len(ordered), "p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[-1], 2)}
+
+
+class SimClock:
+    """Tempo simulado = tempo de relógio desde o início / time_scale."""
+
+    def __init__(self, time_scale: float):
+        self.time_scale = time_scale
+        self.started = time.perf_counter()
+
+    def now(self) -> float:
+        return (time.perf_counter() - self.started) / self.time_scale
+
+    def sleep(self, sim_seconds: float):
+        if sim_seconds > 0:
+            time.sleep(sim_seconds * self.time_scale)
+
+
+class EventBus:
+    """
+    Barramento em processo: regras (predicado do evento → função) e timers em tempo simulado.
+    Conta o trabalho pendente (eventos na fila ou em execução, timers) para detectar o fim.
+    """
+
+    def __init__(self, clock: SimClock):
+        self.clock = clock
+        self.rules = []
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._timers = []
+        self._timer_seq = itertools.count()
+        self._timer_wakeup = threading.Condition(self._lock)
+        self._timer_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="timer")
+        self._stopped = False
+        self.published = Counter()
+        threading.Thread(target=self._timer_loop, name="event-bus-timers", daemon=True).start()
+
+    def add_rule(self, name: str, matches, function):
+        self.rules.append((name, matches, function))
+
+    def publish(self, event: dict):
+        for name, matches, function in self.rules:
+            if matches(event):
+                with self._lock:
+                    self.published[name] += 1
+                function.invoke_async(event)
+
+    def begin(self):
+        with self._lock:
+            self._outstanding += 1
+
+    def end(self):
+        with self._lock:
+            self._outstanding -= 1
+
+    @property
+    def outstanding(self) -> int:
+        with self._lock:
+            return self._outstanding
+
+    def call_later(self, sim_seconds: float, fn, counted: bool = True):
+        """Executa fn após sim_seconds simulados; counted=False para timers periódicos (agendamento)."""
+        due = time.perf_counter() + sim_seconds * self.clock.time_scale
+        with self._lock:
+            if counted:
+                self._outstanding += 1
+            heapq.heappush(self._timers, (due, next(self._timer_seq), fn, counted))
+            self._timer_wakeup.notify()
+
+    def _timer_loop(self):
+        while True:
+            with self._lock:
+                while not self._stopped and (not self._timers or self._timers[0][0] > time.perf_counter()):
+                    timeout = self._timers[0][0] - time.perf_counter() if self._timers else None
+                    self._timer_wakeup.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, fn, counted = heapq.heappop(self._timers)
+            self._timer_pool.submit(self._run_timer, fn, counted)
+
+    def _run_timer(self, fn, counted: bool):
+        try:
+            fn()
+        finally:
+            if counted:
+                self.end()
+
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            self._timer_wakeup.notify()
+        self._timer_pool.shutdown(wait=False)
+
+
+class SimulatedLambda:
+    """Função com teto de execuções simultâneas, fila de eventos e novas tentativas assíncronas."""
+
+    def __init__(self, name: str, handler, concurrency: int, timeout_seconds: float, bus: EventBus):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.timeout_seconds = timeout_seconds
+        self.bus = bus
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self.running = 0
+        self.peak_running = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.queue_waits = []
+        self.durations = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.retries = 0
+        self.timeouts = 0
+
+    def invoke_async(self, event: dict, attempt: int = 0):
+        self.bus.begin()
+        with self._lock:
+            self.queued += 1
+            self.peak_queued = max(self.peak_queued, self.queued)
+        self._pool.submit(self._run, event, self.bus.clock.now(), attempt)
+
+    def _run(self, event: dict, enqueued_at: float, attempt: int):
+        from fake_aws import FakeLambdaContext
+
+        clock = self.bus.clock
+        start = clock.now()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.peak_running = max(self.peak_running, self.running)
+            self.queue_waits.append(start - enqueued_at)
+        status = "error"
+        try:
+            result = self.handler(event, FakeLambdaContext(self.timeout_seconds * clock.time_scale))
+            status = (result or {}).get("status", "ok")
+        except Exception as e:
+            with self._lock:
+                self.errors[type(e).__name__] += 1
+            if attempt < len(LAMBDA_RETRY_DELAYS_SECONDS):
+                with self._lock:
+                    self.retries += 1
+                self.bus.call_later(LAMBDA_RETRY_DELAYS_SECONDS[attempt], lambda: self.invoke_async(event, attempt + 1))
+        finally:
+            duration = clock.now() - start
+            with self._lock:
+                self.running -= 1
+                self.durations.append(duration)
+                self.statuses[status] += 1
+                self.timeouts += duration > self.timeout_seconds
+            self.bus.end()
+
+    def report(self) -> dict:
+        return {
+            "invocations": len(self.durations),
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "concurrency_limit": self.concurrency,
+            "peak_running": self.peak_running,
+            "peak_queued": self.peak_queued,
+            "queue_wait_s": _percentiles(self.queue_waits),
+            "duration_s": _percentiles(self.durations),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class Timeline:
+    """Instante simulado da primeira ocorrência de cada etapa por vídeo."""
+
+    STAGES = ("uploaded", "transcribe_started", "srt_written", "summary_written")
+
+    def __init__(self, clock: SimClock):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.marks = {}
+
+    def mark(self, base_name: str, stage: str):
+        now = self.clock.now()
+        with self._lock:
+            self.marks.setdefault(base_name, {}).setdefault(stage, now)
+
+    def durations(self, start: str, end: str) -> list:
+        with self._lock:
+            return [m[end] - m[start] for m in self.marks.values() if start in m and end in m]
+
+
+def build_fakes(args, clock: SimClock, bus: EventBus, timeline: Timeline, srt_by_video: dict):
+    """Fakes de fake_aws.py com eventos, atrasos e throttling da simulação."""
+    from fake_aws import FakeAws, FakeBedrock, FakeS3, FakeTranscribe, client_error, s3_object_created_event
+
+    def s3_delay():
+        clock.sleep(args.s3_latency_ms / 1000.0)
+
+    def observe_write(key: str):
+        filename = key.split("/")[-1]
+        if key.startswith(VIDEO_PREFIX):
+            timeline.mark(filename.rsplit(".", 1)[0], "uploaded")
+        elif key.startswith(SUMMARY_PREFIX) and filename.endswith(".md") and not filename.endswith(".partial.md"):
+            timeline.mark(filename[:-len(".md")].rsplit("-", 1)[0], "summary_written")
+
+    class SimS3(FakeS3):
+        """S3 que publica Object Created/Deleted no barramento (como a notificação para o EventBridge)."""
+
+        def _created(self, bucket: str, key: str, etag: str):
+            observe_write(key)
+            bus.publish(s3_object_created_event(bucket, key, etag.strip('"')))
+
+        def _deleted(self, bucket: str, key: str):
+            bus.publish({
+                "source": "aws.s3",
+                "detail-type": "Object Deleted",
+                "detail": {"bucket": {"name": bucket}, "object": {"key": key}},
+            })
+
+        def put_object(self, Bucket, Key, **kwargs):
+            s3_delay()
+            response = super().put_object(Bucket, Key, **kwargs)
+            self._created(Bucket, Key, response["ETag"])
+            return response
+
+        def copy_object(self, Bucket, Key, CopySource, **kwargs):
+            s3_delay()
+            response = super().copy_object(Bucket, Key, CopySource, **kwargs)
+            self._created(Bucket, Key, response["CopyObjectResult"]["ETag"])
+            return response
+
+        def delete_object(self, Bucket, Key, **kwargs):
+            s3_delay()
+            existed = (Bucket, Key) in self.objects
+            response = super().delete_object(Bucket, Key, **kwargs)
+            if existed:
+                self._deleted(Bucket, Key)
+            return response
+
+        def delete_objects(self, Bucket, Delete, **kwargs):
+            s3_delay()
+            existing = [item["Key"] for item in Delete.get("Objects", []) if (Bucket, item["Key"]) in self.objects]
+            response = super().delete_objects(Bucket, Delete, **kwargs)
+            for key in existing:
+                self._deleted(Bucket, key)
+            return response
+
+        def get_object(self, Bucket, Key, **kwargs):
+            s3_delay()
+            return super().get_object(Bucket, Key, **kwargs)
+
+        def head_object(self, Bucket, Key, **kwargs):
+            s3_delay()
+            return super().head_object(Bucket, Key, **kwargs)
+
+        def list_objects_v2(self, Bucket, **kwargs):
+            s3_delay()
+            return super().list_objects_v2(Bucket, **kwargs)
+
+    class SimTranscribe(FakeTranscribe):
+        """Job termina após transcribe_delay + factor × duração: grava o SRT e emite o fim do job."""
+
+        def __init__(self, counter, max_concurrent: int):
+            super().__init__(counter, max_concurrent)
+            self.peak_active = 0
+            self.limit_exceeded = 0
+
+        def start_transcription_job(self, TranscriptionJobName, **kwargs):
+            try:
+                response = super().start_transcription_job(TranscriptionJobName, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.limit_exceeded += 1
+                raise
+            with self._lock:
+                active = sum(1 for status in self.jobs.values() if status in ("QUEUED", "IN_PROGRESS"))
+                self.peak_active = max(self.peak_active, active)
+            video_key = kwargs["Media"]["MediaFileUri"].split("/", 3)[3]
+            base_name = video_key.split("/")[-1].rsplit(".", 1)[0]
+            timeline.mark(base_name, "transcribe_started")
+            minutes, srt_bytes = srt_by_video[base_name]
+            output_key = f"{kwargs['OutputKey']}{TranscriptionJobName}.srt"
+
+            def finish():
+                fakes.s3.put_object(Bucket=kwargs["OutputBucketName"], Key=output_key, Body=srt_bytes)
+                timeline.mark(base_name, "srt_written")
+                self.complete(TranscriptionJobName)
+                bus.publish({
+                    "source": "aws.transcribe",
+                    "detail-type": "Transcribe Job State Change",
+                    "detail": {"TranscriptionJobName": TranscriptionJobName, "TranscriptionJobStatus": "COMPLETED"},
+                })
+
+            bus.call_later(args.transcribe_delay + args.transcribe_factor * minutes * 60, finish)
+            return response
+
+    class SimBedrock(FakeBedrock):
+        """Latência fixa + por token de saída; throttling aleatório e acima do teto de simultâneas."""
+
+        def __init__(self, counter):
+            super().__init__(counter, output_chars=int(args.bedrock_output_tokens * 3.5))
+            self._lock = threading.Lock()
+            self._rng = random.Random(args.seed)
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.throttled = 0
+
+        def converse(self, modelId, messages, system=None, inferenceConfig=None, **kwargs):
+            with self._lock:
+                over_limit = args.bedrock_max_concurrency and self.in_flight >= args.bedrock_max_concurrency
+                if over_limit or self._rng.random() < args.bedrock_throttle_rate:
+                    self.throttled += 1
+                    self.counter.add("bedrock.converse_throttled")
+                    raise client_error("ThrottlingException", "Converse")
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                clock.sleep((args.bedrock_latency_ms + args.bedrock_ms_per_token * args.bedrock_output_tokens) / 1000.0)
+                return super().converse(modelId, messages, system=system, inferenceConfig=inferenceConfig, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+
+    fakes = FakeAws(transcribe_max_concurrent=args.transcribe_quota)
+    fakes.s3 = SimS3(fakes.counter)
+    fakes.transcribe = SimTranscribe(fakes.counter, args.transcribe_quota)
+    fakes.bedrock = SimBedrock(fakes.counter)
+    return fakes
+
+
+def run(args) -> dict:
+    configure_environment(args)
+    import lambda_bedrock_summary as summary
+    import lambda_function as transcribe
+    from synthetic import generate_srt
+
+    # SRTs gerados antes do relógio começar (conteúdo distinto por vídeo: sem hits no cache de resumos)
+    videos = []
+    srt_by_video = {}
+    for index in range(args.uploads):
+        base_name = f"video{index:04d}"
+        minutes = args.minutes[index % len(args.minutes)]
+        srt_by_video[base_name] = (minutes, generate_srt(minutes, seed=args.seed * 100003 + index).encode("utf-8"))
+        videos.append(base_name)
+
+    clock = SimClock(args.time_scale)
+    bus = EventBus(clock)
+    timeline = Timeline(clock)
+    fakes = build_fakes(args, clock, bus, timeline, srt_by_video)
+    fakes.install(summary)
+    fakes.install(transcribe)
+    transcribe.TRANSCRIBE_QUEUE_URL = QUEUE_URL
+
+    transcribe_fn = SimulatedLambda("start-transcribe", transcribe.lambda_handler, args.transcribe_concurrency, TRANSCRIBE_TIMEOUT_SECONDS, bus)
+    summary_fn = SimulatedLambda("bedrock-summary", summary.lambda_handler, args.summary_concurrency, SUMMARY_TIMEOUT_SECONDS, bus)
+
+    def s3_event(detail_type: str, *patterns):
+        """Regra S3 do EventBridge: (prefixo, sufixo) como os filtros wildcard "prefixo*sufixo" do main.tf."""
+        def matches(event):
+            key = event.get("detail", {}).get("object", {}).get("key", "")
+            return event.get("source") == "aws.s3" and event.get("detail-type") == detail_type and any(
+                key.startswith(prefix) and key.endswith(suffix) for prefix, suffix in patterns
+            )
+        return matches
+
+    bus.add_rule("s3-video-upload-to-transcribe", s3_event("Object Created", (VIDEO_PREFIX, "")), transcribe_fn)
+    bus.add_rule("s3-srt-created-to-bedrock-summary", s3_event("Object Created", (TRANSCRIBE_PREFIX, ".srt")), summary_fn)
+    bus.add_rule(
+        "s3-output-deleted-to-bedrock-summary",
+        s3_event("Object Deleted", (TRANSCRIBE_PREFIX, ".srt"), (SUMMARY_PREFIX, ".md")),
+        summary_fn,
+    )
+    bus.add_rule(
+        "transcribe-job-finished-drain-queue",
+        lambda e: e.get("source") == "aws.transcribe" and e["detail"].get("TranscriptionJobStatus") in ("COMPLETED", "FAILED"),
+        transcribe_fn,
+    )
+    bus.add_rule("transcribe-queue-drain-schedule", lambda e: e.get("detail-type") == "Scheduled Event", transcribe_fn)
+
+    def drain_schedule():
+        bus.publish({"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}})
+        bus.call_later(DRAIN_SCHEDULE_SECONDS, drain_schedule, counted=False)
+
+    bus.call_later(DRAIN_SCHEDULE_SECONDS, drain_schedule, counted=False)
+
+    sqs_peak = 0
+    for index, base_name in enumerate(videos):
+        upload = lambda key=f"{VIDEO_PREFIX}{base_name}.mp4": fakes.s3.put_object(
+            Bucket=BUCKET, Key=key, Body=key.encode("utf-8"), ContentType="video/mp4"
+        )
+        bus.call_later(index / args.arrival_rate if args.arrival_rate > 0 else 0, upload)
+
+    # Fim: nada na fila/executando, nenhum timer de job e fila SQS vazia (ou --max-seconds)
+    while clock.now() < args.max_seconds:
+        sqs_depth = len(fakes.sqs.visible) + len(fakes.sqs.in_flight)
+        sqs_peak = max(sqs_peak, sqs_depth)
+        if bus.outstanding == 0 and sqs_depth == 0:
+            break
+        time.sleep(0.01)
+    elapsed = clock.now()
+    bus.stop()
+    transcribe_fn.shutdown()
+    summary_fn.shutdown()
+
+    completed = timeline.durations("uploaded", "summary_written")
+    return {
+        "uploads": args.uploads,
+        "completed": len(completed),
+        "incomplete": args.uploads - len(completed),
+        "simulated_seconds": round(elapsed, 1),
+        "time_scale": args.time_scale,
+        "throughput_per_min": round(len(completed) / elapsed * 60, 2) if elapsed > 0 else None,
+        "end_to_end_s": _percentiles(completed),
+        "stages_s": {
+            "upload_to_transcribe_start": _percentiles(timeline.durations("uploaded", "transcribe_started")),
+            "transcription": _percentiles(timeline.durations("transcribe_started", "srt_written")),
+            "srt_to_summary": _percentiles(timeline.durations("srt_written", "summary_written")),
+        },
+        "lambdas": {fn.name: fn.report() for fn in (transcribe_fn, summary_fn)},
+        "transcribe": {
+            "peak_active_jobs": fakes.transcribe.peak_active,
+            "limit_exceeded": fakes.transcribe.limit_exceeded,
+            "sqs_peak_depth": sqs_peak,
+        },
+        "bedrock": {
+            "calls": fakes.calls.get("bedrock.converse", 0),
+            "throttled": fakes.bedrock.throttled,
+            "peak_in_flight": fakes.bedrock.peak_in_flight,
+        },
+        "events": dict(bus.published),
+        "aws_calls": dict(sorted(fakes.calls.items())),
+    }
+
+
+def _fmt(stats: dict) -> str:
+    if not stats["count"]:
+        return "-"
+    return f"p50={stats['p50']:.1f} p90={stats['p90']:.1f} p99={stats['p99']:.1f} max={stats['max']:.1f} (n={stats['count']})"
+
+
+def print_report(report: dict):
+    print(
+        f"Uploads: {report['uploads']}  concluídos: {report['completed']}  incompletos: {report['incomplete']}  "
+        f"tempo simulado: {report['simulated_seconds']} s  vazão: {report['throughput_per_min']} resumos/min"
+    )
+    print(f"{'latência (s simulados)':<34} {_fmt(report['end_to_end_s'])}")
+    for stage, stats in report["stages_s"].items():
+        print(f"  {stage:<32} {_fmt(stats)}")
+    for name, fn in report["lambdas"].items():
+        print(
+            f"Lambda {name}: invocações={fn['invocations']} status={json.dumps(fn['statuses'], sort_keys=True)} "
+            f"erros={sum(fn['errors'].values())} retries={fn['retries']} timeouts={fn['timeouts']} "
+            f"pico={fn['peak_running']}/{fn['concurrency_limit']} fila_pico={fn['peak_queued']}"
+        )
+        print(f"  {'espera na fila':<32} {_fmt(fn['queue_wait_s'])}")
+        print(f"  {'duração':<32} {_fmt(fn['duration_s'])}")
+    t, b = report["transcribe"], report["bedrock"]
+    print(f"Transcribe: pico de jobs={t['peak_active_jobs']} LimitExceeded={t['limit_exceeded']} fila SQS pico={t['sqs_peak_depth']}")
+    print(f"Bedrock: chamadas={b['calls']} throttled={b['throttled']} pico simultâneas={b['peak_in_flight']}")
+    print(f"Chamadas AWS: {json.dumps(report['aws_calls'], sort_keys=True)}")
+
+
+def main():
+    args = parse_args()
+    if args.verbose:
+        report = run(args)
+    else:
+        # Logs dos handlers descartados (todas as threads escrevem no sys.stdout trocado)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
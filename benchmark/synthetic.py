@@ -0,0 +1,69 @@
+"""
+Gerador de SRTs sintéticos no formato do Amazon Transcribe (pt-BR), para benchmarks offline.
+
+As legendas imitam fala real de palestra: frases quebradas entre legendas, palavras repetidas
+na fronteira entre legendas e vícios de linguagem ("né", "tipo,", "então,", "é...").
+"""
+
+import random
+
+# ~20 legendas por minuto (uma a cada ~3 s), como nas transcrições do Transcribe
+CUES_PER_MINUTE = 20
+
+_SENTENCES = [
+    "então, a ideia aqui é mostrar como a gente montou o pipeline serverless na AWS",
+    "o vídeo chega no bucket e o EventBridge dispara a Lambda de transcrição",
+    "tipo, o Transcribe gera o arquivo SRT com as legendas e os timestamps",
+    "depois a segunda Lambda lê a legenda e chama o Bedrock pra gerar o resumo, né",
+    "é... o custo principal fica no modelo, então vale a pena reduzir os tokens de entrada",
+    "a gente testou Claude Haiku, Nova Lite e DeepSeek R1 com o mesmo prompt",
+    "o resultado é um Markdown com seções, tabelas e diagramas Mermaid",
+    "né, e o frontend é estático, hospedado no S3 com CloudFront na frente",
+    "uma coisa importante é configurar o inference profile pra chamadas cross-region",
+    "tipo, quando chega muita requisição ao mesmo tempo aparece throttling",
+    "então a gente colocou retry com backoff e um limite de concorrência",
+    "hã, outra questão é o tempo de timeout da Lambda pra vídeos muito longos",
+    "os guardrails ficam num arquivo markdown empacotado junto com a função",
+    "é... e cada vídeo pode ter um prompt personalizado enviado pelo usuário",
+    "bom, vamos pra demonstração agora pra vocês verem funcionando",
+]
+_FILLERS = ["né", "tipo,", "então,", "é...", "hã", "assim,"]
+
+
+def _timestamp(ms: int) -> str:
+    hours, rem = divmod(ms, 3_600_000)
+    minutes, rem = divmod(rem, 60_000)
+    seconds, millis = divmod(rem, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+def generate_srt(minutes: float, seed: int = 42) -> str:
+    """Gera um SRT sintético com a duração indicada (em minutos de fala)."""
+    rng = random.Random(seed)
+    total_cues = max(1, int(minutes * CUES_PER_MINUTE))
+    words = []
+    while len(words) < total_cues * 9:
+        sentence = rng.choice(_SENTENCES).split()
+        if rng.random() < 0.3:
+            sentence.insert(rng.randrange(len(sentence)), rng.choice(_FILLERS))
+        if rng.random() < 0.1:
+            i = rng.randrange(len(sentence))
+            sentence.insert(i, sentence[i])  # disfluência: palavra repetida
+        sentence[-1] += "."
+        words.extend(sentence)
+
+    cues = []
+    position = 0
+    start_ms = 0
+    for index in range(1, total_cues + 1):
+        size = rng.randint(7, 11)
+        text_words = words[position : position + size]
+        # Sobreposição na fronteira: o Transcribe às vezes repete 1-2 palavras da legenda anterior
+        overlap = rng.choice((0, 0, 0, 1, 2)) if position else 0
+        if overlap:
+            text_words = words[position - overlap : position] + text_words
+        position += size
+        end_ms = start_ms + rng.randint(2500, 3500)
+        cues.append(f"{index}\n{_timestamp(start_ms)} --> {_timestamp(end_ms)}\n{' '.join(text_words)}\n")
+        start_ms = end_ms
+    return "\n".join(cues)
@@ -0,0 +1,527 @@
+"""
+Backfill de resumos: reprocessa as legendas canônicas do bucket (model/transcribe/*.srt) depois de
+um modelo novo em app/models.json ou de uma mudança em prompt/guardrails.md, sem reenviar vídeos.
+
+Reaproveita o módulo da Lambda de resumo (terraform/lambda/lambda_bedrock_summary.py): leitura
+do SRT/transcrição limpa, system prompt, ledger de idempotência, cache de resumos, Bedrock (retry,
+fallback e map-reduce), gravação do resumo e manifesto/catálogo. A legenda não é copiada (a cópia
+geraria um evento Object Created para a Lambda). Uso (na raiz do repositório, com credenciais AWS):
+
+    python script/backfill_summaries.py --bucket meu-bucket --dry-run
+    python script/backfill_summaries.py --bucket meu-bucket --models-file app/models.json --workers 4 --rate 1
+    python script/backfill_summaries.py --bucket meu-bucket --model amazon.nova-2-lite-v1:0 --match 'Community*'
+
+- Listagem paginada de model/transcribe/*.srt (originais meetup-*-timestamp.srt ficam para a Lambda)
+- Pool de --workers legendas em paralelo; --rate/--burst limitam as chamadas ao Bedrock por segundo
+  (token bucket do módulo, compartilhado por todas as threads, inclusive os chunks do map-reduce)
+- Checkpoint em JSONL (--checkpoint): cada legenda concluída é anotada com o ETag e os modelos; ao
+  rodar de novo ela é pulada (--restart ignora o arquivo). Legenda alterada (ETag novo) ou com
+  falha em algum modelo é reprocessada; o ledger e o cache evitam refazer o que já deu certo
+- --dry-run: só leituras; estima chamadas, tokens e custo por modelo (pula o que o ledger ou o
+  cache de resumos já cobrem). Preços de referência em USD por 1M tokens do registro de modelos
+  (pricePerMTok em terraform/lambda/model_registry.json), sobrescritos com --prices arquivo.json;
+  prompt caching não é descontado (limite superior)
+- Relatório de throughput no fim (legendas/min, latência p50/p95, tokens e custo) e --report JSON
+- --seed-catalog: semeia manifestos e model/catalog.json com as legendas e resumos já existentes
+  (listagem única de model/transcribe/ e model/resumo/) e marca o catálogo como completo; a partir
+  daí o app lista só pelo catálogo. Não chama o Bedrock
+
+Sem --model/--models-file vale a config de cada vídeo (model/models/{base}.json) ou o roteamento por
+tamanho, como na Lambda.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(ROOT_DIR, "terraform", "lambda")
+
+# Preâmbulo fixo da mensagem do usuário (instruções antes da transcrição), em tokens estimados
+PREAMBLE_TOKENS = 120
+
+CHECKPOINT_DONE_STATUSES = ("summary_created", "skipped_duplicate", "empty_transcript")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bucket", default=os.environ.get("BUCKET_NAME"), help="bucket do pipeline (padrão: $BUCKET_NAME)")
+    parser.add_argument("--region", default=os.environ.get("AWS_REGION", "us-east-2"))
+    parser.add_argument("--model-prefix", default="model/", help="prefixo do pipeline no bucket (MODEL_PREFIX)")
+    parser.add_argument("--match", help="glob sobre o nome base do vídeo (ex.: 'Community*')")
+    parser.add_argument("--limit", type=int, help="processa no máximo N legendas")
+    parser.add_argument("--model", action="append", default=[], help="id do modelo (repetível); padrão: config de cada vídeo")
+    parser.add_argument("--models-file", help="JSON no formato de app/models.json ({\"models\": [...]})")
+    parser.add_argument("--workers", type=int, default=4, help="legendas processadas em paralelo")
+    parser.add_argument("--rate", type=float, default=1.0, help="chamadas ao Bedrock por segundo (todas as threads)")
+    parser.add_argument("--burst", type=int, default=2, help="rajada máxima de chamadas ao Bedrock")
+    parser.add_argument("--timeout", type=float, default=900, help="tempo máximo por legenda, em segundos (retries/backoff)")
+    parser.add_argument("--checkpoint", default=".backfill-checkpoint.jsonl", help="arquivo de checkpoint (JSONL)")
+    parser.add_argument("--restart", action="store_true", help="ignora o checkpoint existente")
+    parser.add_argument("--dry-run", action="store_true", help="só estima tokens e custo (nenhuma escrita)")
+    parser.add_argument("--output-tokens", type=int, default=1500, help="tokens de saída estimados por chamada (dry-run)")
+    parser.add_argument("--prices", help='JSON {"trecho do model id": [entrada, saída]} em USD por 1M tokens')
+    parser.add_argument("--guardrails", default=os.path.join(ROOT_DIR, "prompt", "guardrails.md"))
+    parser.add_argument("--report", help="grava o relatório em JSON neste caminho")
+    parser.add_argument("--seed-catalog", action="store_true", help="semeia o catálogo com o acervo existente e sai")
+    parser.add_argument("--verbose", action="store_true", help="logs detalhados do módulo da Lambda (OBSERVABILITY_TRACE)")
+    args = parser.parse_args()
+    if not args.bucket:
+        parser.error("informe --bucket ou defina BUCKET_NAME")
+    if args.model and args.models_file:
+        parser.error("use --model ou --models-file, não os dois")
+    return args
+
+
+def load_summary_module(args):
+    """Importa o módulo da Lambda com o ambiente equivalente ao da função (lido no import)."""
+    os.environ["SUMMARY_OUTPUT_BUCKET"] = args.bucket
+    os.environ["SUMMARY_OUTPUT_PREFIX"] = f"{args.model_prefix}resumo/"
+    os.environ["MODEL_PREFIX"] = args.model_prefix
+    os.environ["BEDROCK_RATE_PER_SECOND"] = str(args.rate)
+    os.environ["BEDROCK_BURST"] = str(args.burst)
+    os.environ["GUARDRAILS_PATH"] = args.guardrails
+    os.environ.setdefault("AWS_DEFAULT_REGION", args.region)
+    os.environ.setdefault("OBSERVABILITY_METRICS", "0")
+    if args.verbose:
+        os.environ["OBSERVABILITY_TRACE"] = "1"
+    sys.path.insert(0, LAMBDA_DIR)
+    import lambda_bedrock_summary
+
+    size_client_pools(lambda_bedrock_summary, args.workers)
+    return lambda_bedrock_summary
+
+
+def size_client_pools(summary, workers: int):
+    """
+    Pools de conexão para --workers legendas em paralelo: o módulo dimensiona os clients para uma
+    invocação (fan-out x trechos no Bedrock, S3IOExecutor no S3); aqui multiplica pelos workers.
+    """
+    workers = max(1, workers)
+    pools = {
+        "bedrock_client": workers * summary.MODEL_FANOUT_CONCURRENCY * summary.CHUNK_CONCURRENCY,
+        "s3_client": workers * summary.S3_IO_CONCURRENCY * 2,
+    }
+    for attribute, size in pools.items():
+        client = getattr(summary, attribute)
+        if size > client.config_kwargs.get("max_pool_connections", 10):
+            setattr(summary, attribute, summary.lazy_client(
+                client.service_name,
+                region_name=client.region_name,
+                **{**client.config_kwargs, "max_pool_connections": size},
+            ))
+
+
+def load_model_configs(summary, args):
+    """Configs explícitas (--model/--models-file) normalizadas como na Lambda; None = config por vídeo."""
+    if args.models_file:
+        with open(args.models_file, encoding="utf-8") as f:
+            data = json.load(f)
+        entries = data["models"] if isinstance(data, dict) else data
+    elif args.model:
+        entries = [{"id": model_id} for model_id in args.model]
+    else:
+        return None
+    configs, slugs = [], set()
+    for entry in entries:
+        cfg = summary._parse_model_config(entry)
+        slug = summary.get_model_slug(cfg["id"])
+        if slug not in slugs:
+            slugs.add(slug)
+            configs.append(cfg)
+    return configs
+
+
+def load_prices(path: str) -> dict:
+    """Preços de --prices (trecho do model id → [entrada, saída]); sem arquivo valem os do registro."""
+    prices = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            prices.update({k: tuple(v) for k, v in json.load(f).items()})
+    return prices
+
+
+def price_for(summary, prices: dict, model_id: str):
+    """(entrada, saída) do trecho mais longo de --prices contido no model id, senão do registro; None se não há preço."""
+    matches = [pattern for pattern in prices if pattern in model_id.lower()]
+    if matches:
+        return prices[max(matches, key=len)]
+    return summary.get_model_spec(model_id)["pricePerMTok"]
+
+
+def estimate_cost(summary, prices: dict, model_id: str, input_tokens: int, output_tokens: int):
+    price = price_for(summary, prices, model_id)
+    if price is None:
+        return None
+    return input_tokens / 1e6 * price[0] + output_tokens / 1e6 * price[1]
+
+
+def list_canonical_srts(summary, bucket: str, model_prefix: str, match: str = None) -> tuple:
+    """Legendas canônicas em {prefix}transcribe/ (listagem paginada). Retorna (legendas, originais ignorados)."""
+    paginator = summary.s3_client.get_paginator("list_objects_v2")
+    items, originals = [], 0
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{model_prefix}transcribe/"):
+        for obj in page.get("Contents", []):
+            key = obj["Key"]
+            filename = key.split("/")[-1]
+            if not filename.endswith(".srt"):
+                continue
+            if filename.startswith("meetup-"):
+                originals += 1
+                continue
+            base_name = filename[:-len(".srt")]
+            if match and not fnmatch.fnmatch(base_name, match):
+                continue
+            items.append({"key": key, "etag": obj.get("ETag", "").strip('"'), "size": obj.get("Size", 0), "base_name": base_name})
+    return items, originals
+
+
+def list_summary_keys(summary, bucket: str, model_prefix: str) -> list:
+    """Resumos definitivos em {prefix}resumo/ (sem os .partial.md do streaming)."""
+    paginator = summary.s3_client.get_paginator("list_objects_v2")
+    keys = []
+    for page in paginator.paginate(Bucket=bucket, Prefix=f"{model_prefix}resumo/"):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith(".md") and not obj["Key"].endswith(".partial.md"):
+                keys.append(obj["Key"])
+    return keys
+
+
+def split_summary_filename(summary, filename: str, base_names: set) -> tuple:
+    """
+    (nome base, slug) de {base}-{slug}.md: slugs do registro de modelos primeiro (podem ter hífen),
+    depois as legendas conhecidas e, por fim, o último hífen.
+    """
+    stem = filename[:-len(".md")]
+    slugs = {summary.get_model_slug(alias) for alias in list(summary._MODEL_REGISTRY)}
+    for slug in sorted(slugs, key=len, reverse=True):
+        if stem.endswith(f"-{slug}") and len(stem) > len(slug) + 1:
+            return stem[:-len(slug) - 1], slug
+    for base_name in sorted(base_names, key=len, reverse=True):
+        if stem.startswith(f"{base_name}-"):
+            return base_name, stem[len(base_name) + 1:]
+    base_name, _, slug = stem.rpartition("-")
+    return (base_name, slug) if base_name else (None, None)
+
+
+def seed_catalog(summary, args) -> int:
+    """
+    Semeia manifestos e catálogo com o acervo anterior ao catálogo (uma listagem dos prefixos) e
+    marca o catálogo como completo. Entradas já registradas pelas Lambdas não são alteradas.
+    """
+    items, _ = list_canonical_srts(summary, args.bucket, args.model_prefix, args.match)
+    base_names = {item["base_name"] for item in items}
+    found = {base_name: {"srt_key": None, "summaries": {}} for base_name in base_names}
+    for item in items:
+        found[item["base_name"]]["srt_key"] = item["key"]
+    for key in list_summary_keys(summary, args.bucket, args.model_prefix):
+        base_name, slug = split_summary_filename(summary, key.split("/")[-1], base_names)
+        if base_name is None or (args.match and not fnmatch.fnmatch(base_name, args.match)):
+            continue
+        found.setdefault(base_name, {"srt_key": None, "summaries": {}})["summaries"][slug] = key
+    print(f"[SEED] {len(found)} vídeos ({len(items)} legendas) em s3://{args.bucket}/{args.model_prefix}{' dry-run' if args.dry_run else ''}")
+    if args.dry_run:
+        return 0
+
+    manifests = summary.PipelineManifest(summary.s3_client, args.bucket, args.model_prefix)
+
+    def _seed(base_name: str, entry: dict):
+        def mutate(manifest: dict):
+            changed = False
+            if entry["srt_key"] and not manifest["transcript"].get("srt_key"):
+                manifest["transcript"].update(srt_key=entry["srt_key"], updated_at=summary.now_iso())
+                changed = True
+            for slug, key in entry["summaries"].items():
+                if slug not in manifest["summaries"]:
+                    manifest["summaries"][slug] = {"key": key, "status": "created", "seeded": True, "updated_at": summary.now_iso()}
+                    changed = True
+            return None if changed else False
+
+        return manifests.update(base_name, mutate)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(pool.map(lambda kv: _seed(*kv), sorted(found.items())))
+    failed = sum(1 for manifest in results if manifest is None)
+    if failed or args.match:
+        # Catálogo só é completo com todo o acervo semeado
+        print(f"[SEED] Catálogo não marcado como completo (falhas={failed}{', --match' if args.match else ''})")
+        return 1 if failed else 0
+    manifests.mark_catalog_complete()
+    print(f"[SEED] Catálogo s3://{args.bucket}/{manifests.catalog_key} marcado como completo")
+    return 0
+
+
+class Checkpoint:
+    """JSONL append-only: uma linha por legenda concluída (key, ETag, modelos pedidos, resultado)."""
+
+    def __init__(self, path: str, models_signature: str, restart: bool = False):
+        self.path = path
+        self.models_signature = models_signature
+        self._lock = threading.Lock()
+        self._done = set()
+        if restart and os.path.exists(path):
+            os.remove(path)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Última linha truncada por um crash no meio da escrita
+                        continue
+                    if record.get("status") in CHECKPOINT_DONE_STATUSES and not record.get("failed_models"):
+                        self._done.add((record["key"], record.get("etag"), record.get("model_set")))
+
+    def is_done(self, item: dict) -> bool:
+        return (item["key"], item["etag"], self.models_signature) in self._done
+
+    def record(self, item: dict, outcome: dict):
+        line = json.dumps({"key": item["key"], "etag": item["etag"], "model_set": self.models_signature, **outcome}, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class _Deadline:
+    """Substitui o context da Lambda: tempo restante para retries/backoff de uma legenda."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.time() + seconds
+
+    def get_remaining_time_in_millis(self) -> int:
+        return int(max(0.0, self.expires_at - time.time()) * 1000)
+
+
+def estimate_model_usage(summary, plain_text: str, system_prompt: str, model_config: dict, output_tokens: int) -> tuple:
+    """(chamadas, tokens de entrada, tokens de saída) estimados, seguindo o roteamento de call_bedrock_nova."""
+    system_tokens = summary.estimate_tokens(system_prompt)
+
+    def _call_output(message_tokens: int) -> int:
+        # maxTokens da chamada cresce com a mensagem (get_max_output_tokens)
+        return min(output_tokens, summary.get_max_output_tokens(model_config["id"], model_config, message_tokens))
+
+    chunking = summary.get_chunking_config(model_config)
+    transcript_tokens = summary.estimate_tokens(plain_text)
+    if transcript_tokens <= chunking["thresholdTokens"]:
+        message_tokens = PREAMBLE_TOKENS + transcript_tokens
+        return 1, system_tokens + message_tokens, _call_output(message_tokens)
+    chunks = summary.split_transcript_into_chunks(plain_text, chunking["chunkTokens"], chunking["overlapTokens"])
+    map_messages = [PREAMBLE_TOKENS + summary.estimate_tokens(chunk) for chunk in chunks]
+    map_outputs = [_call_output(tokens) for tokens in map_messages]
+    # Reduce: system prompt + preâmbulo + os resumos parciais
+    reduce_message = PREAMBLE_TOKENS + sum(map_outputs)
+    return (
+        len(chunks) + 1,
+        len(chunks) * system_tokens + sum(map_messages) + system_tokens + reduce_message,
+        sum(map_outputs) + _call_output(reduce_message),
+    )
+
+
+def _summary_cache_exists(summary, bucket: str, cache_key: str) -> bool:
+    try:
+        summary.s3_client.head_object(Bucket=bucket, Key=f"{summary.SUMMARY_CACHE_PREFIX}{cache_key}.md")
+        return True
+    except summary.ClientError:
+        return False
+
+
+def dry_run_item(summary, args, item: dict, model_configs, prices: dict) -> dict:
+    """Estimativa de uma legenda, só com leituras (prompt, ledger e, se há pendentes, SRT ou transcrição limpa e cache)."""
+    bucket, base_name = args.bucket, item["base_name"]
+    system_prompt = summary.get_system_prompt(base_name, bucket)
+    configs = model_configs or summary.get_selected_model_configs(base_name, bucket)
+    store = summary.get_idempotency_store(bucket)
+    models, pending = {}, []
+    # Mesma chave da Lambda: ETag da legenda + config como configurada ("auto" antes do roteamento)
+    for cfg in configs:
+        idempotency_key = summary.compute_idempotency_key(item["etag"], cfg, system_prompt)
+        if store is not None and summary.check_idempotency(store, idempotency_key):
+            models[cfg["id"]] = {"status": "skipped_duplicate", "calls": 0, "inputTokens": 0, "outputTokens": 0, "cost_usd": 0.0}
+        else:
+            pending.append(cfg)
+    if not pending:
+        return {"status": "estimated", "source": None, "models": models}
+    srt_doc = summary._load_srt_document(bucket, item["key"], base_name, item["etag"])
+    plain_text = srt_doc.plain_text()
+    if not plain_text.strip():
+        return {"status": "empty_transcript", "models": {}}
+    # Sem config para o vídeo: mesmo roteamento por tamanho da Lambda (estimativa antes da compactação)
+    if any(cfg.get("auto") for cfg in pending):
+        pending = summary.route_model_configs(pending, summary.estimate_tokens(plain_text))
+    plain_text = summary.compact_transcript(plain_text)
+    for cfg in pending:
+        cache_key = summary.compute_summary_cache_key(plain_text, system_prompt, cfg)
+        if summary.SUMMARY_CACHE_ENABLED and _summary_cache_exists(summary, bucket, cache_key):
+            models[cfg["id"]] = {"status": "cached", "calls": 0, "inputTokens": 0, "outputTokens": 0, "cost_usd": 0.0}
+            continue
+        calls, input_tokens, output_tokens = estimate_model_usage(summary, plain_text, system_prompt, cfg, args.output_tokens)
+        models[cfg["id"]] = {
+            "status": "pending",
+            "calls": calls,
+            "inputTokens": input_tokens,
+            "outputTokens": output_tokens,
+            "cost_usd": estimate_cost(summary, prices, cfg["id"], input_tokens, output_tokens),
+        }
+    return {"status": "estimated", "source": srt_doc.source, "models": models}
+
+
+def run_item(summary, args, item: dict, model_configs, prices: dict) -> dict:
+    """Resume uma legenda com summarize_srt_object (mesmo caminho do handler, sem copiar a legenda)."""
+    result = summary.summarize_srt_object(
+        args.bucket, item["key"], _Deadline(args.timeout), item["etag"], model_configs=model_configs, touch_srt=False
+    )
+    models = {}
+    for r in result.get("models", []):
+        usage = r.get("llm_usage", {})
+        models[r["model_id"]] = {
+            "status": "cached" if r["summary_cache"]["hit"] else "created",
+            "calls": usage.get("calls", 0),
+            "inputTokens": usage.get("inputTokens", 0),
+            "outputTokens": usage.get("outputTokens", 0),
+            "cost_usd": estimate_cost(summary, prices, r["model_id"], usage.get("inputTokens", 0), usage.get("outputTokens", 0)),
+        }
+    for model_id in result.get("skipped_models", []):
+        models[model_id] = {"status": "skipped_duplicate", "calls": 0, "inputTokens": 0, "outputTokens": 0, "cost_usd": 0.0}
+    status = result.get("status")
+    return {
+        # Parcial: o checkpoint não marca a legenda como concluída e ela volta na próxima execução
+        "status": "summary_created" if status == "summary_partial" else status,
+        "models": models,
+        "failed_models": result.get("failed_models", {}),
+    }
+
+
+def _percentile(values: list, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def build_report(outcomes: list, elapsed_s: float, args, skipped_checkpoint: int, originals: int) -> dict:
+    by_model, by_status, latencies = {}, {}, []
+    for outcome in outcomes:
+        by_status[outcome["status"]] = by_status.get(outcome["status"], 0) + 1
+        if outcome["status"] != "error":
+            latencies.append(outcome["elapsed_s"])
+        for model_id, m in outcome.get("models", {}).items():
+            totals = by_model.setdefault(model_id, {"files": 0, "calls": 0, "inputTokens": 0, "outputTokens": 0, "cost_usd": 0.0, "statuses": {}})
+            totals["files"] += 1
+            totals["statuses"][m["status"]] = totals["statuses"].get(m["status"], 0) + 1
+            for field in ("calls", "inputTokens", "outputTokens"):
+                totals[field] += m[field]
+            if m["cost_usd"] is None:
+                totals["cost_usd"] = None
+            elif totals["cost_usd"] is not None:
+                totals["cost_usd"] += m["cost_usd"]
+        for model_id in outcome.get("failed_models", {}):
+            totals = by_model.setdefault(model_id, {"files": 0, "calls": 0, "inputTokens": 0, "outputTokens": 0, "cost_usd": 0.0, "statuses": {}})
+            totals["files"] += 1
+            totals["statuses"]["failed"] = totals["statuses"].get("failed", 0) + 1
+    costs = [m["cost_usd"] for m in by_model.values()]
+    input_tokens = sum(m["inputTokens"] for m in by_model.values())
+    output_tokens = sum(m["outputTokens"] for m in by_model.values())
+    return {
+        "mode": "dry_run" if args.dry_run else "backfill",
+        "bucket": args.bucket,
+        "files": len(outcomes),
+        "skipped_checkpoint": skipped_checkpoint,
+        "skipped_originals": originals,
+        "statuses": by_status,
+        "elapsed_s": round(elapsed_s, 2),
+        "files_per_min": round(len(outcomes) / elapsed_s * 60, 2) if elapsed_s > 0 else None,
+        "latency_s": {
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "max": max(latencies) if latencies else None,
+        },
+        "calls": sum(m["calls"] for m in by_model.values()),
+        "inputTokens": input_tokens,
+        "outputTokens": output_tokens,
+        "input_tokens_per_s": round(input_tokens / elapsed_s, 1) if elapsed_s > 0 and not args.dry_run else None,
+        "cost_usd": None if None in costs else round(sum(costs), 4),
+        "models": by_model,
+    }
+
+
+def print_report(report: dict):
+    title = "Estimativa (dry-run)" if report["mode"] == "dry_run" else "Backfill concluído"
+    print(f"\n[BACKFILL] {title}: {report['files']} legendas em {report['elapsed_s']} s ({report['files_per_min']} legendas/min)")
+    print(f"  pulados: checkpoint={report['skipped_checkpoint']} originais meetup-*={report['skipped_originals']}")
+    print(f"  status: {json.dumps(report['statuses'], sort_keys=True)}")
+    latency = report["latency_s"]
+    if latency["p50"] is not None:
+        print(f"  latência por legenda (s): p50={latency['p50']:.1f} p95={latency['p95']:.1f} max={latency['max']:.1f}")
+    if report["input_tokens_per_s"] is not None:
+        print(f"  tokens de entrada/s: {report['input_tokens_per_s']}")
+    print(f"{'modelo':<52} {'legendas':>9} {'chamadas':>9} {'tokens in':>11} {'tokens out':>11} {'USD':>9}  status")
+    for model_id, m in sorted(report["models"].items()):
+        cost = f"{m['cost_usd']:.4f}" if m["cost_usd"] is not None else "?"
+        print(
+            f"{model_id:<52} {m['files']:>9} {m['calls']:>9} {m['inputTokens']:>11} {m['outputTokens']:>11} {cost:>9}  "
+            f"{json.dumps(m['statuses'], sort_keys=True)}"
+        )
+    total = f"{report['cost_usd']:.4f}" if report["cost_usd"] is not None else "? (modelo sem preço no registro nem em --prices)"
+    print(f"  total: chamadas={report['calls']} tokens_in={report['inputTokens']} tokens_out={report['outputTokens']} USD={total}")
+
+
+def main():
+    args = parse_args()
+    summary = load_summary_module(args)
+    if args.seed_catalog:
+        return seed_catalog(summary, args)
+    model_configs = load_model_configs(summary, args)
+    prices = load_prices(args.prices)
+    models_signature = ",".join(cfg["id"] for cfg in model_configs) if model_configs else "per-video"
+
+    items, originals = list_canonical_srts(summary, args.bucket, args.model_prefix, args.match)
+    checkpoint = None if args.dry_run else Checkpoint(args.checkpoint, models_signature, args.restart)
+    pending = [item for item in items if checkpoint is None or not checkpoint.is_done(item)]
+    skipped_checkpoint = len(items) - len(pending)
+    if args.limit is not None:
+        pending = pending[:args.limit]
+    print(
+        f"[BACKFILL] {len(items)} legendas canônicas em s3://{args.bucket}/{args.model_prefix}transcribe/ "
+        f"(pendentes={len(pending)} checkpoint={skipped_checkpoint}) modelos={models_signature} "
+        f"workers={args.workers} rate={args.rate}/s{' dry-run' if args.dry_run else ''}"
+    )
+
+    process = dry_run_item if args.dry_run else run_item
+
+    def _process(item: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            outcome = process(summary, args, item, model_configs, prices)
+        except Exception as e:
+            outcome = {"status": "error", "error": f"{type(e).__name__}: {e}", "models": {}}
+        outcome["elapsed_s"] = round(time.perf_counter() - start, 3)
+        return outcome
+
+    outcomes = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(_process, item): item for item in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            item, outcome = futures[future], future.result()
+            outcomes.append(outcome)
+            if checkpoint is not None and outcome["status"] != "error":
+                checkpoint.record(item, outcome)
+            failed = outcome.get("error") or ", ".join(outcome.get("failed_models", {})) or "-"
+            print(f"[BACKFILL] {done}/{len(pending)} {item['key']} status={outcome['status']} {outcome['elapsed_s']:.1f}s falhas={failed}")
+    report = build_report(outcomes, time.perf_counter() - start, args, skipped_checkpoint, originals)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 1 if report["statuses"].get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
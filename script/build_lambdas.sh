@@ -6,13 +6,16 @@ TF_DIR="${ROOT_DIR}/terraform"
 
 mkdir -p "${TF_DIR}/build"
 
-echo ">> Empacotando lambda_function.py"
+echo ">> Empacotando lambda_function.py + aws_clients.py + observability.py + pipeline_manifest.py"
 cd "${TF_DIR}/lambda"
-zip -q ../build/start_transcribe.zip lambda_function.py
+rm -f ../build/start_transcribe.zip ../build/bedrock_summary.zip
+zip -q ../build/start_transcribe.zip lambda_function.py aws_clients.py observability.py pipeline_manifest.py
 
-echo ">> Empacotando lambda_bedrock_summary.py + guardrails.md (prompt padrão)"
+echo ">> Empacotando lambda_bedrock_summary.py + módulos auxiliares + model_registry.json + guardrails.md (prompt padrão)"
 cp "${ROOT_DIR}/prompt/guardrails.md" "${TF_DIR}/lambda/guardrails.md"
-zip -q ../build/bedrock_summary.zip lambda_bedrock_summary.py guardrails.md
+zip -q ../build/bedrock_summary.zip lambda_bedrock_summary.py aws_clients.py observability.py pipeline_manifest.py \
+  search_index.py srt_parser.py transcript_artifacts.py idempotency.py s3_text_cache.py resilience.py \
+  model_registry.json guardrails.md
 rm -f "${TF_DIR}/lambda/guardrails.md"
 
 echo ">> Lambdas empacotadas em terraform/build/"
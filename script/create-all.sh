@@ -45,6 +45,8 @@ BEDROCK_LOGS_RETENTION_DAYS="${BEDROCK_LOGS_RETENTION_DAYS:-30}"
 CORS_EXTRA_ORIGINS="${CORS_EXTRA_ORIGINS:-}"
 OBSERVABILITY_DEBUG="${OBSERVABILITY_DEBUG:-0}"
 OBSERVABILITY_TRACE="${OBSERVABILITY_TRACE:-0}"
+OBSERVABILITY_METRICS="${OBSERVABILITY_METRICS:-1}"
+PIPELINE_MANIFEST_ENABLED="${PIPELINE_MANIFEST_ENABLED:-1}"
 
 # Limpar state anterior para nova execução
 rm -f "${STATE_FILE}"
@@ -130,6 +132,8 @@ bedrock_logs_retention_days = ${BEDROCK_LOGS_RETENTION_DAYS:-30}
 log_retention_days     = ${LOG_RETENTION_DAYS:-30}
 observability_debug   = "${OBSERVABILITY_DEBUG}"
 observability_trace   = "${OBSERVABILITY_TRACE}"
+observability_metrics = "${OBSERVABILITY_METRICS}"
+pipeline_manifest_enabled = "${PIPELINE_MANIFEST_ENABLED}"
 EOF
 
 # --- 4. Backend Terraform (bucket S3 para state) ---
@@ -0,0 +1,105 @@
+"""
+Clients AWS sob demanda (lazy) a partir de uma única sessão boto3 por container.
+
+O client é declarado no nível do módulo da Lambda, como antes, e só é montado na primeira
+chamada de método:
+
+    s3_client = lazy_client("s3", max_pool_connections=16)
+    ...
+    s3_client.get_object(Bucket=..., Key=...)   # boto3 importado e client criado aqui, uma vez
+
+Importar boto3/botocore.config e montar um client custa centenas de ms no cold start; com
+LAZY_AWS_CLIENTS=1 (padrão) isso só acontece no primeiro uso, então eventos ignorados (key sem a
+extensão esperada, evento sem bucket) retornam sem tocar no boto3. LAZY_AWS_CLIENTS=0 cria os
+clients no import (comportamento anterior, útil para comparar cold starts).
+"""
+
+import os
+import threading
+import time
+
+LAZY_AWS_CLIENTS = os.environ.get("LAZY_AWS_CLIENTS", "1") == "1"
+AWS_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("AWS_CONNECT_TIMEOUT_SECONDS", "5"))
+AWS_READ_TIMEOUT_SECONDS = float(os.environ.get("AWS_READ_TIMEOUT_SECONDS", "30"))
+
+# Session.client() não é thread-safe: sessão e clients são criados sob o mesmo lock
+_LOCK = threading.RLock()
+_SESSION = None
+_CLIENTS = []
+
+# Tempo de criação de cada client (ms), por nome de serviço; lido pelo benchmark de cold start
+CLIENT_INIT_MS = {}
+
+
+def get_session():
+    """Sessão boto3 compartilhada (credenciais, região e modelos de serviço carregados uma vez)."""
+    global _SESSION
+    with _LOCK:
+        if _SESSION is None:
+            import boto3
+
+            _SESSION = boto3.session.Session()
+        return _SESSION
+
+
+class LazyClient:
+    """Proxy de um client boto3: cria o client no primeiro acesso a um atributo/operação."""
+
+    def __init__(self, service_name: str, region_name: str = None, **config_kwargs):
+        self.service_name = service_name
+        self.region_name = region_name
+        self.config_kwargs = {
+            "connect_timeout": AWS_CONNECT_TIMEOUT_SECONDS,
+            "read_timeout": AWS_READ_TIMEOUT_SECONDS,
+            "tcp_keepalive": True,
+            **config_kwargs,
+        }
+        self._client = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._client is not None
+
+    def get(self):
+        client = self._client
+        if client is not None:
+            return client
+        with _LOCK:
+            if self._client is None:
+                from botocore.config import Config
+
+                started = time.perf_counter()
+                self._client = get_session().client(
+                    self.service_name,
+                    region_name=self.region_name,
+                    config=Config(**self.config_kwargs),
+                )
+                CLIENT_INIT_MS[self.service_name] = (time.perf_counter() - started) * 1000
+            return self._client
+
+    def __getattr__(self, name):
+        # Só chamado para atributos que o proxy não tem (operações, exceptions, meta...)
+        return getattr(self.get(), name)
+
+    def __repr__(self):
+        state = "criado" if self.initialized else "lazy"
+        return f"<LazyClient {self.service_name} ({state})>"
+
+
+def lazy_client(service_name: str, region_name: str = None, **config_kwargs) -> LazyClient:
+    """
+    Client com Config explícito: timeouts de conexão/leitura, keep-alive e os parâmetros extras
+    (max_pool_connections, retries, read_timeout...). Criado já no import se LAZY_AWS_CLIENTS=0.
+    """
+    client = LazyClient(service_name, region_name, **config_kwargs)
+    with _LOCK:
+        _CLIENTS.append(client)
+    if not LAZY_AWS_CLIENTS:
+        client.get()
+    return client
+
+
+def initialized_clients() -> list:
+    """Nomes dos serviços cujos clients já foram criados neste container."""
+    with _LOCK:
+        return [c.service_name for c in _CLIENTS if c.initialized]
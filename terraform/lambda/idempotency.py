@@ -0,0 +1,115 @@
+"""
+Ledger de idempotência da Lambda de resumo: um registro por chave de trabalho (legenda, modelo e
+prompt), com status "in_progress" (lease com expires_at), "completed" ou "failed".
+
+Os dois stores têm a mesma interface: get/get_versioned leem o registro e a versão (ETag no S3,
+contador em memória), claim grava só se a versão não mudou desde a leitura e delete libera o
+lease. É o claim condicional que garante um único dono quando a mesma legenda chega em eventos
+simultâneos (retries assíncronos, reentrega do EventBridge): quem perde a escrita trata o evento
+como duplicado. A política (TTL, cooldown de falha, cálculo da chave) fica na Lambda.
+
+- S3IdempotencyStore: marcadores JSON no bucket, com IfNoneMatch="*" / IfMatch=ETag
+- LocalIdempotencyStore: dicionário do container, para testes e execução local
+"""
+
+import itertools
+import json
+import threading
+
+from botocore.exceptions import ClientError
+
+from pipeline_manifest import S3_MISSING_CODES
+
+# Códigos de erro de escrita condicional (IfMatch/IfNoneMatch) perdida para outra invocação
+_CONFLICT_CODES = ("PreconditionFailed", "ConditionalRequestConflict", "412", "409")
+
+
+class S3IdempotencyStore:
+    """Ledger em S3: um marcador JSON pequeno por chave em {prefix}{chave}.json."""
+
+    def __init__(self, s3_client, bucket: str, prefix: str):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, token: str) -> str:
+        return f"{self.prefix}{token}.json"
+
+    def get(self, token: str):
+        return self.get_versioned(token)[0]
+
+    def get_versioned(self, token: str) -> tuple:
+        """Retorna (registro, ETag) do marcador; (None, None) quando ausente ou ilegível."""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self._key(token))
+            return json.loads(response["Body"].read().decode("utf-8")), response.get("ETag")
+        except ClientError as e:
+            # Primeiro evento de cada chave: ausência é o caso normal (AccessDenied quando falta ListBucket)
+            if e.response.get("Error", {}).get("Code") not in S3_MISSING_CODES:
+                print(f"Erro ao ler ledger {self._key(token)}: {e}")
+        except (json.JSONDecodeError, ValueError) as e:
+            print(f"Marcador de ledger inválido em {self._key(token)}: {e}")
+        return None, None
+
+    def put(self, token: str, record: dict):
+        self.s3_client.put_object(
+            Bucket=self.bucket,
+            Key=self._key(token),
+            Body=json.dumps(record).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    def claim(self, token: str, record: dict, etag: str = None) -> bool:
+        """
+        Grava o marcador só se ele não mudou desde a leitura: IfNoneMatch="*" quando não existia,
+        IfMatch=etag quando havia um registro vencido. Retorna False quando outra invocação gravou antes.
+        """
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self._key(token),
+                Body=json.dumps(record).encode("utf-8"),
+                ContentType="application/json",
+                **condition,
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _CONFLICT_CODES:
+                return False
+            raise
+        return True
+
+    def delete(self, token: str):
+        self.s3_client.delete_object(Bucket=self.bucket, Key=self._key(token))
+
+
+class LocalIdempotencyStore:
+    """Ledger em memória (vive enquanto o container estiver quente); usado em testes e desenvolvimento local."""
+
+    def __init__(self):
+        self._records = {}
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, token: str):
+        return self.get_versioned(token)[0]
+
+    def get_versioned(self, token: str) -> tuple:
+        with self._lock:
+            record, version = self._records.get(token, (None, None))
+            return (dict(record), version) if record else (None, None)
+
+    def put(self, token: str, record: dict):
+        with self._lock:
+            self._records[token] = (dict(record), next(self._versions))
+
+    def claim(self, token: str, record: dict, etag=None) -> bool:
+        with self._lock:
+            if self._records.get(token, (None, None))[1] != etag:
+                return False
+            self._records[token] = (dict(record), next(self._versions))
+            return True
+
+    def delete(self, token: str):
+        with self._lock:
+            self._records.pop(token, None)
@@ -1,19 +1,38 @@
+import hashlib
 import json
 import os
+import random
+import re
+import threading
+import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 
-import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
 
-s3_client = boto3.client("s3")
+from aws_clients import lazy_client
+from idempotency import LocalIdempotencyStore, S3IdempotencyStore
+from observability import MetricsRecorder
+from pipeline_manifest import S3_MISSING_CODES, PipelineManifest, now_iso
+from resilience import CircuitBreaker, TokenBucket
+from s3_text_cache import S3TextCache
+from srt_parser import SrtDocument, parse_srt_stream
+from transcript_artifacts import TranscriptArtifacts
+
+# Transcrição limpa persistida ({base}.transcript.json.gz, legendas + hash + ETag do SRT): reprocessar
+# a legenda canônica lê só esse artefato, validado pelo ETag do evento, em vez de baixar e parsear o SRT
+TRANSCRIPT_ARTIFACT_ENABLED = os.environ.get("TRANSCRIPT_ARTIFACT_ENABLED", "1") == "1"
+
+# Índice de busca com timestamps ao lado da legenda canônica ({base}.search.json); ver search_index.py
+SEARCH_INDEX_ENABLED = os.environ.get("SEARCH_INDEX_ENABLED", "1") == "1"
+
+# Operações S3 independentes rodam em paralelo (S3IOExecutor); o pool de conexões do client
+# compartilhado precisa comportar a concorrência do executor.
+S3_IO_CONCURRENCY = int(os.environ.get("S3_IO_CONCURRENCY", "8"))
 OBS_DEBUG = os.environ.get("OBSERVABILITY_DEBUG", "0") == "1"
 OBS_TRACE = os.environ.get("OBSERVABILITY_TRACE", "0") == "1"
 
-bedrock_client = boto3.client(
-    "bedrock-runtime",
-    region_name=os.environ.get("BEDROCK_REGION", "us-east-2"),
-)
-
 OUTPUT_BUCKET = os.environ.get("SUMMARY_OUTPUT_BUCKET", "")
 OUTPUT_PREFIX = os.environ.get("SUMMARY_OUTPUT_PREFIX", "model/resumo/")
 MODEL_PREFIX = os.environ.get("MODEL_PREFIX", "model/")
@@ -26,6 +45,145 @@ INFERENCE_PROFILE = inference_profile_raw if inference_profile_raw and inference
 # Nome do arquivo do prompt padrão (empacotado junto com a Lambda; origem: prompt/guardrails.md)
 DEFAULT_PROMPT_FILENAME = "guardrails.md"
 
+# Modo chunked (map-reduce) para transcrições longas: defaults globais, sobrescritos por modelo
+# via chaves opcionais em model/models/{base}.json (ver CHUNK_CONFIG_KEYS).
+CHUNK_THRESHOLD_TOKENS = int(os.environ.get("CHUNK_THRESHOLD_TOKENS", "50000"))
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "12000"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "300"))
+CHUNK_CONCURRENCY = int(os.environ.get("CHUNK_CONCURRENCY", "4"))
+CHUNK_CONFIG_KEYS = ("chunkThresholdTokens", "chunkTokens", "chunkOverlapTokens", "chunkConcurrency")
+# Estimativa grosseira de caracteres por token para texto em português (sem chamar tokenizer)
+CHARS_PER_TOKEN = 3.5
+
+# Compactação da transcrição antes do LLM: etapas separadas por vírgula (vazio ou "off" desliga).
+# merge: junta legendas em frases/parágrafos; dedupe: remove palavras repetidas na fronteira entre
+# legendas e repetições imediatas; fillers: remove vícios de linguagem; whitespace: normaliza espaços.
+TRANSCRIPT_COMPACTION = os.environ.get("TRANSCRIPT_COMPACTION", "dedupe,merge,whitespace")
+COMPACTION_PARAGRAPH_CHARS = int(os.environ.get("COMPACTION_PARAGRAPH_CHARS", "800"))
+
+# Fan-out: modelos resumidos em paralelo quando model/models/{base}.json traz uma lista
+MODEL_FANOUT_CONCURRENCY = int(os.environ.get("MODEL_FANOUT_CONCURRENCY", "3"))
+
+# Idempotência: ledger de trabalhos concluídos, chaveado por (hash do SRT, modelo, parâmetros, prompt).
+# IDEMPOTENCY_STORE: "s3" (marcadores em {MODEL_PREFIX}ledger/), "local" (memória do container) ou "off".
+IDEMPOTENCY_STORE = os.environ.get("IDEMPOTENCY_STORE", "s3").strip().lower()
+IDEMPOTENCY_PREFIX = os.environ.get("IDEMPOTENCY_PREFIX", f"{MODEL_PREFIX}ledger/")
+# Janela em que um trabalho concluído é considerado duplicado (cobre retries assíncronos da Lambda, até 6h)
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "21600"))
+# Modelo que falhou num fan-out parcial: a reescrita da legenda (que dispara novo evento) não
+# reprocessa o modelo até o fim do cooldown, evitando laço de eventos enquanto a falha persistir
+IDEMPOTENCY_FAILED_COOLDOWN_SECONDS = int(os.environ.get("IDEMPOTENCY_FAILED_COOLDOWN_SECONDS", "300"))
+
+# Cache de resumos endereçado por conteúdo (transcrição limpa + system prompt + config do modelo),
+# em {MODEL_PREFIX}cache/summary/{hash}.md. A idade é limitada por regra de lifecycle do S3
+# (summary_cache_max_age_days no Terraform); o tamanho total, por evicção feita numa amostra das
+# gravações (SUMMARY_CACHE_EVICTION_SAMPLE_RATE), já que ela lista o prefixo inteiro.
+SUMMARY_CACHE_ENABLED = os.environ.get("SUMMARY_CACHE_ENABLED", "1") == "1"
+SUMMARY_CACHE_PREFIX = os.environ.get("SUMMARY_CACHE_PREFIX", f"{MODEL_PREFIX}cache/summary/")
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+SUMMARY_CACHE_EVICTION_SAMPLE_RATE = float(os.environ.get("SUMMARY_CACHE_EVICTION_SAMPLE_RATE", "0.05"))
+
+# Cache em memória (sobrevive entre invocações no mesmo container) para prompts e configs de modelo
+# lidos do S3: dentro do TTL não há chamada ao S3; depois revalida por ETag (If-None-Match).
+# NoSuchKey também é cacheado (cache negativo). TTL curto porque o app grava a config logo antes do trigger.
+CONFIG_CACHE_TTL_SECONDS = float(os.environ.get("CONFIG_CACHE_TTL_SECONDS", "15"))
+
+# Streaming (converse_stream): opt-in global via BEDROCK_STREAMING=1 ou por modelo ("stream": true no JSON).
+# O texto parcial é gravado em {base}-{slug}.partial.md a cada STREAM_FLUSH_SECONDS; perto do timeout
+# da Lambda (STREAM_DEADLINE_MARGIN_SECONDS) é feito um flush forçado para preservar a saída parcial.
+BEDROCK_STREAMING = os.environ.get("BEDROCK_STREAMING", "0") == "1"
+STREAM_FLUSH_SECONDS = float(os.environ.get("STREAM_FLUSH_SECONDS", "5"))
+STREAM_DEADLINE_MARGIN_SECONDS = float(os.environ.get("STREAM_DEADLINE_MARGIN_SECONDS", "10"))
+
+# Prompt caching do Bedrock: opt-in global via BEDROCK_PROMPT_CACHE=1 ou por modelo ("promptCache": true
+# no JSON). Cache points após os guardrails (system) e após o preâmbulo fixo da mensagem, só para
+# modelos com promptCacheMinTokens no registro (mínimo de tokens do prefixo para o modelo aceitar cache).
+BEDROCK_PROMPT_CACHE = os.environ.get("BEDROCK_PROMPT_CACHE", "0") == "1"
+
+# Resiliência das chamadas ao Bedrock: retry com backoff exponencial + jitter dentro do tempo restante,
+# token bucket por container, cadeia ordenada de fallback (modelos/inference profiles) e circuit breaker.
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get("BEDROCK_MAX_ATTEMPTS", "4"))
+BEDROCK_BACKOFF_BASE_SECONDS = float(os.environ.get("BEDROCK_BACKOFF_BASE_SECONDS", "1.0"))
+BEDROCK_BACKOFF_MAX_SECONDS = float(os.environ.get("BEDROCK_BACKOFF_MAX_SECONDS", "20"))
+# Tempo mínimo que precisa sobrar após a espera para valer uma nova tentativa (chamada + gravações)
+BEDROCK_DEADLINE_RESERVE_SECONDS = float(os.environ.get("BEDROCK_DEADLINE_RESERVE_SECONDS", "15"))
+BEDROCK_RATE_PER_SECOND = float(os.environ.get("BEDROCK_RATE_PER_SECOND", "2"))
+BEDROCK_BURST = int(os.environ.get("BEDROCK_BURST", "4"))
+# Modelos de fallback (ids separados por vírgula), usados depois do modelo selecionado e dos
+# fallbacks do JSON do modelo ("fallback": [...])
+BEDROCK_FALLBACK_CHAIN = [m.strip() for m in os.environ.get("BEDROCK_FALLBACK_CHAIN", "").split(",") if m.strip()]
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "60"))
+# Erros transitórios (vale tentar de novo no mesmo alvo); os demais passam direto para o próximo da cadeia
+RETRYABLE_BEDROCK_ERRORS = {
+    "throttlingexception",
+    "serviceunavailableexception",
+    "internalserverexception",
+    "modelnotreadyexception",
+    "modeltimeoutexception",
+    "modelstreamerrorexception",
+    "toomanyrequestsexception",
+}
+
+# Registro de modelos (model_registry.json empacotado na Lambda; MODEL_REGISTRY_PATH em execução local):
+# slug do arquivo de saída, inference profile, janela de contexto, máximo de saída, parâmetros aceitos,
+# mínimo para prompt caching, preço e velocidade relativa. Carregado uma vez por container.
+MODEL_REGISTRY_FILENAME = "model_registry.json"
+# Prefixos de inference profile cross-region (us.modelo, global.modelo...): mesmo modelo base no registro
+INFERENCE_PROFILE_PREFIXES = {"us", "eu", "apac", "global", "jp", "au", "ca", "us-gov"}
+
+# maxTokens proporcional ao tamanho da entrada quando o JSON do modelo não fixa "maxTokens":
+# max(mínimo, tokens de entrada x razão), limitado ao teto e ao máximo de saída do modelo
+SUMMARY_OUTPUT_MIN_TOKENS = int(os.environ.get("SUMMARY_OUTPUT_MIN_TOKENS", "2048"))
+SUMMARY_OUTPUT_MAX_TOKENS = int(os.environ.get("SUMMARY_OUTPUT_MAX_TOKENS", "8192"))
+SUMMARY_OUTPUT_RATIO = float(os.environ.get("SUMMARY_OUTPUT_RATIO", "0.15"))
+# Reserva na janela de contexto para system prompt e preâmbulo (limite do modo de chamada única)
+CONTEXT_RESERVE_TOKENS = int(os.environ.get("CONTEXT_RESERVE_TOKENS", "4096"))
+
+# Roteamento por tamanho (opt-in, MODEL_ROUTING=1): sem modelo escolhido para o vídeo (sem
+# model/models/{base}.*), usa o mais rápido dos candidatos em que a transcrição cabe numa chamada só
+# (ids separados por vírgula; padrão: modelos com "routing": true no registro + BEDROCK_MODEL_ID).
+# Desligado, vídeos sem config usam sempre BEDROCK_MODEL_ID / BEDROCK_INFERENCE_PROFILE
+MODEL_ROUTING = os.environ.get("MODEL_ROUTING", "0") == "1"
+MODEL_ROUTING_CANDIDATES = [m.strip() for m in os.environ.get("MODEL_ROUTING_CANDIDATES", "").split(",") if m.strip()]
+
+# Timeout de leitura do Bedrock: converse (sem streaming) só responde ao fim da geração, e o padrão
+# do botocore (60 s) corta respostas longas (ex.: raciocínio do DeepSeek R1). Na Lambda
+# (LAMBDA_TIMEOUT_SECONDS, definido pelo Terraform) fica abaixo do timeout da função menos a reserva
+# do deadline: uma chamada presa falha a tempo de liberar o ledger e gravar o parcial, em vez de a
+# Lambda ser encerrada no meio da leitura.
+BEDROCK_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("BEDROCK_CONNECT_TIMEOUT_SECONDS", "5"))
+BEDROCK_READ_TIMEOUT_SECONDS = float(os.environ.get("BEDROCK_READ_TIMEOUT_SECONDS", "300"))
+LAMBDA_TIMEOUT_SECONDS = float(os.environ.get("LAMBDA_TIMEOUT_SECONDS", "0"))
+if LAMBDA_TIMEOUT_SECONDS > 0:
+    BEDROCK_READ_TIMEOUT_SECONDS = min(
+        BEDROCK_READ_TIMEOUT_SECONDS,
+        max(BEDROCK_CONNECT_TIMEOUT_SECONDS, LAMBDA_TIMEOUT_SECONDS - BEDROCK_DEADLINE_RESERVE_SECONDS),
+    )
+
+# Clients criados no primeiro uso (aws_clients.py): eventos ignorados não importam o boto3.
+# Pools dimensionados pela concorrência do handler: S3IOExecutor no S3; fan-out de modelos x
+# trechos em paralelo no Bedrock.
+s3_client = lazy_client(
+    "s3",
+    max_pool_connections=max(10, S3_IO_CONCURRENCY * 2),
+    retries={"mode": "standard", "max_attempts": 3},
+)
+# Retries do Bedrock são feitos pela política própria (_invoke_model), ciente do tempo restante
+# da Lambda; o botocore faz uma única tentativa por chamada.
+bedrock_client = lazy_client(
+    "bedrock-runtime",
+    region_name=os.environ.get("BEDROCK_REGION", "us-east-2"),
+    max_pool_connections=max(10, MODEL_FANOUT_CONCURRENCY * CHUNK_CONCURRENCY),
+    connect_timeout=BEDROCK_CONNECT_TIMEOUT_SECONDS,
+    read_timeout=BEDROCK_READ_TIMEOUT_SECONDS,
+    retries={"total_max_attempts": 1, "mode": "standard"},
+)
+
+
+# Métricas EMF por etapa/modelo (OBSERVABILITY_METRICS=1); ver observability.py
+METRICS = MetricsRecorder("summary")
+
 
 def _log(msg: str, always: bool = False):
     """Log controlado por feature flags. always=True ignora flags."""
@@ -34,8 +192,8 @@ def _log(msg: str, always: bool = False):
 
 
 def _load_default_system_prompt() -> str:
-    """Carrega o prompt padrão do arquivo guardrails.md empacotado na Lambda."""
-    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_PROMPT_FILENAME)
+    """Carrega o prompt padrão do arquivo guardrails.md empacotado na Lambda (GUARDRAILS_PATH em execução local)."""
+    path = os.environ.get("GUARDRAILS_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_PROMPT_FILENAME)
     try:
         with open(path, "r", encoding="utf-8") as f:
             text = f.read().strip()
@@ -56,39 +214,297 @@ def _load_default_system_prompt() -> str:
     )
 
 
-def extract_plain_text_from_srt(srt_str: str) -> str:
+# Guardrails carregados uma única vez por container (no import / cold start)
+_GUARDRAILS = _load_default_system_prompt()
+
+
+def _parse_model_spec(entry: dict) -> dict:
+    """Normaliza uma entrada do registro de modelos (campos ausentes = desconhecido/sem suporte)."""
+    price = entry.get("pricePerMTok")
+    return {
+        "id": entry["id"],
+        "name": entry.get("name") or entry["id"],
+        "slug": entry.get("slug") or None,
+        "profile": entry.get("profile") or None,
+        "contextTokens": int(entry["contextTokens"]) if entry.get("contextTokens") else None,
+        "maxOutputTokens": int(entry["maxOutputTokens"]) if entry.get("maxOutputTokens") else None,
+        "params": tuple(entry.get("params") or ("temperature", "topP", "topK")),
+        "promptCacheMinTokens": int(entry["promptCacheMinTokens"]) if entry.get("promptCacheMinTokens") else None,
+        "pricePerMTok": (float(price[0]), float(price[1])) if price else None,
+        "relativeSpeed": float(entry.get("relativeSpeed", 1)),
+        "routing": bool(entry.get("routing", False)),
+        "registered": True,
+    }
+
+
+def _load_model_registry() -> dict:
     """
-    Remove numeração, timestamps e cabeçalho do modelo do SRT,
-    retornando apenas o texto das legendas.
+    Lê model_registry.json empacotado na Lambda (MODEL_REGISTRY_PATH em execução local) e indexa
+    cada entrada pelo id e pelo inference profile. Sem o arquivo, todos os modelos caem nos padrões.
     """
-    lines = srt_str.splitlines()
-    content_lines = []
+    path = os.environ.get("MODEL_REGISTRY_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), MODEL_REGISTRY_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        specs = [_parse_model_spec(entry) for entry in data.get("models", [])]
+    except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+        _log(f"Registro de modelos {MODEL_REGISTRY_FILENAME} não encontrado ou inválido: {e}", always=True)
+        return {}
+    registry, slugs = {}, {}
+    for spec in specs:
+        # Slug repetido = dois modelos gravando o mesmo {base}-{slug}.md (e um deles descartado no fan-out)
+        if spec["slug"] and slugs.setdefault(spec["slug"], spec["id"]) != spec["id"]:
+            _log(f"[MODEL] Slug {spec['slug']} repetido no registro ({slugs[spec['slug']]} e {spec['id']})", always=True)
+        for alias in (spec["id"], spec["profile"]):
+            if alias:
+                registry[alias] = spec
+    _log(f"Registro de modelos carregado de {MODEL_REGISTRY_FILENAME} ({len(specs)} modelos)")
+    return registry
+
+
+def _fallback_model_slug(model_id: str) -> str:
+    """Slug de modelo fora do registro: primeira parte do model_id (ex: anthropic.x -> anthropic-x)."""
+    parts = model_id.split(".")[:2]
+    return "-".join(parts).replace(":", "-")[:20] if parts else "default"
+
+
+# Registro de modelos carregado uma única vez por container (no import / cold start)
+_MODEL_REGISTRY = _load_model_registry()
+# Candidatos do roteamento por tamanho, na ordem do registro (resolvidos uma vez)
+_ROUTING_CANDIDATES = MODEL_ROUTING_CANDIDATES or list(dict.fromkeys(
+    [spec["id"] for spec in _MODEL_REGISTRY.values() if spec["routing"]] + [MODEL_ID]
+))
+
+
+_CONFIG_CACHE = S3TextCache(CONFIG_CACHE_TTL_SECONDS)
+
+
+# Vícios de linguagem sempre removidos quando isolados, e os que só são vício seguidos de vírgula/reticências.
+# Fora da lista: "é" (cópula: "o problema é, na verdade, ...") e marcadores de discurso que carregam
+# sentido ("então," conclusão, "assim," modo, "bom," avaliação)
+_FILLER_RE = re.compile(
+    r"(?<![\w-])(?:"
+    r"né|hã+|hum+|hmm+|ahn+|ãh+|eh+|éé+|uhum|ã+|"
+    r"(?:tipo|ah|enfim)(?=\s*(?:,|\.\.\.|…))"
+    r")(?![\w-])\s*(?:,|\.\.\.|…)?",
+    re.IGNORECASE,
+)
+_REPEATED_WORD_RE = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([,.;:!?])")
+_DUPLICATE_PUNCT_RE = re.compile(r"([,;:])(?:\s*[,;:])+")
+_PAUSE_BEFORE_END_RE = re.compile(r"[,;:]+\s*([.!?])")
+_LEADING_PUNCT_RE = re.compile(r"^[\s,;:]+")
+_MULTI_SPACE_RE = re.compile(r"[ \t]{2,}")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_WORD_STRIP = ".,;:!?…\"'()"
+
 
+def _dedupe_cue_boundaries(lines: list, max_overlap: int = 6) -> list:
+    """Remove do início de cada legenda as palavras que repetem o final da legenda anterior."""
+    result = []
+    prev_words = []
     for line in lines:
-        stripped = line.strip()
+        words = line.split()
+        limit = min(max_overlap, len(prev_words), len(words))
+        for k in range(limit, 0, -1):
+            tail = [w.strip(_WORD_STRIP).lower() for w in prev_words[-k:]]
+            head = [w.strip(_WORD_STRIP).lower() for w in words[:k]]
+            if tail == head:
+                # Preserva pontuação final da palavra removida (ex.: "vamos lá" + "vamos lá.")
+                ending = words[k - 1][len(words[k - 1].rstrip(".!?…")):]
+                words = words[k:]
+                if ending and result and not result[-1].endswith((".", "!", "?", "…")):
+                    result[-1] += ending
+                break
+        if words:
+            result.append(" ".join(words))
+            prev_words = words
+    return result
 
-        # pula linhas vazias
-        if not stripped:
-            continue
 
-        # pula cabeçalho do modelo LLM (inserido pela Lambda)
-        if stripped.startswith("# Modelo LLM:"):
+def _merge_cues_into_paragraphs(lines: list, paragraph_chars: int) -> list:
+    """Junta legendas em frases (quebras no meio da frase somem) e agrupa frases em parágrafos."""
+    paragraphs = []
+    current = []
+    size = 0
+    for sentence in _SENTENCE_END_RE.split(" ".join(lines)):
+        if not sentence:
             continue
+        current.append(sentence)
+        size += len(sentence) + 1
+        if size >= paragraph_chars:
+            paragraphs.append(" ".join(current))
+            current, size = [], 0
+    if current:
+        paragraphs.append(" ".join(current))
+    return paragraphs
 
-        # pula linhas só com número (1, 2, 3...)
-        if stripped.isdigit():
-            continue
 
-        # pula linhas com timestamp --> 
-        # Ex: 00:00:01,000 --> 00:00:03,000
-        if "-->" in stripped:
+def compact_transcript(text: str, steps: str = None, paragraph_chars: int = None) -> str:
+    """
+    Compacta o texto extraído do SRT (uma legenda por linha) para reduzir tokens de entrada:
+    remove sobreposição entre legendas e palavras repetidas, junta legendas em frases/parágrafos e
+    normaliza espaços. A etapa opcional "fillers" remove vícios de linguagem ("né", "tipo,", "éé...").
+    Tempo linear. steps: etapas separadas por vírgula (padrão TRANSCRIPT_COMPACTION).
+    """
+    steps = TRANSCRIPT_COMPACTION if steps is None else steps
+    enabled = {step.strip().lower() for step in steps.split(",") if step.strip()}
+    if not enabled or "off" in enabled:
+        return text
+    paragraph_chars = paragraph_chars or COMPACTION_PARAGRAPH_CHARS
+
+    lines = [line for line in text.splitlines() if line.strip()]
+    if "fillers" in enabled:
+        lines = [_FILLER_RE.sub("", line) for line in lines]
+    if "dedupe" in enabled:
+        lines = _dedupe_cue_boundaries([line for line in lines if line.strip()])
+        lines = [_REPEATED_WORD_RE.sub(r"\1", line) for line in lines]
+    if "whitespace" in enabled:
+        cleaned = []
+        for line in lines:
+            line = _MULTI_SPACE_RE.sub(" ", line)
+            line = _SPACE_BEFORE_PUNCT_RE.sub(r"\1", line)
+            line = _DUPLICATE_PUNCT_RE.sub(r"\1", line)
+            line = _PAUSE_BEFORE_END_RE.sub(r"\1", line)
+            line = _LEADING_PUNCT_RE.sub("", line).strip()
+            if line and line not in (".", "..."):
+                cleaned.append(line)
+        lines = cleaned
+    if "merge" in enabled:
+        lines = _merge_cues_into_paragraphs(lines, paragraph_chars)
+    return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa de tokens a partir do número de caracteres (CHARS_PER_TOKEN)."""
+    return int(len(text) / CHARS_PER_TOKEN) + 1 if text else 0
+
+
+def split_transcript_into_chunks(text: str, chunk_tokens: int, overlap_tokens: int = 0) -> list:
+    """
+    Divide o texto extraído do SRT em chunks de até chunk_tokens (estimados),
+    respeitando quebras de linha (uma linha = uma legenda). Os últimos ~overlap_tokens
+    de cada chunk são repetidos no início do próximo para não perder contexto na fronteira.
+    Linhas maiores que o orçamento são quebradas por palavras.
+    """
+    max_chars = max(1, int(chunk_tokens * CHARS_PER_TOKEN))
+    overlap_chars = max(0, min(int(overlap_tokens * CHARS_PER_TOKEN), max_chars // 2))
+
+    # Quebra linhas gigantes (ex.: transcrição sem quebras) em pedaços por palavra
+    pieces = []
+    for line in text.splitlines():
+        if len(line) <= max_chars:
+            pieces.append(line)
             continue
+        current = []
+        size = 0
+        for word in line.split():
+            if current and size + len(word) + 1 > max_chars:
+                pieces.append(" ".join(current))
+                current, size = [], 0
+            current.append(word)
+            size += len(word) + 1
+        if current:
+            pieces.append(" ".join(current))
+
+    chunks = []
+    current = []
+    size = 0
+    for piece in pieces:
+        if current and size + len(piece) + 1 > max_chars:
+            chunks.append("\n".join(current))
+            # Sobreposição: reaproveita as últimas linhas do chunk anterior
+            tail = []
+            tail_size = 0
+            for prev in reversed(current):
+                if tail_size + len(prev) + 1 > overlap_chars:
+                    break
+                tail.append(prev)
+                tail_size += len(prev) + 1
+            current = list(reversed(tail))
+            size = tail_size
+        current.append(piece)
+        size += len(piece) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def get_chunking_config(model_config: dict) -> dict:
+    """
+    Retorna a config do modo chunked para o modelo: thresholdTokens (acima disso usa map-reduce),
+    chunkTokens, overlapTokens e concurrency. Valores do model_config têm prioridade sobre as env vars.
+    thresholdTokens e chunkTokens ficam limitados ao que cabe numa chamada na janela de contexto do modelo.
+    """
+    p = model_config or {}
+
+    def _value(key, default):
+        return int(p[key]) if p.get(key) is not None else default
+
+    threshold = _value("chunkThresholdTokens", CHUNK_THRESHOLD_TOKENS)
+    chunk_tokens = _value("chunkTokens", CHUNK_TOKENS)
+    budget = get_single_call_budget(p.get("id") or MODEL_ID, p)
+    if budget is not None:
+        threshold, chunk_tokens = min(threshold, budget), min(chunk_tokens, budget)
+    return {
+        "thresholdTokens": threshold,
+        "chunkTokens": max(500, chunk_tokens),
+        "overlapTokens": max(0, _value("chunkOverlapTokens", CHUNK_OVERLAP_TOKENS)),
+        "concurrency": max(1, _value("chunkConcurrency", CHUNK_CONCURRENCY)),
+    }
+
+
+def get_single_call_budget(model_id: str, params: dict = None):
+    """
+    Tokens de transcrição que cabem numa chamada ao modelo: janela de contexto menos o maxTokens
+    dessa transcrição e a reserva para system prompt e preâmbulo. None se a janela é desconhecida.
+    """
+    context_tokens = get_model_spec(model_id)["contextTokens"]
+    if not context_tokens:
+        return None
+    # maxTokens cresce com a entrada: reserva o teto para a maior transcrição que ainda cabe
+    max_output = get_max_output_tokens(model_id, params, context_tokens)
+    return max(0, context_tokens - max_output - CONTEXT_RESERVE_TOKENS)
+
+
+def select_model_for_transcript(transcript_tokens: int, model_config: dict = None, candidates: list = None) -> str:
+    """
+    Roteamento por tamanho: o candidato mais rápido (relativeSpeed do registro; empate → menor preço de
+    entrada) em cuja janela de contexto a transcrição cabe numa chamada só (get_single_call_budget).
+    Se não cabe em nenhum (ou nenhum tem janela conhecida), o mais rápido de todos, em modo chunked.
+    """
+    candidates = candidates or _ROUTING_CANDIDATES
+    params = {**(model_config or {}), "routed": True}
+    fitting = []
+    for model_id in candidates:
+        budget = get_single_call_budget(model_id, params)
+        if budget is not None and transcript_tokens <= budget:
+            fitting.append(model_id)
+
+    def _rank(model_id):
+        spec = get_model_spec(model_id)
+        price = spec["pricePerMTok"][0] if spec["pricePerMTok"] else float("inf")
+        return (spec["relativeSpeed"], -price)
 
-        # resto é texto da legenda
-        content_lines.append(stripped)
+    return max(fitting or candidates, key=_rank)
 
-    # junta tudo em parágrafos
-    return "\n".join(content_lines)
+
+def route_model_configs(model_configs: list, transcript_tokens: int) -> list:
+    """
+    Resolve as configs marcadas com "auto" (nenhum modelo escolhido para o vídeo) pelo roteamento
+    por tamanho; as demais seguem como estão. Retorna novas configs, com "routed" no lugar de "auto"
+    (o maxTokens proporcional à entrada vale só para elas; ver get_max_output_tokens).
+    """
+    routed = []
+    for cfg in model_configs:
+        cfg = dict(cfg)
+        if cfg.pop("auto", False):
+            model_id = select_model_for_transcript(transcript_tokens, cfg)
+            print(f"[MODEL] Roteamento por tamanho: ~{transcript_tokens} tokens -> {model_id} (candidatos={_ROUTING_CANDIDATES})")
+            cfg["id"] = model_id
+            cfg["routed"] = True
+        routed.append(cfg)
+    return routed
 
 
 def extract_video_base_name(srt_filename: str) -> str:
@@ -114,31 +530,28 @@ def extract_video_base_name(srt_filename: str) -> str:
     return name_without_ext
 
 
-def get_system_prompt(base_name: str, bucket: str) -> str:
+def get_system_prompt(base_name: str, bucket: str, max_age: float = None) -> str:
     """
     Monta o system prompt combinando:
     - guardrails.md: guardrails (regras gerais), sempre aplicados.
     - prompts/{base_name}.txt no S3: prompt personalizado do usuário, quando existir.
     Quando ambos existem, os dois são enviados em conjunto (guardrails + instruções específicas).
+    max_age: idade máxima aceita do cache de config (0 = revalidar no S3).
     """
-    guardrails = _load_default_system_prompt()
+    guardrails = _GUARDRAILS
 
     prompt_key = f"{MODEL_PREFIX}prompts/{base_name}.txt"
     try:
         _log(f"Tentando ler prompt personalizado de s3://{bucket}/{prompt_key}")
-        response = s3_client.get_object(Bucket=bucket, Key=prompt_key)
-        custom_text = response["Body"].read().decode("utf-8", errors="ignore").strip()
-        if custom_text:
+        custom_text = _CONFIG_CACHE.get(s3_client, bucket, prompt_key, max_age)
+        if custom_text is None:
+            _log(f"Prompt personalizado não encontrado em {prompt_key}, usando apenas guardrails (guardrails.md)")
+        elif custom_text.strip():
+            custom_text = custom_text.strip()
             _log(f"Prompt personalizado encontrado ({len(custom_text)} caracteres). Usando guardrails + prompt personalizado.")
             return _combine_prompts(guardrails, custom_text)
     except ClientError as e:
-        error_code = e.response.get("Error", {}).get("Code", "")
-        if error_code == "NoSuchKey":
-            _log(f"Prompt personalizado não encontrado em {prompt_key}, usando apenas guardrails (guardrails.md)")
-        elif error_code == "AccessDenied":
-            _log(f"Sem permissão para ler {prompt_key}, usando apenas guardrails (guardrails.md)", always=True)
-        else:
-            _log(f"Erro ao ler prompt personalizado: {e}, usando apenas guardrails (guardrails.md)", always=True)
+        _log(f"Erro ao ler prompt personalizado: {e}, usando apenas guardrails (guardrails.md)", always=True)
 
     return guardrails
 
@@ -153,187 +566,916 @@ def _combine_prompts(guardrails: str, custom_prompt: str) -> str:
     )
 
 
-def get_selected_model_config(base_name: str, bucket: str) -> dict:
+def _parse_model_config(data: dict) -> dict:
+    """Normaliza uma config de modelo do JSON: id, temperature, topP, topK e opcionais."""
+    cfg = {
+        "id": str(data.get("id", "")).strip() or MODEL_ID,
+        "temperature": float(data.get("temperature", 0.3)),
+        "topP": float(data.get("topP", 0.9)),
+        "topK": int(data.get("topK", 0)) if data.get("topK") is not None else 0,
+    }
+    # Parâmetros opcionais do modo chunked (map-reduce) por modelo
+    for chunk_key in CHUNK_CONFIG_KEYS:
+        if data.get(chunk_key) is not None:
+            cfg[chunk_key] = int(data[chunk_key])
+    if data.get("maxTokens") is not None:
+        cfg["maxTokens"] = int(data["maxTokens"])
+    if data.get("stream") is not None:
+        cfg["stream"] = bool(data["stream"])
+    if data.get("promptCache") is not None:
+        cfg["promptCache"] = bool(data["promptCache"])
+    if isinstance(data.get("fallback"), list):
+        cfg["fallback"] = [str(m).strip() for m in data["fallback"] if str(m).strip()]
+    return cfg
+
+
+def get_selected_model_configs(base_name: str, bucket: str, max_age: float = None) -> list:
     """
-    Tenta ler a config do modelo do S3 (model/models/{base_name}.json ou .txt).
-    Retorna dict com id, temperature, topP, topK (valores opcionais com defaults).
+    Tenta ler a config do(s) modelo(s) do S3 (model/models/{base_name}.json ou .txt).
+    O .json aceita um objeto (um modelo), uma lista de objetos ou {"models": [...]} (fan-out:
+    a mesma transcrição resumida por vários modelos na mesma invocação). Retorna lista de dicts
+    com id, temperature, topP, topK (valores opcionais com defaults), sem slugs repetidos. Sem
+    config para o vídeo, vale BEDROCK_MODEL_ID (marcada "auto" com MODEL_ROUTING=1; ver
+    route_model_configs). max_age como em get_system_prompt.
     """
     # 1. Tentar .json (config completa: id, temperature, topP, topK)
     json_key = f"{MODEL_PREFIX}models/{base_name}.json"
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=json_key)
-        data = json.loads(response["Body"].read().decode("utf-8", errors="ignore"))
-        cfg = {
-            "id": data.get("id", "").strip() or MODEL_ID,
-            "temperature": float(data.get("temperature", 0.3)),
-            "topP": float(data.get("topP", 0.9)),
-            "topK": int(data.get("topK", 0)) if data.get("topK") is not None else 0,
-        }
-        _log(f"Modelo config lida de {json_key}: id={cfg['id']} temp={cfg['temperature']} topP={cfg['topP']}")
-        return cfg
+        raw = _CONFIG_CACHE.get(s3_client, bucket, json_key, max_age)
+        if raw is not None:
+            data = json.loads(raw)
+            if isinstance(data, dict) and isinstance(data.get("models"), list):
+                data = data["models"]
+            entries = data if isinstance(data, list) else [data]
+            configs, slugs = [], set()
+            for entry in entries:
+                cfg = _parse_model_config(entry)
+                slug = get_model_slug(cfg["id"])
+                # Mesmo slug = mesmo arquivo de saída: vale a primeira ocorrência
+                if slug in slugs:
+                    continue
+                slugs.add(slug)
+                configs.append(cfg)
+                _log(f"Modelo config lida de {json_key}: id={cfg['id']} temp={cfg['temperature']} topP={cfg['topP']}")
+            if configs:
+                return configs
+            _log(f"Nenhum modelo em {json_key}, usando padrão/roteamento: {MODEL_ID}", always=True)
     except ClientError as e:
-        if e.response.get("Error", {}).get("Code") != "NoSuchKey":
-            _log(f"Erro ao ler {json_key}: {e}", always=True)
-    except (json.JSONDecodeError, ValueError, TypeError) as e:
+        _log(f"Erro ao ler {json_key}: {e}", always=True)
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
         _log(f"JSON inválido em {json_key}: {e}", always=True)
 
     # 2. Fallback: .txt (apenas id)
     txt_key = f"{MODEL_PREFIX}models/{base_name}.txt"
     try:
-        response = s3_client.get_object(Bucket=bucket, Key=txt_key)
-        model_id = response["Body"].read().decode("utf-8", errors="ignore").strip()
-        _log(f"Modelo id lido de {txt_key}: {model_id}")
-        return {"id": model_id or MODEL_ID, "temperature": 0.3, "topP": 0.9, "topK": 0}
+        raw = _CONFIG_CACHE.get(s3_client, bucket, txt_key, max_age)
+        if raw is not None:
+            model_id = raw.strip()
+            _log(f"Modelo id lido de {txt_key}: {model_id}")
+            return [{"id": model_id or MODEL_ID, "temperature": 0.3, "topP": 0.9, "topK": 0}]
+        _log(f"Modelo não encontrado em {json_key} nem {txt_key}, usando padrão/roteamento: {MODEL_ID}")
     except ClientError as e:
-        error_code = e.response.get("Error", {}).get("Code", "")
-        if error_code == "NoSuchKey":
-            _log(f"Modelo não encontrado em {json_key} nem {txt_key}, usando padrão: {MODEL_ID}")
-        else:
-            _log(f"Erro ao ler modelo: {e}, usando padrão: {MODEL_ID}", always=True)
+        _log(f"Erro ao ler modelo: {e}, usando padrão/roteamento: {MODEL_ID}", always=True)
 
-    return {"id": MODEL_ID, "temperature": 0.3, "topP": 0.9, "topK": 0}
+    return [_default_model_config()]
+
+
+def _default_model_config() -> dict:
+    """Config sem modelo escolhido para o vídeo: BEDROCK_MODEL_ID, ou roteamento por tamanho ("auto")."""
+    cfg = {"id": MODEL_ID, "temperature": 0.3, "topP": 0.9, "topK": 0}
+    if MODEL_ROUTING:
+        cfg["auto"] = True
+    return cfg
+
+
+def get_model_spec(model_id: str) -> dict:
+    """
+    Entrada do registro para o modelo (por id, inference profile ou id com prefixo de região).
+    Modelos fora do registro recebem uma entrada padrão (sem profile, limites desconhecidos,
+    todos os parâmetros), guardada no índice para as próximas consultas.
+    """
+    spec = _MODEL_REGISTRY.get(model_id)
+    if spec is not None:
+        return spec
+    prefix, _, base_id = model_id.partition(".")
+    spec = _MODEL_REGISTRY.get(base_id) if prefix in INFERENCE_PROFILE_PREFIXES else None
+    if spec is None:
+        _log(f"Modelo {model_id} fora do registro de modelos; usando padrões", always=True)
+        spec = {**_parse_model_spec({"id": model_id}), "registered": False}
+    _MODEL_REGISTRY[model_id] = spec
+    return spec
 
 
 def get_model_slug(model_id: str) -> str:
     """
-    Retorna slug curto do modelo para o nome do arquivo de resumo.
+    Retorna slug curto do modelo para o nome do arquivo de resumo (registro de modelos).
     Ex: CommunityDayCPS-haiku45.md, CommunityDayCPS-Novalt.md
+    Cada modelo do registro tem slug próprio; fora do registro, deriva do model_id como recebido
+    (ex: us.meta.llama3-70b -> us-meta).
     """
     if not model_id:
         return "default"
-    mid = model_id.lower()
-    if "claude-haiku" in mid or "haiku-4-5" in mid:
-        return "haiku45"
-    if "nova" in mid and "lite" in mid:
-        return "Novalt"
-    if "deepseek" in mid or "r1" in mid:
-        return "DSeekR1"
-    if "opus" in mid:
-        return "Opus"
-    if "sonnet" in mid:
-        return "Sonnet"
-    # Fallback: primeira parte do model_id (ex: anthropic -> anthropic)
-    parts = model_id.split(".")[:2]
-    return "-".join(parts).replace(":", "-")[:20] if parts else "default"
+    return get_model_spec(model_id)["slug"] or _fallback_model_slug(model_id)
 
 
-def get_inference_profile_for_model(model_id: str):
+def get_model_invocation_chain(model_config: dict) -> list:
     """
-    Retorna o inference profile apropriado para o modelo.
-    Claude Haiku 4.5, Nova, DeepSeek e outros exigem inference profile para cross-region.
+    Cadeia ordenada de alvos para invocar: lista de (modelId para a API, model_id base).
+    Para cada modelo (selecionado, fallbacks do JSON e BEDROCK_FALLBACK_CHAIN) entra primeiro o
+    inference profile, se houver, e depois o modelo base (pode funcionar em algumas regiões).
     """
-    profiles = {
-        "deepseek.r1-v1:0": "us.deepseek.r1-v1:0",
-        "amazon.nova-2-lite-v1:0": "us.amazon.nova-2-lite-v1:0",
-        # Claude Haiku 4.5: inference profile para cross-region (global. já é profile, usa direto)
-        "anthropic.claude-haiku-4-5-20251001-v1:0": "us.anthropic.claude-haiku-4-5-20251001-v1:0",
-    }
-    return profiles.get(model_id)
+    model_ids = [model_config.get("id") or MODEL_ID]
+    model_ids += list(model_config.get("fallback") or [])
+    model_ids += BEDROCK_FALLBACK_CHAIN
+
+    chain = []
+    seen = set()
+    for model_id in model_ids:
+        spec = get_model_spec(model_id)
+        # Id já é um profile (ex.: global.anthropic...): usa direto
+        profile = spec["profile"] if model_id == spec["id"] else None
+        if model_id == MODEL_ID and INFERENCE_PROFILE:
+            profile = INFERENCE_PROFILE
+        for target in (profile, model_id):
+            if target and target not in seen:
+                seen.add(target)
+                chain.append((target, model_id))
+    return chain
+
+
+_BEDROCK_RATE_LIMITER = TokenBucket(BEDROCK_RATE_PER_SECOND, BEDROCK_BURST)
+_CIRCUIT_BREAKERS = {}
+_CIRCUIT_BREAKERS_LOCK = threading.Lock()
+
+
+def _get_circuit_breaker(target_id: str) -> CircuitBreaker:
+    with _CIRCUIT_BREAKERS_LOCK:
+        if target_id not in _CIRCUIT_BREAKERS:
+            _CIRCUIT_BREAKERS[target_id] = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+        return _CIRCUIT_BREAKERS[target_id]
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Backoff exponencial com full jitter: uniforme em [0, min(max, base * 2^(attempt-1))]."""
+    return random.uniform(0, min(BEDROCK_BACKOFF_MAX_SECONDS, BEDROCK_BACKOFF_BASE_SECONDS * (2 ** (attempt - 1))))
+
 
+_USAGE_LOCK = threading.Lock()
 
-def get_inference_config_for_model(model_id: str, params: dict = None) -> dict:
+
+def _accumulate_usage(usage_sink: dict, usage: dict, target_id: str, model_id: str):
+    """Soma tokens de uma chamada em usage_sink (compartilhado entre as threads do map-reduce)."""
+    if usage_sink is None:
+        return
+    with _USAGE_LOCK:
+        usage_sink["calls"] = usage_sink.get("calls", 0) + 1
+        for field in ("inputTokens", "outputTokens", "totalTokens", "cacheReadInputTokens", "cacheWriteInputTokens"):
+            if isinstance(usage.get(field), int):
+                usage_sink[field] = usage_sink.get(field, 0) + usage[field]
+        targets = usage_sink.setdefault("targets", [])
+        if target_id not in targets:
+            targets.append(target_id)
+        models = usage_sink.setdefault("models", [])
+        if model_id not in models:
+            models.append(model_id)
+
+
+def _bedrock_error_code(error: Exception) -> str:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code", "Unknown")
+    return type(error).__name__
+
+
+def get_max_output_tokens(model_id: str, params: dict = None, input_tokens: int = None) -> int:
+    """
+    maxTokens da chamada: "maxTokens" do JSON do modelo, se houver. Sem ele, modelo escolhido para o
+    vídeo (ou BEDROCK_MODEL_ID fixo) usa SUMMARY_OUTPUT_MIN_TOKENS; só a config roteada por tamanho
+    ("routed") escala com os tokens de entrada (SUMMARY_OUTPUT_RATIO, até SUMMARY_OUTPUT_MAX_TOKENS).
+    Sempre limitado ao máximo de saída do modelo no registro.
+    """
+    p = params or {}
+    if p.get("maxTokens"):
+        max_tokens = int(p["maxTokens"])
+    elif not p.get("routed"):
+        max_tokens = SUMMARY_OUTPUT_MIN_TOKENS
+    else:
+        scaled = int((input_tokens or 0) * SUMMARY_OUTPUT_RATIO)
+        max_tokens = min(max(SUMMARY_OUTPUT_MIN_TOKENS, scaled), SUMMARY_OUTPUT_MAX_TOKENS)
+    model_max = get_model_spec(model_id)["maxOutputTokens"] if model_id else None
+    return min(max_tokens, model_max) if model_max else max_tokens
+
+
+def get_inference_config_for_model(model_id: str, params: dict = None, input_tokens: int = None) -> dict:
     """
     Retorna inferenceConfig adequado ao modelo.
-    params: dict opcional com temperature, topP, topK (do models.json).
-    Claude Haiku 4.5 não aceita temperature e topP juntos; usar apenas temperature.
+    params: dict opcional com temperature, topP, topK, maxTokens (do models.json).
+    input_tokens: tokens estimados da mensagem, para o maxTokens proporcional (get_max_output_tokens).
+    Só entram os parâmetros aceitos pelo modelo no registro (ex.: Claude Haiku 4.5 não aceita
+    temperature e topP juntos; usa apenas temperature).
     """
     p = params or {}
     temp = float(p.get("temperature", 0.3))
     top_p = float(p.get("topP", 0.9))
     top_k = int(p.get("topK", 0)) if p.get("topK") is not None else 0
+    supported = get_model_spec(model_id)["params"] if model_id else ("temperature", "topP", "topK")
 
-    cfg = {"maxTokens": 2048, "temperature": temp}
-    # Claude Haiku 4.5: apenas temperature (não aceita topP junto)
-    if model_id and "claude-haiku-4-5" in model_id:
-        return cfg
-    if top_p is not None and top_p > 0:
+    cfg = {"maxTokens": get_max_output_tokens(model_id, p, input_tokens)}
+    if "temperature" in supported:
+        cfg["temperature"] = temp
+    if "topP" in supported and top_p > 0:
         cfg["topP"] = top_p
-    if top_k is not None and top_k > 0:
+    if "topK" in supported and top_k > 0:
         cfg["topK"] = top_k
     return cfg
 
 
-def call_bedrock_nova(transcript_text: str, system_prompt: str, model_config: dict, inference_profile: str = None) -> str:
+def _converse_text(model_id_to_use: str, system_blocks: list, user_blocks: list, inference_config: dict):
+    """Executa uma chamada converse e retorna (texto, usage) do primeiro bloco de texto."""
+    response = bedrock_client.converse(
+        modelId=model_id_to_use,
+        system=system_blocks,
+        messages=[
+            {
+                "role": "user",
+                "content": user_blocks,
+            }
+        ],
+        inferenceConfig=inference_config,
+    )
+    content_blocks = response["output"]["message"]["content"]
+    # pego o primeiro bloco de texto
+    for block in content_blocks:
+        if "text" in block:
+            return block["text"], response.get("usage", {})
+    raise RuntimeError("Resposta do modelo não contém texto.")
+
+
+def _converse_stream_text(model_id_to_use: str, system_blocks: list, user_blocks: list, inference_config: dict, on_delta):
+    """
+    Executa converse_stream acumulando os deltas de texto; on_delta(partes) é chamado a cada delta
+    com a lista de partes recebidas até ali (quem consome junta só quando for gravar: sem O(n²)).
+    Retorna (texto, usage) e registra time-to-first-token e tokens/s.
+    """
+    start = time.perf_counter()
+    response = bedrock_client.converse_stream(
+        modelId=model_id_to_use,
+        system=system_blocks,
+        messages=[
+            {
+                "role": "user",
+                "content": user_blocks,
+            }
+        ],
+        inferenceConfig=inference_config,
+    )
+    parts = []
+    usage = {}
+    first_token_at = None
+    for stream_event in response["stream"]:
+        delta = stream_event.get("contentBlockDelta", {}).get("delta", {})
+        # Apenas texto (modelos de raciocínio também emitem reasoningContent)
+        if "text" in delta:
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            parts.append(delta["text"])
+            on_delta(parts)
+        elif "metadata" in stream_event:
+            usage = stream_event["metadata"].get("usage", {})
+
+    end = time.perf_counter()
+    output_text = "".join(parts)
+    if not output_text:
+        raise RuntimeError("Resposta do modelo não contém texto.")
+    ttft_ms = (first_token_at - start) * 1000
+    generation_s = max(end - first_token_at, 1e-6)
+    output_tokens = usage.get("outputTokens")
+    tokens_per_s = f"{output_tokens / generation_s:.1f}" if output_tokens else "?"
+    print(f"[LLM] Streaming: ttft_ms={ttft_ms:.0f} tokens_per_s={tokens_per_s} total_ms={(end - start) * 1000:.0f}")
+    return output_text, usage
+
+
+def is_streaming_enabled(model_config: dict) -> bool:
+    """Streaming habilitado para o modelo: chave "stream" do model_config ou BEDROCK_STREAMING."""
+    value = (model_config or {}).get("stream")
+    return BEDROCK_STREAMING if value is None else bool(value)
+
+
+def is_prompt_cache_enabled(model_config: dict) -> bool:
+    """Prompt caching pedido para o modelo: chave "promptCache" do model_config ou BEDROCK_PROMPT_CACHE."""
+    value = (model_config or {}).get("promptCache")
+    return BEDROCK_PROMPT_CACHE if value is None else bool(value)
+
+
+# Alvos que rejeitaram cachePoint neste container (tabela desatualizada): seguem sem cache
+_PROMPT_CACHE_REJECTED = set()
+
+
+def get_prompt_cache_min_tokens(model_id: str):
+    """Mínimo de tokens do prefixo para cache no modelo, ou None se o modelo não suporta prompt caching."""
+    return get_model_spec(model_id)["promptCacheMinTokens"] if model_id else None
+
+
+def build_converse_blocks(system_prompt: str, user_message, min_cache_tokens=None) -> tuple:
+    """
+    Monta (system, content) do converse. user_message é texto ou lista de segmentos em que o
+    primeiro é o preâmbulo fixo (instruções) e os demais variam por chamada (transcrição).
+    Com min_cache_tokens, insere cachePoint após os guardrails (ou após o prompt personalizado,
+    se só assim o prefixo atinge o mínimo do modelo) e após o preâmbulo. Retorna também o
+    número de cache points inseridos.
+    """
+    segments = [user_message] if isinstance(user_message, str) else list(user_message)
+    if min_cache_tokens is None:
+        return [{"text": system_prompt}], [{"text": "".join(segments)}], 0
+
+    cache_point = {"cachePoint": {"type": "default"}}
+    system_parts = [system_prompt]
+    if _GUARDRAILS and system_prompt.startswith(_GUARDRAILS) and len(system_prompt) > len(_GUARDRAILS):
+        # Guardrails são idênticos em todos os vídeos; o prompt personalizado vem depois
+        system_parts = [_GUARDRAILS, system_prompt[len(_GUARDRAILS):]]
+    prefix_tokens = 0
+    cache_points = 0
+    system_blocks = []
+    for part in system_parts:
+        system_blocks.append({"text": part})
+        prefix_tokens += estimate_tokens(part)
+        if not cache_points and prefix_tokens >= min_cache_tokens:
+            system_blocks.append(cache_point)
+            cache_points += 1
+    user_blocks = [{"text": segments[0]}]
+    prefix_tokens += estimate_tokens(segments[0])
+    if len(segments) > 1 and prefix_tokens >= min_cache_tokens:
+        user_blocks.append(cache_point)
+        cache_points += 1
+    if len(segments) > 1:
+        user_blocks.append({"text": "".join(segments[1:])})
+    return system_blocks, user_blocks, cache_points
+
+
+def _invoke_model(user_message, system_prompt: str, model_config: dict, label: str = "", on_delta=None, deadline: float = None, usage_sink: dict = None) -> tuple:
+    """
+    Chama o Bedrock para uma mensagem percorrendo a cadeia de fallback (get_model_invocation_chain).
+    user_message: texto ou [preâmbulo fixo, conteúdo variável] (ver build_converse_blocks).
+    Em cada alvo: erros transitórios (throttling, indisponibilidade) são repetidos com backoff
+    exponencial + jitter enquanto houver tempo até o deadline; sem tempo para esperar, e nos demais
+    erros, passa ao próximo alvo. Alvos com circuito aberto são pulados. Sem tempo nem para chamar,
+    levanta o último erro (TimeoutError se nenhum alvo foi chamado). Retorna (texto, usage). label
+    identifica a etapa nos logs.
+    Com on_delta usa converse_stream e repassa as partes de texto acumuladas a cada delta.
+    usage_sink (opcional) acumula tokens e os alvos/modelos que efetivamente responderam.
+    """
+    tag = f" etapa={label}" if label else ""
+    chain = get_model_invocation_chain(model_config)
+    prompt_cache = is_prompt_cache_enabled(model_config)
+    input_chars = len(user_message) if isinstance(user_message, str) else sum(len(part) for part in user_message)
+    last_error = None
+
+    for target_id, model_id in chain:
+        if deadline is not None and time.time() + BEDROCK_DEADLINE_RESERVE_SECONDS > deadline:
+            print(f"[ERRO] Bedrock{tag}: sem tempo restante para chamar {target_id} (deadline da Lambda)")
+            break
+        breaker = _get_circuit_breaker(target_id)
+        if not breaker.allow():
+            print(f"[LLM] Circuito aberto para {target_id}; pulando para o próximo da cadeia{tag}")
+            continue
+        inference_config = get_inference_config_for_model(model_id, model_config, int(input_chars / CHARS_PER_TOKEN))
+        _log(f"Usando modelo: {target_id} (model_id={model_id})")
+        min_cache_tokens = None
+        if prompt_cache and target_id not in _PROMPT_CACHE_REJECTED:
+            min_cache_tokens = get_prompt_cache_min_tokens(model_id)
+        system_blocks, user_blocks, cache_points = build_converse_blocks(system_prompt, user_message, min_cache_tokens)
+
+        attempt = 0
+        while attempt < BEDROCK_MAX_ATTEMPTS:
+            attempt += 1
+            _BEDROCK_RATE_LIMITER.acquire(deadline)
+            started = time.perf_counter()
+            try:
+                # Log incondicional para auditoria no CloudWatch (modelo e tamanho do input)
+                print(f"[LLM] Chamando Bedrock: modelId={target_id} input_chars={input_chars} cache_points={cache_points} tentativa={attempt}{tag}")
+                with METRICS.timed("bedrock_converse", model_id=model_id):
+                    if on_delta is not None:
+                        output_text, usage = _converse_stream_text(target_id, system_blocks, user_blocks, inference_config, on_delta)
+                    else:
+                        output_text, usage = _converse_text(target_id, system_blocks, user_blocks, inference_config)
+            except (ClientError, BotoCoreError) as e:
+                last_error = e
+                err_code = _bedrock_error_code(e)
+                METRICS.count("BedrockErrors", model_id=model_id)
+                print(f"[ERRO] Bedrock{tag}: modelId={target_id} code={err_code} tentativa={attempt} message={e}")
+                if cache_points and err_code == "ValidationException":
+                    # Modelo/região sem suporte a cachePoint: repete sem cache (não conta como tentativa)
+                    print(f"[LLM] Prompt caching rejeitado por {target_id}; seguindo sem cache points{tag}")
+                    _PROMPT_CACHE_REJECTED.add(target_id)
+                    system_blocks, user_blocks, cache_points = build_converse_blocks(system_prompt, user_message)
+                    attempt -= 1
+                    continue
+                retryable = isinstance(e, BotoCoreError) or err_code.lower() in RETRYABLE_BEDROCK_ERRORS
+                if not retryable:
+                    break  # AccessDenied, validação etc.: próximo alvo da cadeia
+                breaker.record_failure()
+                if attempt == BEDROCK_MAX_ATTEMPTS or not breaker.allow():
+                    break
+                delay = _backoff_delay(attempt)
+                if deadline is not None and time.time() + delay + BEDROCK_DEADLINE_RESERVE_SECONDS > deadline:
+                    # Sem tempo para o backoff: o próximo alvo da cadeia é chamado sem espera
+                    print(f"[ERRO] Bedrock{tag}: sem tempo para nova tentativa em {target_id}; próximo alvo da cadeia")
+                    break
+                _log(f"Aguardando {delay:.2f}s antes da tentativa {attempt + 1} em {target_id}")
+                time.sleep(delay)
+                continue
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            breaker.record_success()
+            _accumulate_usage(usage_sink, usage, target_id, model_id)
+            for field, metric in (
+                ("inputTokens", "InputTokens"),
+                ("outputTokens", "OutputTokens"),
+                ("cacheReadInputTokens", "CacheReadTokens"),
+                ("cacheWriteInputTokens", "CacheWriteTokens"),
+            ):
+                METRICS.count(metric, usage.get(field), model_id=model_id)
+            METRICS.count("OutputChars", len(output_text), model_id=model_id)
+            # Log incondicional: sucesso da chamada LLM + tokens (auditoria CloudWatch)
+            print(
+                f"[LLM] Bedrock OK{tag}: modelId={target_id} output_chars={len(output_text)} inputTokens={usage.get('inputTokens', '?')} "
+                f"outputTokens={usage.get('outputTokens', '?')} totalTokens={usage.get('totalTokens', '?')} "
+                f"cacheReadTokens={usage.get('cacheReadInputTokens', 0)} cacheWriteTokens={usage.get('cacheWriteInputTokens', 0)} "
+                f"latency_ms={latency_ms:.0f}"
+            )
+            return output_text, usage
+
+    if last_error is None:
+        if deadline is not None and time.time() + BEDROCK_DEADLINE_RESERVE_SECONDS > deadline:
+            raise TimeoutError(f"Sem tempo restante para chamar o Bedrock{tag} (deadline da Lambda).")
+        raise RuntimeError("Nenhum alvo disponível na cadeia de modelos (circuitos abertos).")
+    _log(f"Erro ao chamar Bedrock: {last_error}", always=True)
+    raise last_error
+
+
+def _join_partials(partials: list) -> str:
+    return "\n\n".join(f"--- RESUMO PARCIAL {i + 1} ---\n{text}" for i, text in enumerate(partials))
+
+
+def _batch_partials(partials: list, budget: int) -> list:
+    """Agrupa resumos parciais consecutivos em lotes de até ~budget tokens (um parcial maior fica sozinho)."""
+    batches, current, size = [], [], 0
+    for text in partials:
+        tokens = estimate_tokens(text) + 10  # rótulo "--- RESUMO PARCIAL n ---"
+        if current and size + tokens > budget:
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _reduce_partial_batches(batches: list, system_prompt: str, model_config: dict, level: int, concurrency: int, deadline: float = None, usage: dict = None) -> list:
+    """Combina cada lote de resumos parciais em um parcial intermediário (em paralelo, na ordem dos lotes)."""
+    preamble = (
+        "Abaixo estão resumos parciais, em ordem cronológica, de trechos consecutivos de um vídeo longo. "
+        "Combine-os em um único resumo parcial detalhado em Markdown, conforme as regras, removendo "
+        "repetições e preservando tópicos, exemplos, números e conclusões. "
+        "Não escreva introdução nem conclusão geral do vídeo.\n\n"
+    )
+
+    def _reduce(index: int) -> str:
+        user_message = [
+            preamble,
+            "=== RESUMOS PARCIAIS INÍCIO ===\n"
+            f"{_join_partials(batches[index])}\n"
+            "=== RESUMOS PARCIAIS FIM ===",
+        ]
+        text, _ = _invoke_model(user_message, system_prompt, model_config, label=f"reduce-{level}-{index + 1}/{len(batches)}", deadline=deadline, usage_sink=usage)
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as executor:
+        return list(executor.map(_reduce, range(len(batches))))
+
+
+def _summarize_chunked(transcript_text: str, system_prompt: str, model_config: dict, chunking: dict, on_partial=None, deadline: float = None, usage: dict = None) -> str:
+    """
+    Map-reduce: resume chunks sobrepostos da transcrição em paralelo (pool limitado)
+    e depois combina os resumos parciais em um único resumo Markdown. Se os parciais juntos não
+    cabem numa chamada (get_single_call_budget), são combinados antes em lotes, nível a nível.
+    on_partial(saida, progresso) recebe os resumos parciais já prontos e as partes do reduce em streaming.
+    """
+    chunks = split_transcript_into_chunks(transcript_text, chunking["chunkTokens"], chunking["overlapTokens"])
+    workers = min(chunking["concurrency"], len(chunks))
+    print(
+        f"[LLM] Modo chunked: chunks={len(chunks)} chunk_tokens={chunking['chunkTokens']} "
+        f"overlap_tokens={chunking['overlapTokens']} concurrency={workers}"
+    )
+
+    # Preâmbulo idêntico em todos os chunks (prefixo cacheável); número do trecho vai no conteúdo
+    map_preamble = (
+        "Abaixo está um trecho da transcrição (já limpa) de um vídeo longo, dividida em trechos "
+        "que se sobrepõem levemente nas bordas. Gere um resumo parcial detalhado em Markdown "
+        "deste trecho, conforme as regras, preservando tópicos, exemplos, números e conclusões. "
+        "Não escreva introdução nem conclusão geral do vídeo.\n\n"
+    )
+
+    def _map(index: int) -> str:
+        user_message = [
+            map_preamble,
+            f"Trecho {index + 1} de {len(chunks)}.\n\n"
+            "=== TRECHO INÍCIO ===\n"
+            f"{chunks[index]}\n"
+            "=== TRECHO FIM ===",
+        ]
+        text, _ = _invoke_model(user_message, system_prompt, model_config, label=f"map-{index + 1}/{len(chunks)}", deadline=deadline, usage_sink=usage)
+        return text
+
+    partials = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_map, index): index for index in range(len(chunks))}
+        for done, future in enumerate(as_completed(futures), start=1):
+            partials[futures[future]] = future.result()
+            if on_partial is not None:
+                ready = "\n\n".join(text for text in partials if text is not None)
+                on_partial(ready, {"stage": "map", "done": done, "total": len(chunks)})
+
+    # Reduce hierárquico: enquanto os parciais não cabem numa chamada, combina lotes consecutivos
+    budget = get_single_call_budget(model_config.get("id") or MODEL_ID, model_config) or chunking["thresholdTokens"]
+    level = 0
+    while len(partials) > 1 and estimate_tokens(_join_partials(partials)) > budget:
+        batches = _batch_partials(partials, budget)
+        if len(batches) == len(partials):
+            _log(f"Resumos parciais individuais excedem ~{budget} tokens; seguindo para o reduce final", always=True)
+            break
+        level += 1
+        print(f"[LLM] Reduce hierárquico: nível {level}, {len(partials)} parciais -> {len(batches)} lotes (budget ~{budget} tokens)")
+        partials = _reduce_partial_batches(batches, system_prompt, model_config, level, chunking["concurrency"], deadline, usage)
+        if on_partial is not None:
+            on_partial("\n\n".join(partials), {"stage": f"reduce-{level}"})
+
+    joined = _join_partials(partials)
+    reduce_message = [
+        "Abaixo estão resumos parciais, em ordem cronológica, de trechos consecutivos (com leve sobreposição) "
+        "da transcrição de um vídeo. Combine-os em um único resumo detalhado em Markdown, conforme as regras, "
+        "removendo repetições e mantendo a ordem dos assuntos.\n\n"
+        "IMPORTANTE: Entregue o resumo em Markdown puro, sem envolver em blocos de código (```). "
+        "O conteúdo será renderizado diretamente - use tabelas, listas e cabeçalhos normalmente.\n\n",
+        "=== RESUMOS PARCIAIS INÍCIO ===\n"
+        f"{joined}\n"
+        "=== RESUMOS PARCIAIS FIM ===",
+    ]
+    on_delta = None
+    if on_partial is not None:
+        def on_delta(parts):
+            on_partial(parts, {"stage": "reduce"})
+    text, _ = _invoke_model(reduce_message, system_prompt, model_config, label="reduce", on_delta=on_delta, deadline=deadline, usage_sink=usage)
+    return text
+
+
+def call_bedrock_nova(transcript_text: str, system_prompt: str, model_config: dict, on_partial=None, deadline: float = None, usage: dict = None) -> str:
     """
     Chama o Amazon Bedrock para gerar um resumo detalhado em Markdown.
-    model_config: dict com id, temperature, topP, topK.
+    model_config: dict com id, temperature, topP, topK (e opcionais: chunked, streaming, fallback).
+    O inference profile e os modelos de fallback vêm de get_model_invocation_chain.
+    deadline: instante (epoch) em que a invocação expira; limita esperas de retry/backoff.
+    usage: dict opcional preenchido com tokens somados e os modelos que responderam.
+    Transcrições acima de chunkThresholdTokens (estimados) usam o modo chunked (map-reduce).
+    on_partial(saida, progresso): com streaming habilitado, recebe a saída parcial (lista de deltas do
+    modelo, juntada só no flush, ou o texto dos resumos parciais já prontos no map-reduce).
     """
-    model_id = model_config.get("id", "")
-    user_message = (
+    if not is_streaming_enabled(model_config):
+        on_partial = None
+    chunking = get_chunking_config(model_config)
+    estimated_tokens = estimate_tokens(transcript_text)
+    if estimated_tokens > chunking["thresholdTokens"]:
+        _log(f"Transcrição com ~{estimated_tokens} tokens excede {chunking['thresholdTokens']}; usando modo chunked")
+        return _summarize_chunked(transcript_text, system_prompt, model_config, chunking, on_partial, deadline, usage)
+
+    # [preâmbulo fixo, transcrição]: com prompt caching o preâmbulo entra no prefixo em cache
+    user_message = [
         "Abaixo está a transcrição (já limpa) de um vídeo. "
         "Gere um resumo detalhado em Markdown, conforme as regras.\n\n"
         "IMPORTANTE: Entregue o resumo em Markdown puro, sem envolver em blocos de código (```). "
-        "O conteúdo será renderizado diretamente - use tabelas, listas e cabeçalhos normalmente.\n\n"
+        "O conteúdo será renderizado diretamente - use tabelas, listas e cabeçalhos normalmente.\n\n",
         "=== TRANSCRIÇÃO INÍCIO ===\n"
         f"{transcript_text}\n"
-        "=== TRANSCRIÇÃO FIM ==="
-    )
+        "=== TRANSCRIÇÃO FIM ===",
+    ]
+    on_delta = None
+    if on_partial is not None:
+        def on_delta(parts):
+            on_partial(parts, {"stage": "single"})
+    text, _ = _invoke_model(user_message, system_prompt, model_config, on_delta=on_delta, deadline=deadline, usage_sink=usage)
+    return text
+
+
+_LOCAL_IDEMPOTENCY_STORE = LocalIdempotencyStore()
+# Contador de eventos duplicados ignorados neste container
+_IDEMPOTENCY_STATS = {"skipped_duplicate": 0}
+
+
+def get_idempotency_store(bucket: str):
+    """Retorna o ledger configurado em IDEMPOTENCY_STORE (None quando desligado)."""
+    if IDEMPOTENCY_STORE == "off":
+        return None
+    if IDEMPOTENCY_STORE == "local":
+        return _LOCAL_IDEMPOTENCY_STORE
+    return S3IdempotencyStore(s3_client, bucket, IDEMPOTENCY_PREFIX)
+
+
+def compute_idempotency_key(srt_etag: str, model_config: dict, system_prompt: str) -> str:
+    """
+    Chave de idempotência: hash do ETag da legenda (vem no evento, então a chave sai antes de ler o
+    SRT; a cópia para a legenda canônica mantém o ETag e gera a mesma chave), do model_config como
+    configurado (id + parâmetros; "auto" antes do roteamento) e do system prompt (um prompt novo deve
+    gerar novo resumo).
+    """
+    material = {
+        "srt_etag": srt_etag,
+        "model": model_config,
+        "prompt": hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def check_idempotency(store, token: str, now: float = None):
+    """
+    Consulta o ledger. Retorna o registro existente quando o evento é duplicado:
+    trabalho concluído dentro de IDEMPOTENCY_TTL_SECONDS, em andamento com lease válido ou
+    falha parcial de fan-out ainda no cooldown (IDEMPOTENCY_FAILED_COOLDOWN_SECONDS).
+    Retorna None quando o evento deve ser processado (inclui retries após falha/timeout).
+    """
+    return _active_record(store.get(token), now)
+
+
+def _active_record(record, now: float = None):
+    """Retorna o registro quando ele ainda marca o evento como duplicado (ver check_idempotency)."""
+    now = time.time() if now is None else now
+    if not record:
+        return None
+    if record.get("status") == "completed" and now - record.get("completed_at", 0) < IDEMPOTENCY_TTL_SECONDS:
+        return record
+    if record.get("status") in ("in_progress", "failed") and now < record.get("expires_at", 0):
+        return record
+    return None
+
 
+def _partition_by_idempotency(store, srt_etag: str, model_configs: list, system_prompt: str) -> tuple:
+    """
+    Separa as configs pelo ledger em pendentes [(cfg, chave, etag)] e duplicadas
+    [(cfg, chave, registro, etag)]; o ETag lido condiciona a escrita seguinte do marcador.
+    """
+    pending, skipped = [], []
+    for cfg in model_configs:
+        idempotency_key = compute_idempotency_key(srt_etag, cfg, system_prompt)
+        record, etag = store.get_versioned(idempotency_key) if store is not None else (None, None)
+        existing = _active_record(record)
+        if existing:
+            skipped.append((cfg, idempotency_key, existing, etag))
+        else:
+            pending.append((cfg, idempotency_key, etag))
+    return pending, skipped
+
+
+def _remaining_seconds(context, default: float = 120.0) -> float:
+    """Tempo restante da invocação (segundos); default quando não há context (execução local)."""
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        return context.get_remaining_time_in_millis() / 1000.0
+    return default
+
+
+def _release_leases(store, pending: list):
+    """Remove os marcadores in_progress desta invocação para que o retry da Lambda possa reprocessar."""
+    if store is None:
+        return
+    for _, idempotency_key, _ in pending:
+        try:
+            store.delete(idempotency_key)
+        except ClientError as e:
+            _log(f"Erro ao liberar ledger: {e}", always=True)
+
+
+def _record_duplicate(store, token: str, record: dict, etag=None):
+    """Incrementa o contador de duplicados (container + marcador) sem falhar a invocação."""
+    _IDEMPOTENCY_STATS["skipped_duplicate"] += 1
+    if store is None:
+        return
+    record["duplicates"] = int(record.get("duplicates", 0)) + 1
+    record["last_duplicate_at"] = time.time()
     try:
-        # Se houver inference profile configurado, use-o como modelId
-        # A API converse aceita inference profile ID como modelId
-        # Caso contrário, use o model_id diretamente
-        model_id_to_use = inference_profile if inference_profile else model_id
-        
-        # Log incondicional para auditoria no CloudWatch (modelo e tamanho do input)
-        print(f"[LLM] Chamando Bedrock: modelId={model_id_to_use} input_chars={len(transcript_text)}")
-        _log(f"Usando modelo: {model_id_to_use} (model_id={model_id}, inference_profile={inference_profile})")
-        
-        inference_config = get_inference_config_for_model(model_id, model_config)
-        response = bedrock_client.converse(
-            modelId=model_id_to_use,
-            system=[{"text": system_prompt}],
-            messages=[
-                {
-                    "role": "user",
-                    "content": [{"text": user_message}],
-                }
-            ],
-            inferenceConfig=inference_config,
+        # Condicional: não sobrescreve a conclusão gravada pela invocação dona do lease nesse meio-tempo
+        store.claim(token, record, etag)
+    except ClientError as e:
+        _log(f"Erro ao atualizar contador do ledger: {e}")
+
+
+# Estatísticas do cache de resumos neste container
+_SUMMARY_CACHE_STATS = {"hits": 0, "misses": 0, "evicted": 0}
+_SUMMARY_CACHE_STATS_LOCK = threading.Lock()
+
+
+def compute_summary_cache_key(plain_text: str, system_prompt: str, model_config: dict) -> str:
+    """Hash do conteúdo que determina o resumo: transcrição limpa, system prompt e config completa do modelo."""
+    digest = hashlib.sha256()
+    for part in (plain_text, system_prompt, json.dumps(model_config, sort_keys=True)):
+        digest.update(hashlib.sha256(part.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+def copy_cached_summary(bucket: str, cache_key: str, output_bucket: str, output_key: str) -> bool:
+    """
+    Copia o resumo em cache (se existir) para output_key via copy_object, sem trafegar o corpo
+    pela Lambda. Retorna True em hit, False em miss.
+    """
+    cache_object_key = f"{SUMMARY_CACHE_PREFIX}{cache_key}.md"
+    try:
+        s3_client.copy_object(
+            Bucket=output_bucket,
+            Key=output_key,
+            CopySource={"Bucket": bucket, "Key": cache_object_key},
+            MetadataDirective="REPLACE",
+            ContentType="text/markdown",
         )
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in S3_MISSING_CODES:
+            _log(f"Erro ao ler cache de resumo {cache_object_key}: {e}", always=True)
+        return False
 
-        content_blocks = response["output"]["message"]["content"]
-        usage = response.get("usage", {})
-        input_tok = usage.get("inputTokens", "?")
-        output_tok = usage.get("outputTokens", "?")
-        total_tok = usage.get("totalTokens", "?")
-        # pego o primeiro bloco de texto
-        for block in content_blocks:
-            if "text" in block:
-                output_text = block["text"]
-                # Log incondicional: sucesso da chamada LLM + tokens (auditoria CloudWatch)
-                print(f"[LLM] Bedrock OK: output_chars={len(output_text)} inputTokens={input_tok} outputTokens={output_tok} totalTokens={total_tok}")
-                return output_text
 
-        raise RuntimeError("Resposta do modelo não contém texto.")
+def store_summary_in_cache(bucket: str, cache_key: str, summary_md: str):
+    """Grava o resumo no cache (falhas não interrompem o job)."""
+    cache_object_key = f"{SUMMARY_CACHE_PREFIX}{cache_key}.md"
+    try:
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=cache_object_key,
+            Body=summary_md.encode("utf-8"),
+            ContentType="text/markdown",
+        )
+        _log(f"Resumo gravado no cache em s3://{bucket}/{cache_object_key}")
     except ClientError as e:
-        err = e.response.get("Error", {})
-        err_code = err.get("Code", "Unknown")
-        err_msg = err.get("Message", str(e))
-        # Fallback: se AccessDenied com inference profile, tenta modelo base (pode funcionar em algumas regiões)
-        if err_code == "AccessDeniedException" and inference_profile and model_id != model_id_to_use:
-            print(f"[LLM] AccessDenied com inference profile. Tentando modelo base: {model_id}")
-            try:
-                inference_config = get_inference_config_for_model(model_id, model_config)
-                response = bedrock_client.converse(
-                    modelId=model_id,
-                    system=[{"text": system_prompt}],
-                    messages=[{"role": "user", "content": [{"text": user_message}]}],
-                    inferenceConfig=inference_config,
-                )
-                content_blocks = response["output"]["message"]["content"]
-                for block in content_blocks:
-                    if "text" in block:
-                        output_text = block["text"]
-                        print(f"[LLM] Bedrock OK (modelo base): output_chars={len(output_text)}")
-                        return output_text
-            except ClientError:
-                pass  # Mantém o erro original
-        print(f"[ERRO] Bedrock: code={err_code} message={err_msg}")
-        _log(f"Erro ao chamar Bedrock: {e}", always=True)
-        raise e
+        _log(f"Erro ao gravar cache de resumo: {e}", always=True)
+
+
+def should_evict_summary_cache() -> bool:
+    """Sorteia se esta gravação no cache roda a evicção por tamanho (SUMMARY_CACHE_EVICTION_SAMPLE_RATE)."""
+    return random.random() < SUMMARY_CACHE_EVICTION_SAMPLE_RATE
+
 
+def evict_summary_cache(bucket: str) -> int:
+    """
+    Evicção por tamanho do cache de resumos: se o total exceder SUMMARY_CACHE_MAX_BYTES, remove os
+    objetos mais antigos até caber (a idade é limitada pelo lifecycle do bucket).
+    Retorna o número de objetos removidos.
+    """
+    entries = []
+    token = None
+    while True:
+        kwargs = {"Bucket": bucket, "Prefix": SUMMARY_CACHE_PREFIX}
+        if token:
+            kwargs["ContinuationToken"] = token
+        response = s3_client.list_objects_v2(**kwargs)
+        for obj in response.get("Contents", []):
+            entries.append((obj["LastModified"].timestamp(), obj["Size"], obj["Key"]))
+        if not response.get("IsTruncated"):
+            break
+        token = response.get("NextContinuationToken")
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    to_delete = []
+    for _, size, key in entries:
+        if total <= SUMMARY_CACHE_MAX_BYTES:
+            break
+        to_delete.append(key)
+        total -= size
+
+    # delete_objects aceita até 1000 chaves por chamada
+    for i in range(0, len(to_delete), 1000):
+        batch = to_delete[i : i + 1000]
+        s3_client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in batch], "Quiet": True})
+    if to_delete:
+        _log(f"Cache de resumos: {len(to_delete)} objeto(s) removido(s) por tamanho")
+    return len(to_delete)
+
+
+class PartialSummaryWriter:
+    """
+    Grava a saída parcial do modelo em {base}-{slug}.partial.md enquanto o resumo é gerado.
+    Flush no máximo a cada STREAM_FLUSH_SECONDS (e forçado perto do deadline da invocação), com
+    progresso em metadata do objeto. O resumo final é gravado atomicamente no .md definitivo e o
+    parcial é removido em finalize(); se a Lambda expirar antes, o último parcial continua legível.
+    on_first_write(key) é chamado uma vez, após a primeira gravação (registro no manifesto/catálogo).
+    """
+
+    def __init__(self, bucket: str, key: str, header: str = "", deadline: float = None, on_first_write=None):
+        self.bucket = bucket
+        self.key = key
+        self.header = header
+        self.deadline = deadline
+        self.on_first_write = on_first_write
+        self.started_at = time.time()
+        self.written = False
+        self.flushes = 0
+        self._last_flush = 0.0
+        self._forced_deadline_flush = False
+        self._lock = threading.Lock()
 
+    def update(self, parts, progress: dict = None):
+        """
+        Registra a saída acumulada (texto ou lista de partes, juntada só no flush); grava no S3 se o
+        intervalo de flush passou ou o deadline está próximo.
+        """
+        now = time.time()
+        near_deadline = (
+            self.deadline is not None
+            and not self._forced_deadline_flush
+            and self.deadline - now < STREAM_DEADLINE_MARGIN_SECONDS
+        )
+        if not near_deadline and now - self._last_flush < STREAM_FLUSH_SECONDS:
+            return
+        with self._lock:
+            if near_deadline:
+                self._forced_deadline_flush = True
+            self._last_flush = now
+            text = parts if isinstance(parts, str) else "".join(parts)
+            self._flush(text, progress or {}, now)
+
+    def _flush(self, text: str, progress: dict, now: float):
+        metadata = {
+            "status": "streaming",
+            "output-chars": str(len(text)),
+            "elapsed-ms": str(int((now - self.started_at) * 1000)),
+        }
+        metadata.update({f"progress-{k}": str(v) for k, v in progress.items()})
+        try:
+            s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=(self.header + text).encode("utf-8"),
+                ContentType="text/markdown",
+                Metadata=metadata,
+            )
+            first_write = not self.written
+            self.written = True
+            self.flushes += 1
+            _log(f"Resumo parcial gravado em s3://{self.bucket}/{self.key} ({len(text)} caracteres)")
+        except ClientError as e:
+            _log(f"Erro ao gravar resumo parcial (não crítico): {e}")
+            return
+        if first_write and self.on_first_write is not None:
+            self.on_first_write(self.key)
+
+    def finalize(self):
+        """Remove o parcial depois que o resumo final foi gravado."""
+        if not self.written:
+            return
+        try:
+            s3_client.delete_object(Bucket=self.bucket, Key=self.key)
+        except ClientError as e:
+            _log(f"Erro ao remover resumo parcial {self.key} (não crítico): {e}")
+
+
+class S3IOExecutor:
+    """
+    Executor pequeno para operações S3 independentes dentro do handler. Todas usam o
+    s3_client compartilhado (thread-safe, pool de conexões dimensionado para S3_IO_CONCURRENCY)
+    e registram a duração de cada operação em timings_ms.
+    """
+
+    def __init__(self, max_workers: int = S3_IO_CONCURRENCY):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="s3io")
+        self._lock = threading.Lock()
+        self.timings_ms = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._executor.shutdown(wait=True)
+        return False
+
+    @contextmanager
+    def timed(self, name: str):
+        """Mede uma operação executada na thread atual (ex.: passos dependentes de uma cadeia)."""
+        start = time.perf_counter()
+        try:
+            with METRICS.timed(name.rsplit(".", 1)[-1]):
+                yield
+        finally:
+            elapsed = round((time.perf_counter() - start) * 1000, 1)
+            with self._lock:
+                self.timings_ms[name] = elapsed
+
+    def submit(self, name: str, fn, *args, **kwargs):
+        """Agenda fn(*args, **kwargs) no pool; retorna o Future."""
+
+        def _run():
+            with self.timed(name):
+                return fn(*args, **kwargs)
+
+        return self._executor.submit(_run)
+
+
+@METRICS.instrument_handler
 def lambda_handler(event, context):
     # Log incondicional no início - garante que invocações apareçam no CloudWatch
     detail = event.get("detail", {})
@@ -357,128 +1499,506 @@ def lambda_handler(event, context):
 
     key = urllib.parse.unquote_plus(key)
 
+    # Legenda ou resumo excluído (app ou console): remove a referência do manifesto e do catálogo
+    if event.get("detail-type") == "Object Deleted":
+        return _handle_object_deleted(bucket, key)
+
     # Só processa arquivos .srt
     if not key.lower().endswith(".srt"):
         _log(f"Ignorando objeto {key}, não é .srt.", always=True)
         return {"status": "ignored", "key": key}
 
+    return summarize_srt_object(bucket, key, context, obj.get("etag"))
+
+
+def summarize_srt_object(bucket: str, key: str, context=None, event_etag: str = None, model_configs: list = None, touch_srt: bool = True) -> dict:
+    """
+    Processa um .srt do bucket: prompt, config do(s) modelo(s), idempotência por modelo e, só para os
+    modelos pendentes, leitura (SRT ou transcrição limpa) e resumo. Usada pelo handler (evento do
+    EventBridge) e pelo backfill (script/backfill_summaries.py), que passa model_configs explícitos e
+    touch_srt=False para não copiar a legenda (a cópia gera um novo evento Object Created para esta Lambda).
+    """
     _log(f"Lendo arquivo SRT s3://{bucket}/{key}", always=True)
 
+    # Extrai o nome base do arquivo .srt (removendo prefixo e timestamp)
+    srt_filename = key.split("/")[-1]
+    video_base_name = extract_video_base_name(srt_filename)
+    _log(f"Nome base do vídeo extraído: {video_base_name} (de {srt_filename})")
+
+    with S3IOExecutor() as io:
+        # ETag da legenda (do evento; head_object sem ele), prompt e config do modelo são leituras independentes
+        etag_future = io.submit("head_srt", _resolve_srt_etag, bucket, key, event_etag)
+        prompt_future = io.submit("get_system_prompt", get_system_prompt, video_base_name, bucket)
+        model_future = None
+        if model_configs is None:
+            model_future = io.submit("get_model_config", get_selected_model_configs, video_base_name, bucket)
+        try:
+            srt_etag = etag_future.result()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in S3_MISSING_CODES:
+                return _source_missing(key)
+            _log(f"Erro ao ler SRT do S3: {e}", always=True)
+            raise
+        system_prompt = prompt_future.result()
+        # Config do(s) modelo(s) (id, temperature, topP, topK)
+        if model_future is not None:
+            model_configs = model_future.result()
+    pre_timings = dict(io.timings_ms)
+
+    # Idempotência por modelo antes de ler o SRT: eventos duplicados (retries, replays e a criação da
+    # legenda canônica por esta Lambda) são descartados sem baixar, parsear nem chamar o modelo
+    store = get_idempotency_store(bucket)
+    pending, skipped = _partition_by_idempotency(store, srt_etag, model_configs, system_prompt)
+    if skipped:
+        # Prompt e config podem ter vindo do cache de config (TTL) logo depois de o app gravar novos e
+        # redisparar: revalida no S3 (GET condicional) antes de tratar o evento como duplicado
+        with S3IOExecutor() as io:
+            prompt_future = io.submit("revalidate_system_prompt", get_system_prompt, video_base_name, bucket, 0)
+            configs_future = None
+            if model_future is not None:
+                configs_future = io.submit("revalidate_model_config", get_selected_model_configs, video_base_name, bucket, 0)
+            fresh_prompt = prompt_future.result()
+            fresh_configs = configs_future.result() if configs_future is not None else model_configs
+        pre_timings.update(io.timings_ms)
+        if fresh_prompt != system_prompt or fresh_configs != model_configs:
+            _log("Prompt/config do modelo mudaram no S3 desde o cache; recalculando a idempotência", always=True)
+            system_prompt, model_configs = fresh_prompt, fresh_configs
+            pending, skipped = _partition_by_idempotency(store, srt_etag, model_configs, system_prompt)
+    if store is not None:
+        # Reivindica cada chave com escrita condicional: entre a leitura do ledger e esta escrita outra
+        # entrega do mesmo evento pode ter gravado o marcador; quem perde a corrida trata como duplicado
+        claimed = []
+        try:
+            for cfg, idempotency_key, etag in pending:
+                marker = {
+                    "status": "in_progress",
+                    "source_key": key,
+                    "model_id": cfg["id"],
+                    "started_at": time.time(),
+                    # Lease até o fim desta invocação: um retry após timeout não é tratado como duplicado
+                    "expires_at": time.time() + _remaining_seconds(context),
+                }
+                if store.claim(idempotency_key, marker, etag):
+                    claimed.append((cfg, idempotency_key, etag))
+                else:
+                    record, current_etag = store.get_versioned(idempotency_key)
+                    skipped.append((cfg, idempotency_key, record or marker, current_etag))
+            pending = claimed
+        except ClientError as e:
+            # Ledger é otimização: sem ele o evento é processado normalmente
+            _log(f"Erro ao gravar ledger (seguindo sem idempotência): {e}", always=True)
+            lost = {idempotency_key for _, idempotency_key, _, _ in skipped}
+            pending = [entry for entry in pending if entry[1] not in lost]
+            store = None
+    for cfg, idempotency_key, existing, etag in skipped:
+        _record_duplicate(store, idempotency_key, existing, etag)
+        print(
+            f"[SKIP] Evento duplicado ignorado: key={key} model={cfg['id']} "
+            f"status_anterior={existing.get('status')} duplicates={existing.get('duplicates')}"
+        )
+        METRICS.count("DuplicatesSkipped", model_id=cfg["id"])
+
+    if not pending:
+        _, idempotency_key, existing, _ = skipped[0]
+        return {
+            "status": "skipped_duplicate",
+            "key": key,
+            "idempotency_key": idempotency_key,
+            "output_key": existing.get("output_key"),
+            "duplicate_count": existing.get("duplicates", 0),
+            "skipped_duplicate_total": _IDEMPOTENCY_STATS["skipped_duplicate"],
+            "skipped_models": [cfg["id"] for cfg, _, _, _ in skipped],
+        }
+
     try:
-        s3_response = s3_client.get_object(Bucket=bucket, Key=key)
-        srt_bytes = s3_response["Body"].read()
-        srt_text = srt_bytes.decode("utf-8", errors="ignore")
-    except ClientError as e:
-        _log(f"Erro ao ler SRT do S3: {e}", always=True)
+        try:
+            with S3IOExecutor() as io, io.timed("get_srt"):
+                srt_doc = _load_srt_document(bucket, key, video_base_name, srt_etag)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in S3_MISSING_CODES:
+                _release_leases(store, pending)
+                return _source_missing(key)
+            _log(f"Erro ao ler SRT do S3: {e}", always=True)
+            raise
+        pre_timings.update(io.timings_ms)
+        # Roteamento só para os modelos pendentes (a chave usa a config "auto"); estimativa antes da compactação
+        if any(cfg.get("auto") for cfg, _, _ in pending):
+            routed = route_model_configs([cfg for cfg, _, _ in pending], estimate_tokens(srt_doc.plain_text()))
+            pending = [(cfg, idempotency_key, etag) for cfg, (_, idempotency_key, etag) in zip(routed, pending)]
+        deadline = time.time() + _remaining_seconds(context)
+        result = _summarize_srt(bucket, key, srt_doc, video_base_name, system_prompt, [cfg for cfg, _, _ in pending], deadline, touch_srt)
+        result["io_timings_ms"] = {**pre_timings, **result.get("io_timings_ms", {})}
+    except Exception:
+        # Libera os leases para que o retry automático da Lambda possa reprocessar
+        _release_leases(store, pending)
         raise
 
-    plain_text = extract_plain_text_from_srt(srt_text)
-    _log(f"Tamanho do texto extraído: {len(plain_text)} caracteres")
+    if store is not None:
+        outputs = {r["model_id"]: r["output_key"] for r in result.get("models", [])}
+        for cfg, idempotency_key, _ in pending:
+            if cfg["id"] in result.get("failed_models", {}):
+                record = {
+                    "status": "failed",
+                    "source_key": key,
+                    "model_id": cfg["id"],
+                    "error": result["failed_models"][cfg["id"]],
+                    "expires_at": time.time() + IDEMPOTENCY_FAILED_COOLDOWN_SECONDS,
+                }
+            else:
+                record = {
+                    "status": "completed",
+                    "source_key": key,
+                    "model_id": cfg["id"],
+                    "output_key": outputs.get(cfg["id"], result.get("output_key")),
+                    "completed_at": time.time(),
+                    "duplicates": 0,
+                }
+            try:
+                store.put(idempotency_key, record)
+            except ClientError as e:
+                _log(f"Erro ao registrar conclusão no ledger: {e}", always=True)
+    result["idempotency_key"] = pending[0][1]
+    if skipped:
+        result["skipped_models"] = [cfg["id"] for cfg, _, _, _ in skipped]
+    return result
+
+
+def _summarize_srt(bucket: str, key: str, srt_doc: SrtDocument, video_base_name: str, system_prompt: str, model_configs: list, deadline: float = None, touch_srt: bool = True) -> dict:
+    """
+    Extrai e compacta o texto do SRT uma vez, resume com cada modelo em paralelo (fan-out) e grava
+    a legenda canônica (cópia do arquivo do Transcribe), a transcrição limpa e o ETag do vídeo. Falha de um modelo não impede
+    os demais; só propaga exceção se nenhum modelo gerou resumo. Retorna o resultado da invocação.
+    deadline: instante (epoch) em que a invocação expira (retries e flush forçado do parcial).
+    touch_srt=False (backfill): não copia a legenda; o ETag lido do SRT vale para a transcrição limpa.
+    """
+    plain_text = srt_doc.plain_text()
+    _log(f"Tamanho do texto extraído: {len(plain_text)} caracteres ({len(srt_doc.cues)} legendas, origem={srt_doc.source})")
 
     if not plain_text.strip():
         _log("Transcrição vazia após limpeza. Nada a fazer.", always=True)
         return {"status": "empty_transcript"}
 
-    # Obtém o prompt (personalizado ou padrão)
-    # Extrai o nome base do arquivo .srt (removendo prefixo e timestamp)
-    srt_filename = key.split("/")[-1]
-    video_base_name = extract_video_base_name(srt_filename)
-    _log(f"Nome base do vídeo extraído: {video_base_name} (de {srt_filename})")
-    system_prompt = get_system_prompt(video_base_name, bucket)
-    
-    # Obtém a config do modelo (id, temperature, topP, topK)
-    model_config = get_selected_model_config(video_base_name, bucket)
-    selected_model_id = model_config["id"]
-    selected_inference_profile = get_inference_profile_for_model(selected_model_id)
-    print(f"[MODEL] Usando modelo: {selected_model_id} (inference_profile={selected_inference_profile}) temp={model_config.get('temperature')} topP={model_config.get('topP')}")
-
-    summary_md = call_bedrock_nova(plain_text, system_prompt, model_config, selected_inference_profile)
-
-    # Cabeçalho com modelo LLM utilizado (início do arquivo)
-    model_header = f"> *Modelo LLM: {selected_model_id}*\n\n"
-    summary_md = model_header + summary_md
-
-    # Atualiza o .srt com cabeçalho indicando o modelo LLM (para rastreabilidade)
-    # Remove cabeçalho existente se houver (evita duplicação em reprocessamento)
-    srt_content = srt_text
-    if srt_text.strip().startswith("# Modelo LLM:"):
-        first_blank = srt_text.find("\n\n")
-        if first_blank >= 0:
-            srt_content = srt_text[first_blank + 2 :].lstrip()
-    srt_header = f"# Modelo LLM: {selected_model_id}\n\n"
-    srt_with_header = srt_header + srt_content
-    try:
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=srt_with_header.encode("utf-8"),
-            ContentType="text/plain; charset=utf-8",
-        )
-        _log(f"Legenda atualizada com cabeçalho do modelo em s3://{bucket}/{key}")
-    except ClientError as e:
-        _log(f"Erro ao atualizar legenda com cabeçalho: {e}", always=True)
-        # Não falha o job - o resumo é o principal
-
-    # Legenda canônica: model/transcribe/{video_base_name}.srt (relaciona legenda ao vídeo)
-    # Arquivo .video-etag armazena o ETag do vídeo no momento da transcrição (para validar se legenda ainda corresponde)
-    canonical_srt_key = f"{MODEL_PREFIX}transcribe/{video_base_name}.srt"
-    video_key = f"{MODEL_PREFIX}video/{video_base_name}.mp4"
-    if key != canonical_srt_key:
-        try:
-            s3_client.put_object(
-                Bucket=bucket,
-                Key=canonical_srt_key,
-                Body=srt_with_header.encode("utf-8"),
-                ContentType="text/plain; charset=utf-8",
+    # Compactação (menos tokens de entrada = menor custo e latência)
+    raw_chars, raw_tokens = len(plain_text), estimate_tokens(plain_text)
+    with METRICS.timed("compaction"):
+        plain_text = compact_transcript(plain_text)
+    compact_tokens = estimate_tokens(plain_text)
+    METRICS.count("TranscriptChars", raw_chars)
+    METRICS.count("CompactedChars", len(plain_text))
+    METRICS.count("EstimatedInputTokens", compact_tokens)
+    reduction = 100.0 * (1 - compact_tokens / raw_tokens) if raw_tokens else 0.0
+    print(
+        f"[LLM] Compactação: chars={raw_chars}->{len(plain_text)} "
+        f"tokens_estimados={raw_tokens}->{compact_tokens} reducao={reduction:.1f}% etapas={TRANSCRIPT_COMPACTION}"
+    )
+
+    if not OUTPUT_BUCKET:
+        print("[ERRO] SUMMARY_OUTPUT_BUCKET não configurado. Verifique as variáveis de ambiente da Lambda.")
+        raise RuntimeError("SUMMARY_OUTPUT_BUCKET não configurado")
+
+    # Fan-out: cada modelo grava seu {base}-{slug}.md; token bucket e circuit breaker são compartilhados
+    model_results, errors = [], {}
+    workers = max(1, min(MODEL_FANOUT_CONCURRENCY, len(model_configs)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_summarize_with_model, bucket, video_base_name, plain_text, system_prompt, cfg, deadline): cfg
+            for cfg in model_configs
+        }
+        for future in as_completed(futures):
+            cfg = futures[future]
+            try:
+                model_results.append(future.result())
+            except Exception as e:
+                print(f"[ERRO] Falha ao resumir com {cfg['id']}: {type(e).__name__}: {e}")
+                errors[cfg["id"]] = e
+    if not model_results:
+        raise next(iter(errors.values()))
+    # Ordem do JSON de modelos (as_completed devolve na ordem de conclusão)
+    order = [cfg["id"] for cfg in model_configs]
+    model_results.sort(key=lambda r: order.index(r["model_id"]))
+
+    # Gravações da legenda em paralelo. Restrições de ordem preservadas dentro de cada cadeia:
+    # o original só é removido depois que a legenda canônica foi gravada, e o .video-etag e a
+    # transcrição limpa só são gravados com o ETag da legenda canônica já conhecido.
+    # Os modelos usados ficam só no manifesto (record_summaries): a legenda canônica nunca é regravada,
+    # porque cada gravação em model/transcribe/*.srt dispara esta Lambda de novo
+    artifacts = _transcript_artifacts(bucket)
+    canonical_srt_key = artifacts.canonical_srt_key(video_base_name)
+    with S3IOExecutor() as io:
+        srt_future = None
+        if touch_srt and key != canonical_srt_key:
+            srt_future = io.submit("srt_outputs", artifacts.copy_canonical_srt, key, video_base_name, io.timed)
+        index_future = None
+        # Vindo do artefato, o índice já foi gravado junto com ele (mesmo conteúdo de SRT)
+        if SEARCH_INDEX_ENABLED and srt_doc.source == "srt":
+            index_future = io.submit("put_search_index", artifacts.write_search_index, video_base_name, srt_doc)
+        video_etag_future = None
+        if touch_srt and key != canonical_srt_key:
+            video_etag_future = io.submit("head_video", artifacts.head_video_etag, video_base_name)
+        if srt_future is not None:
+            canonical_created, canonical_etag = srt_future.result()
+        else:
+            canonical_created = False
+            canonical_etag = srt_doc.etag if key == canonical_srt_key else None
+        if TRANSCRIPT_ARTIFACT_ENABLED and srt_doc.source == "srt" and canonical_etag:
+            io.submit(
+                "put_transcript_artifact",
+                artifacts.write_transcript,
+                video_base_name,
+                srt_doc,
+                canonical_etag,
+                estimate_tokens(srt_doc.plain_text()),
             )
-            _log(f"Legenda canônica criada em s3://{bucket}/{canonical_srt_key}")
-            # Remove o arquivo original (meetup-*-timestamp.srt) para evitar duplicata na listagem
+        video_etag = video_etag_future.result() if video_etag_future else None
+        if canonical_created and video_etag is not None:
+            with io.timed("put_video_etag"):
+                artifacts.store_video_etag(video_base_name, video_etag)
+
+        search_index_key = index_future.result() if index_future else None
+
+        srt_key = canonical_srt_key if canonical_created else key
+        with io.timed("manifest_update"):
+            record_summaries(bucket, video_base_name, srt_key, srt_doc.digest, video_etag, model_results, errors, search_index_key)
+
+        if any(r["summary_cache"]["stored"] for r in model_results) and should_evict_summary_cache():
             try:
-                s3_client.delete_object(Bucket=bucket, Key=key)
-                _log(f"Arquivo original removido: s3://{bucket}/{key}")
+                with io.timed("evict_summary_cache"):
+                    _SUMMARY_CACHE_STATS["evicted"] += evict_summary_cache(bucket)
             except ClientError as e:
-                _log(f"Erro ao remover arquivo original (não crítico): {e}")
-            # Armazena ETag do vídeo para o frontend validar se a legenda ainda corresponde
-            try:
-                video_head = s3_client.head_object(Bucket=bucket, Key=video_key)
-                video_etag = video_head.get("ETag", "").strip('"')
-                etag_key = f"{MODEL_PREFIX}transcribe/{video_base_name}.video-etag"
-                s3_client.put_object(
-                    Bucket=bucket,
-                    Key=etag_key,
-                    Body=video_etag.encode("utf-8"),
-                    ContentType="text/plain",
-                )
-                _log(f"ETag do vídeo armazenado em s3://{bucket}/{etag_key}")
-            except ClientError:
-                pass  # Vídeo pode ter sido removido; não falha o job
-        except ClientError as e:
-            _log(f"Erro ao criar legenda canônica: {e}", always=True)
+                _log(f"Erro na evicção do cache de resumos (não crítico): {e}")
+
+    io_timings = dict(io.timings_ms)
+    for r in model_results:
+        io_timings.update(r.pop("io_timings_ms"))
+    print(f"[IO] Tempos S3 pós-Bedrock (ms): {json.dumps(io_timings, sort_keys=True)}")
+    first = model_results[0]
+    return {
+        "status": "summary_created" if not errors else "summary_partial",
+        "output_bucket": OUTPUT_BUCKET,
+        "output_key": first["output_key"],
+        "summary_cache": {
+            "hit": first["summary_cache"]["hit"],
+            "key": first["summary_cache"]["key"],
+            "hits": _SUMMARY_CACHE_STATS["hits"],
+            "misses": _SUMMARY_CACHE_STATS["misses"],
+            "evicted": _SUMMARY_CACHE_STATS["evicted"],
+        },
+        "models": model_results,
+        "failed_models": {model_id: f"{type(e).__name__}: {e}" for model_id, e in errors.items()},
+        "io_timings_ms": io_timings,
+    }
+
+
+def _summarize_with_model(bucket: str, video_base_name: str, plain_text: str, system_prompt: str, model_config: dict, deadline: float = None) -> dict:
+    """
+    Resume a transcrição já limpa com um modelo: cache de resumos, chamada ao Bedrock (com parcial
+    em streaming, se habilitado) e gravação de {base}-{slug}.md. Exceções propagam para o fan-out.
+    """
+    selected_model_id = model_config["id"]
+    invocation_chain = [target for target, _ in get_model_invocation_chain(model_config)]
+    print(f"[MODEL] Usando modelo: {selected_model_id} (cadeia={invocation_chain}) temp={model_config.get('temperature')} topP={model_config.get('topP')}")
 
     # Output do resumo: {video_base_name}-{model_slug}.md (permite múltiplos resumos por modelo)
     model_slug = get_model_slug(selected_model_id)
     output_key = f"{OUTPUT_PREFIX}{video_base_name}-{model_slug}.md"
 
-    if not OUTPUT_BUCKET:
-        print("[ERRO] SUMMARY_OUTPUT_BUCKET não configurado. Verifique as variáveis de ambiente da Lambda.")
-        raise RuntimeError("SUMMARY_OUTPUT_BUCKET não configurado")
-
-    _log(f"Gravando resumo em s3://{OUTPUT_BUCKET}/{output_key}", always=True)
+    # Cache de resumos: mesma transcrição + prompt + config já resumidos → copia sem chamar o modelo
+    cache_key = compute_summary_cache_key(plain_text, system_prompt, model_config)
+    cache_hit = SUMMARY_CACHE_ENABLED and copy_cached_summary(bucket, cache_key, OUTPUT_BUCKET, output_key)
+    cacheable = SUMMARY_CACHE_ENABLED and not cache_hit
+    llm_usage = {}
+    with S3IOExecutor(max_workers=2) as io:
+        METRICS.count("SummaryCacheHits" if cache_hit else "SummaryCacheMisses", model_id=selected_model_id)
+        if cache_hit:
+            with _SUMMARY_CACHE_STATS_LOCK:
+                _SUMMARY_CACHE_STATS["hits"] += 1
+            print(f"[CACHE] Resumo em cache copiado para s3://{OUTPUT_BUCKET}/{output_key} (cache_key={cache_key})")
+        else:
+            if SUMMARY_CACHE_ENABLED:
+                with _SUMMARY_CACHE_STATS_LOCK:
+                    _SUMMARY_CACHE_STATS["misses"] += 1
+            # Cabeçalho com modelo LLM utilizado (início do arquivo)
+            model_header = f"> *Modelo LLM: {selected_model_id}*\n\n"
+            partial_writer = PartialSummaryWriter(
+                OUTPUT_BUCKET,
+                f"{OUTPUT_PREFIX}{video_base_name}-{model_slug}.partial.md",
+                header=model_header,
+                deadline=deadline,
+                on_first_write=lambda key: record_partial_summary(bucket, video_base_name, model_slug, key),
+            )
+            with METRICS.timed("summarize", model_id=selected_model_id):
+                summary_md = call_bedrock_nova(plain_text, system_prompt, model_config, on_partial=partial_writer.update, deadline=deadline, usage=llm_usage)
+            _log_llm_usage(selected_model_id, llm_usage)
+            METRICS.count("SummaryChars", len(summary_md), model_id=selected_model_id)
+            # Se a cadeia de fallback respondeu com outro modelo, o cabeçalho registra o modelo efetivo
+            served_by = [m for m in llm_usage.get("models", []) if m != selected_model_id]
+            if served_by:
+                model_header = f"> *Modelo LLM: {', '.join(served_by)} (fallback de {selected_model_id})*\n\n"
+                # Resumo de fallback não representa a config pedida: não entra no cache
+                cacheable = False
+            summary_md = model_header + summary_md
 
-    try:
-        s3_client.put_object(
-            Bucket=OUTPUT_BUCKET,
-            Key=output_key,
-            Body=summary_md.encode("utf-8"),
-            ContentType="text/markdown",
-        )
-    except ClientError as e:
-        _log(f"Erro ao gravar resumo no S3: {e}", always=True)
-        raise
+            _log(f"Gravando resumo em s3://{OUTPUT_BUCKET}/{output_key}", always=True)
+            summary_future = io.submit(f"{model_slug}.put_summary", s3_client.put_object,
+                Bucket=OUTPUT_BUCKET,
+                Key=output_key,
+                Body=summary_md.encode("utf-8"),
+                ContentType="text/markdown",
+            )
+            if cacheable:
+                io.submit(f"{model_slug}.put_summary_cache", store_summary_in_cache, bucket, cache_key, summary_md)
+            try:
+                summary_future.result()
+            except ClientError as e:
+                _log(f"Erro ao gravar resumo no S3: {e}", always=True)
+                raise
+            # Resumo final gravado: o parcial deixa de ser necessário
+            if partial_writer.written:
+                with io.timed(f"{model_slug}.delete_partial_summary"):
+                    partial_writer.finalize()
 
     print(f"[OK] Resumo gravado em s3://{OUTPUT_BUCKET}/{output_key}")
     return {
+        "model_id": selected_model_id,
         "status": "summary_created",
-        "output_bucket": OUTPUT_BUCKET,
         "output_key": output_key,
+        "summary_cache": {"hit": bool(cache_hit), "key": cache_key, "stored": bool(cacheable)},
+        "llm_usage": {k: v for k, v in llm_usage.items() if isinstance(v, int)},
+        "io_timings_ms": dict(io.timings_ms),
     }
+
+
+def record_partial_summary(bucket: str, video_base_name: str, model_slug: str, partial_key: str):
+    """Registra o parcial em streaming no manifesto e no catálogo (o frontend lista sem varrer prefixos)."""
+
+    def mutate(manifest: dict):
+        if manifest["partials"].get(model_slug) == partial_key:
+            return False
+        manifest["partials"][model_slug] = partial_key
+
+    PipelineManifest(s3_client, bucket, MODEL_PREFIX).update(video_base_name, mutate)
+
+
+def record_summaries(bucket: str, video_base_name: str, srt_key: str, srt_digest: str, video_etag, model_results: list, errors: dict, search_index_key: str = None):
+    """
+    Atualiza manifest/{base}.json (legenda, resumos por modelo com uso de tokens) e o catálogo.
+    Modelo que falhou mantém um resumo anterior ainda existente (só registra o erro). O parcial de
+    quem terminou sai do manifesto (já removido do bucket); o de quem falhou continua legível e listado.
+    """
+    updated_at = now_iso()
+
+    def mutate(manifest: dict):
+        manifest["transcript"] = {
+            "srt_key": srt_key,
+            "srt_sha256": srt_digest,
+            "video_etag": video_etag or manifest["transcript"].get("video_etag"),
+            "search_index_key": search_index_key or manifest["transcript"].get("search_index_key"),
+            "updated_at": updated_at,
+        }
+        for r in model_results:
+            manifest["partials"].pop(get_model_slug(r["model_id"]), None)
+            manifest["summaries"][get_model_slug(r["model_id"])] = {
+                "model_id": r["model_id"],
+                "key": r["output_key"],
+                "status": "cached" if r["summary_cache"]["hit"] else "created",
+                "usage": r["llm_usage"],
+                "updated_at": updated_at,
+            }
+        for model_id, e in errors.items():
+            previous = manifest["summaries"].get(get_model_slug(model_id), {})
+            if previous.get("status") in ("created", "cached"):
+                previous["error"] = f"{type(e).__name__}: {e}"
+            else:
+                manifest["summaries"][get_model_slug(model_id)] = {
+                    "model_id": model_id,
+                    "status": "failed",
+                    "error": f"{type(e).__name__}: {e}",
+                    "updated_at": updated_at,
+                }
+
+    PipelineManifest(s3_client, bucket, MODEL_PREFIX).update(video_base_name, mutate)
+
+
+def _handle_object_deleted(bucket: str, key: str) -> dict:
+    """Evento Object Deleted em model/transcribe/ ou model/resumo/ (regra s3_object_deleted)."""
+    filename = key.split("/")[-1]
+    # Originais do Transcribe (removidos por esta Lambda) não estão no catálogo
+    if filename.startswith("meetup-"):
+        return {"status": "ignored", "key": key}
+    if not filename.endswith((".srt", ".md")):
+        return {"status": "ignored", "key": key}
+    srt_base = filename[:-len(".srt")] if filename.endswith(".srt") else None
+    artifacts = _transcript_artifacts(bucket)
+    if srt_base and key == artifacts.canonical_srt_key(srt_base):
+        # Derivados da legenda canônica (transcrição limpa e índice de busca) deixam de valer
+        derived = [artifacts.transcript_key(srt_base), artifacts.search_index_key(srt_base)]
+        try:
+            s3_client.delete_objects(Bucket=bucket, Delete={"Objects": [{"Key": k} for k in derived], "Quiet": True})
+        except ClientError as e:
+            _log(f"Erro ao remover derivados de {key} (não crítico): {e}")
+    with METRICS.timed("manifest_update"):
+        base_name = PipelineManifest(s3_client, bucket, MODEL_PREFIX).remove_object(key)
+    if base_name is None:
+        # Parcial removido por finalize() normalmente já saiu do manifesto em record_summaries
+        _log(f"Objeto removido {key} não consta no catálogo", always=not filename.endswith(".partial.md"))
+        return {"status": "ignored", "key": key, "reason": "not_in_catalog"}
+    print(f"[MANIFEST] {key} removido do manifesto de {base_name}")
+    return {"status": "manifest_updated", "key": key, "base_name": base_name}
+
+
+def _log_llm_usage(model_id: str, usage: dict):
+    """Auditoria por modelo/invocação: tokens somados das chamadas e aproveitamento do prompt cache."""
+    input_tokens = usage.get("inputTokens", 0)
+    cache_read = usage.get("cacheReadInputTokens", 0)
+    cache_write = usage.get("cacheWriteInputTokens", 0)
+    # inputTokens do Bedrock não inclui os tokens lidos/gravados em cache
+    prompt_tokens = input_tokens + cache_read + cache_write
+    hit_ratio = 100.0 * cache_read / prompt_tokens if prompt_tokens else 0.0
+    print(
+        f"[LLM] Uso: modelId={model_id} calls={usage.get('calls', 0)} inputTokens={input_tokens} "
+        f"outputTokens={usage.get('outputTokens', 0)} cacheReadTokens={cache_read} cacheWriteTokens={cache_write} "
+        f"prompt_cache_hit={hit_ratio:.1f}%"
+    )
+
+
+def _read_srt_document(bucket: str, key: str) -> SrtDocument:
+    """Lê o SRT do S3 em streaming (ver parse_srt_stream)."""
+    with METRICS.timed("s3_get_srt_first_byte"):
+        s3_response = s3_client.get_object(Bucket=bucket, Key=key)
+    with METRICS.timed("srt_read_parse"):
+        srt_doc = parse_srt_stream(s3_response["Body"])
+    srt_doc.etag = s3_response.get("ETag", "").strip('"')
+    METRICS.count("SrtBytes", srt_doc.size, "Bytes")
+    METRICS.count("SrtCues", len(srt_doc.cues))
+    return srt_doc
+
+
+def _resolve_srt_etag(bucket: str, key: str, event_etag: str = None) -> str:
+    """ETag da legenda: o do evento do EventBridge ou, sem ele, um head_object (sem baixar o SRT)."""
+    if event_etag:
+        return event_etag.strip('"')
+    return s3_client.head_object(Bucket=bucket, Key=key).get("ETag", "").strip('"')
+
+
+def _source_missing(key: str) -> dict:
+    # Evento de um meetup-*.srt já removido após criar a legenda canônica
+    _log(f"SRT {key} não existe mais (já consolidado na legenda canônica). Nada a fazer.", always=True)
+    return {"status": "ignored", "key": key, "reason": "source_missing"}
+
+
+def _load_srt_document(bucket: str, key: str, video_base_name: str, event_etag: str = None) -> SrtDocument:
+    """
+    Legenda canônica com transcrição limpa válida (mesmo ETag): lê só o artefato comprimido.
+    Caso contrário (primeiro resumo, arquivo do Transcribe, artefato ausente/antigo) lê o SRT.
+    """
+    artifacts = _transcript_artifacts(bucket)
+    if TRANSCRIPT_ARTIFACT_ENABLED and key == artifacts.canonical_srt_key(video_base_name):
+        srt_doc = artifacts.read_transcript(key, video_base_name, event_etag)
+        if srt_doc is not None:
+            return srt_doc
+    return _read_srt_document(bucket, key)
+
+
+def _transcript_artifacts(bucket: str) -> TranscriptArtifacts:
+    """Legenda canônica e derivados (transcrição limpa, índice de busca, .video-etag) no bucket."""
+    return TranscriptArtifacts(s3_client, bucket, MODEL_PREFIX, METRICS, log=_log)
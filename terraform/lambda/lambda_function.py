@@ -1,26 +1,409 @@
 import json
 import os
+import threading
 import time
 import urllib.parse
+from collections import deque
 
-import boto3
+from botocore.exceptions import ClientError
 
-transcribe_client = boto3.client("transcribe")
+from aws_clients import lazy_client
+from observability import MetricsRecorder
+from pipeline_manifest import S3_MISSING_CODES, PipelineManifest, now_iso
+
+# Clients criados no primeiro uso (aws_clients.py): eventos ignorados não importam o boto3
+transcribe_client = lazy_client("transcribe", retries={"mode": "standard", "max_attempts": 3})
+s3_client = lazy_client("s3", retries={"mode": "standard", "max_attempts": 3})
+sqs_client = lazy_client("sqs", retries={"mode": "standard", "max_attempts": 3})
 
 OUTPUT_BUCKET = os.environ.get("TRANSCRIBE_OUTPUT_BUCKET")
 OUTPUT_PREFIX = os.environ.get("TRANSCRIBE_OUTPUT_PREFIX", "transcribe/")
 LANGUAGE_CODE = os.environ.get("TRANSCRIBE_LANGUAGE_CODE", "pt-BR")
+# Vídeo reenviado com o mesmo conteúdo (mesmo ETag gravado em {base}.video-etag pela Lambda de resumo):
+# pula o Transcribe e só redispara o resumo a partir da legenda canônica
+SKIP_SAME_VIDEO = os.environ.get("TRANSCRIBE_SKIP_SAME_VIDEO", "1") == "1"
+# Admission control: no máximo TRANSCRIBE_MAX_CONCURRENT_JOBS jobs (IN_PROGRESS + QUEUED) deste pipeline
+# no Transcribe; excedentes (ou LimitExceededException) vão para a fila TRANSCRIBE_QUEUE_URL (SQS) e são
+# drenados quando um job termina (evento "Transcribe Job State Change") ou pelo agendamento periódico.
+# Sem TRANSCRIBE_QUEUE_URL usa fila em memória (execução local/testes).
+TRANSCRIBE_MAX_CONCURRENT_JOBS = int(os.environ.get("TRANSCRIBE_MAX_CONCURRENT_JOBS", "20"))
+TRANSCRIBE_QUEUE_URL = os.environ.get("TRANSCRIBE_QUEUE_URL", "").strip()
+JOB_NAME_PREFIX = "meetup-"
+JOB_NAME_MAX_LENGTH = 200
+# Tag do job com o ETag do vídeo transcrito (deduplicação de reenvios; ver TranscribeScheduler)
+VIDEO_ETAG_TAG = "video-etag"
+# Manifesto por vídeo e catálogo (pipeline_manifest.py) em {MODEL_PREFIX}manifest/ e {MODEL_PREFIX}catalog.json
+MODEL_PREFIX = os.environ.get("MODEL_PREFIX", "model/")
 OBS_DEBUG = os.environ.get("OBSERVABILITY_DEBUG", "0") == "1"
 OBS_TRACE = os.environ.get("OBSERVABILITY_TRACE", "0") == "1"
 
 
+# Métricas EMF por etapa (OBSERVABILITY_METRICS=1); ver observability.py
+METRICS = MetricsRecorder("transcribe")
+
+
 def _log(msg: str, always: bool = False):
     """Log controlado por feature flags. always=True ignora flags."""
     if always or OBS_TRACE or OBS_DEBUG:
         print(msg)
 
 
+class SqsJobQueue:
+    """Fila persistente de pedidos de transcrição no SQS."""
+
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+
+    def send(self, message: dict):
+        sqs_client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(message))
+
+    def receive(self, max_messages: int) -> list:
+        """Lista de (mensagem, handle); as mensagens ficam invisíveis até delete/release."""
+        resp = sqs_client.receive_message(
+            QueueUrl=self.queue_url,
+            MaxNumberOfMessages=max(1, min(max_messages, 10)),
+            WaitTimeSeconds=0,
+        )
+        return [(json.loads(m["Body"]), m["ReceiptHandle"]) for m in resp.get("Messages", [])]
+
+    def delete(self, handle):
+        sqs_client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=handle)
+
+    def release(self, handle):
+        """Devolve a mensagem à fila imediatamente (sem esperar o visibility timeout)."""
+        sqs_client.change_message_visibility(QueueUrl=self.queue_url, ReceiptHandle=handle, VisibilityTimeout=0)
+
+    def depth(self) -> int:
+        attrs = sqs_client.get_queue_attributes(
+            QueueUrl=self.queue_url,
+            AttributeNames=["ApproximateNumberOfMessages", "ApproximateNumberOfMessagesNotVisible"],
+        ).get("Attributes", {})
+        return int(attrs.get("ApproximateNumberOfMessages", 0)) + int(attrs.get("ApproximateNumberOfMessagesNotVisible", 0))
+
+
+class LocalJobQueue:
+    """Fila em memória com a mesma interface da SqsJobQueue (execução local e testes)."""
+
+    def __init__(self):
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def send(self, message: dict):
+        with self._lock:
+            self._pending.append(message)
+
+    def receive(self, max_messages: int) -> list:
+        with self._lock:
+            batch = []
+            while self._pending and len(batch) < max_messages:
+                message = self._pending.popleft()
+                batch.append((message, message))
+            return batch
+
+    def delete(self, handle):
+        pass  # já removida no receive
+
+    def release(self, handle):
+        with self._lock:
+            self._pending.appendleft(handle)
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_LOCAL_JOB_QUEUE = LocalJobQueue()
+
+
+def get_job_queue():
+    return SqsJobQueue(TRANSCRIBE_QUEUE_URL) if TRANSCRIBE_QUEUE_URL else _LOCAL_JOB_QUEUE
+
+
+def _error_code(error: ClientError) -> str:
+    return error.response.get("Error", {}).get("Code", "")
+
+
+class TranscribeScheduler:
+    """
+    Inicia jobs do Transcribe respeitando o teto de jobs simultâneos. Pedidos acima do teto (ou
+    recusados com LimitExceededException) entram na fila e são iniciados por drain() à medida que
+    jobs terminam. Um vídeo com job em andamento não ganha segundo job: o mesmo vídeo (base_name e
+    ETag, gravado na tag video-etag do job) é descartado como duplicata; um reenvio com outro ETag
+    espera na fila até o job anterior terminar (dois jobs gravariam a mesma legenda canônica). O teto é verificado por invocação (list_transcription_jobs); invocações simultâneas podem
+    ultrapassá-lo por pouco, e a cota da conta continua protegida pelo LimitExceededException.
+    """
+
+    def __init__(self, queue, max_concurrent: int = TRANSCRIBE_MAX_CONCURRENT_JOBS):
+        self.queue = queue
+        self.max_concurrent = max_concurrent
+        self._active = None  # nomes de jobs ativos (lazy, uma listagem por invocação)
+        self._job_etags = {}  # nome do job -> ETag do vídeo (tag video-etag; "" se o job não tem)
+
+    def active_jobs(self) -> set:
+        if self._active is None:
+            names = set()
+            with METRICS.timed("transcribe_list_jobs"):
+                for status in ("QUEUED", "IN_PROGRESS"):
+                    kwargs = {"Status": status, "JobNameContains": JOB_NAME_PREFIX, "MaxResults": 100}
+                    while True:
+                        resp = transcribe_client.list_transcription_jobs(**kwargs)
+                        names.update(j["TranscriptionJobName"] for j in resp.get("TranscriptionJobSummaries", []))
+                        if not resp.get("NextToken"):
+                            break
+                        kwargs["NextToken"] = resp["NextToken"]
+            self._active = names
+        return self._active
+
+    def jobs_in_flight(self, base_name: str) -> list:
+        """Jobs meetup-{base}-{timestamp} em andamento para o vídeo (mesmo corte de _job_name)."""
+        job_base = _job_base(base_name)
+        return [name for name in self.active_jobs() if name.rsplit("-", 1)[0] == job_base]
+
+    def _job_etag(self, job_name: str) -> str:
+        if job_name not in self._job_etags:
+            with METRICS.timed("transcribe_get_job"):
+                job = transcribe_client.get_transcription_job(TranscriptionJobName=job_name)["TranscriptionJob"]
+            tags = {tag["Key"]: tag["Value"] for tag in job.get("Tags", [])}
+            self._job_etags[job_name] = tags.get(VIDEO_ETAG_TAG, "")
+        return self._job_etags[job_name]
+
+    def is_in_flight(self, base_name: str, video_etag: str = None) -> bool:
+        """
+        Job em andamento para o mesmo vídeo: mesmo base_name e mesmo ETag. Sem ETag no pedido ou
+        no job (jobs sem a tag), o base_name basta.
+        """
+        return any(
+            not video_etag or self._job_etag(name) in ("", video_etag)
+            for name in self.jobs_in_flight(base_name)
+        )
+
+    def capacity(self) -> int:
+        return max(0, self.max_concurrent - len(self.active_jobs()))
+
+    def _start(self, request: dict) -> str:
+        job_name = _job_name(request["base_name"], int(time.time()))
+        _start_transcription_job(job_name, request["bucket"], request["key"], request.get("video_etag"))
+        self.active_jobs().add(job_name)
+        self._job_etags[job_name] = request.get("video_etag") or ""
+        record_transcription(request, "IN_PROGRESS", job_name)
+        return job_name
+
+    def submit(self, request: dict) -> dict:
+        """Inicia o job agora ou enfileira. Retorna status started, queued ou duplicate."""
+        if self.is_in_flight(request["base_name"], request.get("video_etag")):
+            _log(f"Job de transcrição para {request['key']} já em andamento; ignorando duplicata", always=True)
+            return {"status": "duplicate", "key": request["key"]}
+        # Fila não vazia: o pedido novo entra atrás dos que já esperam (FIFO) e a fila é drenada.
+        # Vídeo reenviado (outro ETag) com job em andamento: espera na fila o fim do job anterior
+        if self.capacity() == 0 or self.queue.depth() > 0 or self.jobs_in_flight(request["base_name"]):
+            return self._enqueue(request)
+        try:
+            job_name = self._start(request)
+        except ClientError as e:
+            if _error_code(e) != "LimitExceededException":
+                raise
+            print(f"[QUEUE] LimitExceededException ao iniciar job para {request['key']}; enfileirando")
+            METRICS.count("TranscribeLimitExceeded")
+            return self._enqueue(request)
+        return {"status": "started", "job_name": job_name}
+
+    def _enqueue(self, request: dict) -> dict:
+        with METRICS.timed("queue_send"):
+            self.queue.send({**request, "enqueued_at": time.time()})
+        METRICS.count("JobsQueued")
+        drained = self.drain()
+        status = "started" if request["key"] in drained["started_keys"] else "queued"
+        if status == "queued":
+            record_transcription(request, "QUEUED")
+        return {"status": status, **drained}
+
+    def drain(self) -> dict:
+        """Inicia pedidos da fila enquanto houver capacidade. Retorna métricas da fila."""
+        started, dropped, waits, deferred = [], 0, [], []
+        while self.capacity() > 0:
+            batch = self.queue.receive(self.capacity())
+            if not batch:
+                break
+            limited = False
+            for message, handle in batch:
+                if limited:
+                    self.queue.release(handle)
+                    continue
+                if self.is_in_flight(message["base_name"], message.get("video_etag")):
+                    # Mesmo vídeo já em transcrição (pedido repetido enquanto esperava)
+                    self.queue.delete(handle)
+                    dropped += 1
+                    continue
+                if self.jobs_in_flight(message["base_name"]):
+                    # Outra versão do vídeo em transcrição: segurado até o fim do drain (não volta
+                    # neste receive) e devolvido à fila para quando o job anterior terminar
+                    deferred.append(handle)
+                    continue
+                try:
+                    job_name = self._start(message)
+                except ClientError as e:
+                    if _error_code(e) != "LimitExceededException":
+                        self.queue.release(handle)
+                        raise
+                    # Cota da conta atingida: fica na fila para o próximo drain
+                    self.queue.release(handle)
+                    METRICS.count("TranscribeLimitExceeded")
+                    limited = True
+                    continue
+                self.queue.delete(handle)
+                waits.append(time.time() - message.get("enqueued_at", time.time()))
+                started.append((message["key"], job_name))
+            if limited:
+                break
+        # Ordem inversa: a fila local devolve na frente, e assim a ordem FIFO se mantém
+        for handle in reversed(deferred):
+            self.queue.release(handle)
+
+        depth = self.queue.depth()
+        METRICS.count("QueueDepth", depth)
+        METRICS.count("ActiveJobs", len(self.active_jobs()))
+        METRICS.count("JobsStartedFromQueue", len(started))
+        METRICS.count("DuplicatesDropped", dropped)
+        for wait in waits:
+            METRICS.count("QueueWait", wait, "Seconds")
+        metrics = {
+            "queue_depth": depth,
+            "active_jobs": len(self.active_jobs()),
+            "max_concurrent_jobs": self.max_concurrent,
+            "started_from_queue": len(started),
+            "dropped_duplicates": dropped,
+            "max_wait_seconds": round(max(waits), 1) if waits else 0.0,
+            "started_keys": [key for key, _ in started],
+        }
+        print(
+            f"[QUEUE] depth={depth} active={metrics['active_jobs']}/{self.max_concurrent} "
+            f"started={len(started)} dropped_duplicates={dropped} max_wait_s={metrics['max_wait_seconds']}"
+        )
+        return metrics
+
+
+def _job_base(base_name: str) -> str:
+    """meetup-{base}, cortado para que o nome do job (até 200 caracteres) mantenha o -{timestamp} (11)."""
+    return f"{JOB_NAME_PREFIX}{base_name}"[:JOB_NAME_MAX_LENGTH - 11]
+
+
+def _job_name(base_name: str, timestamp: int) -> str:
+    return f"{_job_base(base_name)}-{timestamp}"
+
+
+def _start_transcription_job(job_name: str, bucket: str, key: str, video_etag: str = None):
+    media_uri = f"s3://{bucket}/{key}"
+    _log(f"Iniciando job {job_name} para {media_uri}", always=True)
+
+    kwargs = {"Tags": [{"Key": VIDEO_ETAG_TAG, "Value": video_etag}]} if video_etag else {}
+    with METRICS.timed("transcribe_start"):
+        resp = transcribe_client.start_transcription_job(
+            TranscriptionJobName=job_name,
+            LanguageCode=LANGUAGE_CODE,
+            MediaFormat="mp4",
+            Media={"MediaFileUri": media_uri},
+            OutputBucketName=OUTPUT_BUCKET,
+            OutputKey=OUTPUT_PREFIX,
+            Subtitles={"Formats": ["srt"]},
+            **kwargs,
+        )
+    METRICS.count("JobsStarted")
+
+    status = resp.get("TranscriptionJob", {}).get("TranscriptionJobStatus", "UNKNOWN")
+    _log(f"Job iniciado: status={status}", always=True)
+
+    if OBS_DEBUG:
+        print(f"[DEBUG] Resposta Transcribe: {json.dumps(resp, default=str)}")
+
+
+def record_transcription(request: dict, status: str, job_name: str = None):
+    """Registra o estado da transcrição (QUEUED, IN_PROGRESS) no manifesto do vídeo."""
+    def mutate(manifest: dict):
+        manifest["video"] = {"key": request["key"], "etag": request.get("video_etag") or manifest["video"].get("etag")}
+        manifest["transcription"] = {"status": status, "job_name": job_name, "updated_at": now_iso()}
+
+    with METRICS.timed("manifest_update"):
+        PipelineManifest(s3_client, OUTPUT_BUCKET or request["bucket"], MODEL_PREFIX).update(request["base_name"], mutate)
+
+
+def record_job_finished(detail: dict):
+    """Evento "Transcribe Job State Change": COMPLETED/FAILED no manifesto (job deste pipeline)."""
+    job_name = detail.get("TranscriptionJobName", "")
+    status = detail.get("TranscriptionJobStatus")
+    if not OUTPUT_BUCKET or not job_name.startswith(JOB_NAME_PREFIX) or status not in ("COMPLETED", "FAILED"):
+        return
+    base_name = job_name[len(JOB_NAME_PREFIX):].rsplit("-", 1)[0]
+
+    def mutate(manifest: dict):
+        current = manifest["transcription"].get("job_name")
+        if current and current != job_name:
+            return False  # evento de um job anterior do mesmo vídeo
+        manifest["transcription"] = {"status": status, "job_name": job_name, "updated_at": now_iso()}
+
+    with METRICS.timed("manifest_update"):
+        PipelineManifest(s3_client, OUTPUT_BUCKET, MODEL_PREFIX).update(base_name, mutate)
+
+
+def _video_etag(bucket: str, key: str, obj: dict) -> str:
+    """ETag do vídeo do evento (detail.object.etag); head_object quando o evento não traz."""
+    etag = obj.get("etag")
+    if not etag:
+        try:
+            etag = s3_client.head_object(Bucket=bucket, Key=key).get("ETag", "")
+        except ClientError as e:
+            _log(f"Erro ao consultar ETag do vídeo {key}: {e}")
+            return ""
+    return etag.strip('"')
+
+
+def retrigger_summary_if_transcribed(bucket: str, base_name: str, video_etag: str):
+    """
+    Se a legenda canônica existe e o .video-etag corresponde ao vídeo atual, copia a legenda
+    para si mesma (MetadataDirective REPLACE → Object Created → Lambda de resumo), como o app faz
+    ao trocar de modelo. Retorna a key da legenda quando o resumo foi redisparado, senão None.
+    """
+    srt_key = f"{OUTPUT_PREFIX}{base_name}.srt"
+    etag_key = f"{OUTPUT_PREFIX}{base_name}.video-etag"
+    srt_bucket = OUTPUT_BUCKET or bucket
+    try:
+        stored = s3_client.get_object(Bucket=srt_bucket, Key=etag_key)["Body"].read().decode("utf-8").strip()
+        if not video_etag or stored != video_etag:
+            _log(f"ETag do vídeo ({video_etag}) difere do registrado em {etag_key} ({stored}); transcrevendo")
+            return None
+        srt_head = s3_client.head_object(Bucket=srt_bucket, Key=srt_key)
+        s3_client.copy_object(
+            Bucket=srt_bucket,
+            Key=srt_key,
+            CopySource={"Bucket": srt_bucket, "Key": srt_key},
+            MetadataDirective="REPLACE",
+            ContentType=srt_head.get("ContentType", "text/plain; charset=utf-8"),
+            Metadata={**srt_head.get("Metadata", {}), "trigger": str(int(time.time() * 1000))},
+        )
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code", "")
+        # Caso normal de vídeo novo; AccessDenied é o 404 do S3 quando falta ListBucket no prefixo
+        if code in S3_MISSING_CODES:
+            _log(f"Sem legenda canônica/.video-etag para {base_name} ({code}); transcrevendo")
+        else:
+            _log(f"Erro ao verificar legenda existente de {base_name} (seguindo com Transcribe): {e}", always=True)
+        return None
+    return srt_key
+
+
+@METRICS.instrument_handler
 def lambda_handler(event, context):
+    # Fim de job do Transcribe ou agendamento periódico: drena a fila de pedidos pendentes
+    if event.get("source") == "aws.transcribe" or event.get("detail-type") == "Scheduled Event":
+        detail = event.get("detail", {})
+        _log(
+            f"Drenando fila de transcrição ({event.get('detail-type')}: "
+            f"{detail.get('TranscriptionJobName', '-')} {detail.get('TranscriptionJobStatus', '')})",
+            always=True,
+        )
+        if event.get("source") == "aws.transcribe":
+            record_job_finished(detail)
+        return {"status": "drained", **TranscribeScheduler(get_job_queue()).drain()}
+
     if OBS_DEBUG:
         print(f"[DEBUG] Evento recebido: {json.dumps(event, default=str)}")
     elif OBS_TRACE:
@@ -45,27 +428,16 @@ def lambda_handler(event, context):
         return {"status": "ignored", "key": key}
 
     base_name = key.split("/")[-1].rsplit(".", 1)[0]
-    timestamp = int(time.time())
-    job_name  = f"meetup-{base_name}-{timestamp}"[:200]
+    video_etag = (obj.get("etag") or "").strip('"')
 
-    media_uri = f"s3://{bucket}/{key}"
-
-    _log(f"Iniciando job {job_name} para {media_uri}", always=True)
-
-    resp = transcribe_client.start_transcription_job(
-        TranscriptionJobName=job_name,
-        LanguageCode=LANGUAGE_CODE,
-        MediaFormat="mp4",
-        Media={"MediaFileUri": media_uri},
-        OutputBucketName=OUTPUT_BUCKET,
-        OutputKey=OUTPUT_PREFIX,
-        Subtitles={"Formats": ["srt"]},
-    )
-
-    status = resp.get("TranscriptionJob", {}).get("TranscriptionJobStatus", "UNKNOWN")
-    _log(f"Job iniciado: status={status}", always=True)
-
-    if OBS_DEBUG:
-        print(f"[DEBUG] Resposta Transcribe: {json.dumps(resp, default=str)}")
+    if SKIP_SAME_VIDEO:
+        with METRICS.timed("same_video_check"):
+            video_etag = _video_etag(bucket, key, obj)
+            srt_key = retrigger_summary_if_transcribed(bucket, base_name, video_etag)
+        if srt_key:
+            METRICS.count("TranscribeSkippedSameVideo")
+            print(f"[SKIP] Vídeo {key} já transcrito (ETag {video_etag}); resumo redisparado a partir de {srt_key}")
+            return {"status": "skipped_transcribe", "reason": "same_video_etag", "srt_key": srt_key}
 
-    return {"status": "started", "job_name": job_name}
+    scheduler = TranscribeScheduler(get_job_queue())
+    return scheduler.submit({"bucket": bucket, "key": key, "base_name": base_name, "video_etag": video_etag})
@@ -0,0 +1,161 @@
+"""
+Métricas das Lambdas em CloudWatch Embedded Metric Format (EMF).
+
+Cada Lambda cria um recorder com o nome do serviço (dimensão Service) e decora o handler, que
+imprime as métricas no fim da invocação:
+
+    METRICS = MetricsRecorder("summary")
+
+    @METRICS.instrument_handler
+    def lambda_handler(event, context):
+        with METRICS.timed("s3_get_srt"):
+            ...
+        METRICS.count("InputTokens", 1234, model_id="amazon.nova-lite-v1:0")
+
+As amostras são agregadas em memória durante a invocação (thread-safe) e impressas no fim como
+linhas JSON EMF: o CloudWatch extrai as métricas do log, sem chamadas de API. Dimensões: Service,
+Stage (latência por etapa) e ModelId quando informado. Desligado (OBSERVABILITY_METRICS != "1"),
+timed() devolve um context manager vazio compartilhado e count() retorna imediatamente.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from functools import wraps
+
+METRICS_ENABLED = os.environ.get("OBSERVABILITY_METRICS", "0") == "1"
+METRICS_NAMESPACE = os.environ.get("OBSERVABILITY_METRICS_NAMESPACE", "Meetup/Pipeline")
+
+# EMF aceita até 100 valores por métrica em cada linha
+_EMF_MAX_VALUES = 100
+
+# Primeira invocação do container (cold start)
+_COLD_START = True
+
+
+class _NoopTimer(ContextDecorator):
+    """Timer vazio usado com métricas desligadas (sem alocação por chamada)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _StageTimer(ContextDecorator):
+    """Mede a latência de uma etapa; como decorator cria um timer novo a cada chamada."""
+
+    def __init__(self, recorder, stage: str, dimensions: dict):
+        self.recorder = recorder
+        self.stage = stage
+        self.dimensions = dimensions
+        self.started = None
+
+    def _recreate_cm(self):
+        return _StageTimer(self.recorder, self.stage, self.dimensions)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        self.recorder.record("StageLatency", elapsed_ms, "Milliseconds", stage=self.stage, **self.dimensions)
+        if exc_type is not None:
+            self.recorder.record("StageErrors", 1, "Count", stage=self.stage, **self.dimensions)
+        return False
+
+
+class MetricsRecorder:
+    """Agrega métricas de uma invocação e as emite em EMF no flush()."""
+
+    def __init__(self, service: str, enabled: bool = None, namespace: str = None, emit=print):
+        self.service = service
+        self.enabled = METRICS_ENABLED if enabled is None else enabled
+        self.namespace = namespace or METRICS_NAMESPACE
+        self.emit = emit
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def timed(self, stage: str, model_id: str = None):
+        """Context manager/decorator que registra StageLatency (ms) da etapa."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _StageTimer(self, stage, {"model_id": model_id} if model_id else {})
+
+    def count(self, name: str, value=1, unit: str = "Count", stage: str = None, model_id: str = None):
+        """Contador/valor avulso (tokens, caracteres, profundidade de fila...)."""
+        if not self.enabled or value is None:
+            return
+        self.record(name, value, unit, stage=stage, model_id=model_id)
+
+    def record(self, name: str, value, unit: str, stage: str = None, model_id: str = None):
+        dimensions = (("Stage", stage),) if stage else ()
+        if model_id:
+            dimensions += (("ModelId", model_id),)
+        with self._lock:
+            entry = self._samples.setdefault((dimensions, name), {"unit": unit, "values": []})
+            entry["values"].append(value)
+
+    def begin_invocation(self) -> bool:
+        """Zera as amostras e registra ColdStart/WarmStart. Retorna True no cold start."""
+        global _COLD_START
+        cold, _COLD_START = _COLD_START, False
+        if self.enabled:
+            with self._lock:
+                self._samples = {}
+            self.record("ColdStart" if cold else "WarmStart", 1, "Count")
+        return cold
+
+    def flush(self):
+        """Emite uma linha EMF por conjunto de dimensões e limpa as amostras."""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples, self._samples = self._samples, {}
+        by_dimensions = {}
+        for (dimensions, name), entry in samples.items():
+            by_dimensions.setdefault(dimensions, []).append((name, entry))
+        timestamp = int(time.time() * 1000)
+        for dimensions, metrics in by_dimensions.items():
+            longest = max(len(entry["values"]) for _, entry in metrics)
+            for offset in range(0, longest, _EMF_MAX_VALUES):
+                document = {
+                    "_aws": {
+                        "Timestamp": timestamp,
+                        "CloudWatchMetrics": [{
+                            "Namespace": self.namespace,
+                            "Dimensions": [["Service"] + [key for key, _ in dimensions]],
+                            "Metrics": [],
+                        }],
+                    },
+                    "Service": self.service,
+                }
+                document.update(dict(dimensions))
+                for name, entry in metrics:
+                    values = entry["values"][offset : offset + _EMF_MAX_VALUES]
+                    if not values:
+                        continue
+                    document["_aws"]["CloudWatchMetrics"][0]["Metrics"].append({"Name": name, "Unit": entry["unit"]})
+                    document[name] = values if len(values) > 1 else values[0]
+                self.emit(json.dumps(document, separators=(",", ":")))
+
+    def instrument_handler(self, handler):
+        """Decorator do lambda_handler: cold/warm start, latência total (stage=handler) e flush no fim."""
+
+        @wraps(handler)
+        def wrapper(event, context):
+            self.begin_invocation()
+            try:
+                with self.timed("handler"):
+                    return handler(event, context)
+            finally:
+                self.flush()
+
+        return wrapper
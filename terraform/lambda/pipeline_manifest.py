@@ -0,0 +1,261 @@
+"""
+Manifesto por vídeo e catálogo global do pipeline, mantidos pelas duas Lambdas.
+
+- {MODEL_PREFIX}manifest/{base}.json: estado completo de um vídeo (vídeo e ETag, job do Transcribe,
+  legenda canônica, resumos por modelo com uso de tokens, timestamps e status derivado)
+- {MODEL_PREFIX}catalog.json: índice compacto de todos os vídeos (status, legenda, resumos e parciais
+  em streaming), lido pelo frontend com um único GET em vez de listar prefixos. Enquanto o catálogo
+  não tem "complete": true (semeado a partir de uma listagem dos prefixos, ver
+  script/backfill_summaries.py --seed-catalog), o frontend ainda une o catálogo com a listagem
+
+A Lambda de transcrição atualiza o vídeo e o job; a de resumo, a legenda e os resumos por modelo:
+
+    manifests = PipelineManifest(s3_client, bucket, "model/")
+    manifests.update("palestra", lambda m: m["transcription"].update(status="IN_PROGRESS"))
+
+Cada atualização é um read-modify-write com escrita condicional (If-Match com o ETag lido, ou
+If-None-Match: * na criação): se outra invocação gravou no meio, o S3 recusa (412/409) e a
+atualização é refeita sobre a versão nova, sem perder a escrita concorrente. O manifesto é gravado
+antes do catálogo; o status é derivado dos campos (não da ordem dos eventos). Falhas são logadas
+e não interrompem o fluxo (o manifesto é um índice, não a fonte da verdade).
+"""
+
+import json
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+
+MANIFEST_ENABLED = os.environ.get("PIPELINE_MANIFEST_ENABLED", "1") == "1"
+MANIFEST_MAX_ATTEMPTS = int(os.environ.get("PIPELINE_MANIFEST_MAX_ATTEMPTS", "6"))
+MANIFEST_VERSION = 1
+
+# Escrita condicional recusada: outro writer gravou depois da nossa leitura
+_CONFLICT_CODES = {"PreconditionFailed", "ConditionalRequestConflict", "412", "409"}
+# Objeto inexistente. Sem s3:ListBucket no prefixo o S3 responde 403 (AccessDenied) em vez de 404;
+# tratar como ausente é seguro aqui porque a criação usa If-None-Match: * e nunca sobrescreve um
+# objeto existente. Compartilhado pelas duas Lambdas
+S3_MISSING_CODES = frozenset({"NoSuchKey", "404", "NotFound", "AccessDenied"})
+
+# Resumos que existem no bucket (failed fica só no manifesto, para diagnóstico)
+_AVAILABLE_SUMMARY_STATUSES = ("created", "cached")
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _error_code(error: ClientError) -> str:
+    return error.response.get("Error", {}).get("Code", "")
+
+
+def update_json_object(s3_client, bucket: str, key: str, mutate, max_attempts: int = MANIFEST_MAX_ATTEMPTS):
+    """
+    Lê o JSON em key (dict vazio se não existe), aplica mutate(doc) e grava condicionalmente.
+    mutate altera o dict recebido e retorna False para não gravar (nada mudou). Em conflito,
+    relê e reaplica com backoff e jitter. Retorna o documento gravado (ou lido, se não houve
+    mudança). Propaga ClientError quando as tentativas acabam ou para outros erros.
+    """
+    for attempt in range(max_attempts):
+        try:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+            doc = json.loads(response["Body"].read().decode("utf-8"))
+            etag = response.get("ETag")
+        except ClientError as e:
+            if _error_code(e) not in S3_MISSING_CODES:
+                raise
+            doc, etag = {}, None
+        except (json.JSONDecodeError, ValueError):
+            # Documento corrompido: reconstruído a partir das próximas atualizações
+            print(f"[MANIFEST] JSON inválido em s3://{bucket}/{key}; recriando")
+            doc, etag = {}, response.get("ETag")
+
+        if mutate(doc) is False:
+            return doc
+        conditional = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            s3_client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                ContentType="application/json",
+                CacheControl="no-cache",
+                **conditional,
+            )
+            return doc
+        except ClientError as e:
+            if _error_code(e) not in _CONFLICT_CODES or attempt == max_attempts - 1:
+                raise
+        time.sleep(random.uniform(0, min(1.0, 0.05 * (2 ** attempt))))
+    return None
+
+
+def derive_status(manifest: dict) -> str:
+    """Status do vídeo a partir dos campos, independente da ordem em que os eventos chegaram."""
+    transcription = manifest.get("transcription", {})
+    transcript = manifest.get("transcript", {})
+    job_status = transcription.get("status")
+    # Vídeo reenviado: transcrição nova (pendente ou falha) mais recente que a legenda atual
+    if job_status in ("QUEUED", "IN_PROGRESS", "FAILED") and transcription.get("updated_at", "") > transcript.get("updated_at", ""):
+        return {"QUEUED": "queued", "IN_PROGRESS": "transcribing", "FAILED": "transcription_failed"}[job_status]
+    summaries = manifest.get("summaries", {}).values()
+    available = [s for s in summaries if s.get("status") in _AVAILABLE_SUMMARY_STATUSES]
+    if available:
+        return "partial" if any(s.get("status") == "failed" for s in summaries) else "summarized"
+    if summaries:
+        return "summary_failed"
+    if transcript.get("srt_key") or job_status == "COMPLETED":
+        return "transcribed"
+    return "uploaded"
+
+
+def total_usage(manifest: dict) -> dict:
+    totals = {}
+    for summary in manifest.get("summaries", {}).values():
+        for name, value in summary.get("usage", {}).items():
+            if isinstance(value, int):
+                totals[name] = totals.get(name, 0) + value
+    return totals
+
+
+def catalog_entry(manifest: dict) -> dict:
+    """Entrada compacta do catálogo: o suficiente para a lista do frontend."""
+    return {
+        "status": manifest.get("status"),
+        "updated_at": manifest.get("updated_at"),
+        "video_key": manifest.get("video", {}).get("key"),
+        "video_etag": manifest.get("transcript", {}).get("video_etag") or manifest.get("video", {}).get("etag"),
+        "srt_key": manifest.get("transcript", {}).get("srt_key"),
+        "summaries": {
+            slug: summary["key"]
+            for slug, summary in sorted(manifest.get("summaries", {}).items())
+            if summary.get("status") in _AVAILABLE_SUMMARY_STATUSES and summary.get("key")
+        },
+        # Resumos sendo gerados em streaming ({base}-{slug}.partial.md)
+        "partials": dict(sorted(manifest.get("partials", {}).items())),
+    }
+
+
+class PipelineManifest:
+    """Atualiza manifest/{base}.json e a entrada correspondente em catalog.json."""
+
+    def __init__(self, s3_client, bucket: str, model_prefix: str = "model/"):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.model_prefix = model_prefix
+
+    def manifest_key(self, base_name: str) -> str:
+        return f"{self.model_prefix}manifest/{base_name}.json"
+
+    @property
+    def catalog_key(self) -> str:
+        return f"{self.model_prefix}catalog.json"
+
+    def update(self, base_name: str, mutate):
+        """
+        Aplica mutate(manifest) ao manifesto do vídeo (campos video, transcription, transcript,
+        summaries e partials já existem como dicts) e propaga para o catálogo. Retorna o manifesto gravado
+        ou None se desligado/falhou (erro logado).
+        """
+        if not MANIFEST_ENABLED:
+            return None
+
+        def apply(manifest: dict):
+            manifest.setdefault("version", MANIFEST_VERSION)
+            manifest.setdefault("base_name", base_name)
+            manifest.setdefault("created_at", now_iso())
+            for section in ("video", "transcription", "transcript", "summaries", "partials"):
+                manifest.setdefault(section, {})
+            if mutate(manifest) is False:
+                return False
+            manifest["status"] = derive_status(manifest)
+            manifest["usage"] = total_usage(manifest)
+            manifest["updated_at"] = now_iso()
+            return True
+
+        try:
+            manifest = update_json_object(self.s3_client, self.bucket, self.manifest_key(base_name), apply)
+            self._update_catalog(base_name, manifest)
+        except ClientError as e:
+            print(f"[MANIFEST] Erro ao atualizar manifesto/catálogo de {base_name} (não crítico): {e}")
+            return None
+        print(f"[MANIFEST] {base_name}: status={manifest['status']} resumos={len(manifest['summaries'])}")
+        return manifest
+
+    def _update_catalog(self, base_name: str, manifest: dict):
+        entry = catalog_entry(manifest) if manifest else None
+
+        def apply(catalog: dict):
+            videos = catalog.setdefault("videos", {})
+            current = videos.get(base_name)
+            if entry is None:
+                if current is None:
+                    return False
+                del videos[base_name]
+            else:
+                # Evento atrasado não regride o catálogo para um manifesto mais antigo
+                if current and current.get("updated_at", "") > entry["updated_at"]:
+                    return False
+                videos[base_name] = entry
+            catalog["version"] = MANIFEST_VERSION
+            catalog["updated_at"] = now_iso()
+            return True
+
+        update_json_object(self.s3_client, self.bucket, self.catalog_key, apply)
+
+    def remove_object(self, key: str):
+        """
+        Objeto removido do bucket (legenda ou resumo excluído no app): tira a referência do
+        manifesto do vídeo e do catálogo. O vídeo é localizado pelo catálogo (um GET).
+        Retorna o nome base afetado ou None se a key não é referenciada.
+        """
+        if not MANIFEST_ENABLED:
+            return None
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.catalog_key)
+            videos = json.loads(response["Body"].read().decode("utf-8")).get("videos", {})
+        except ClientError as e:
+            if _error_code(e) not in S3_MISSING_CODES:
+                print(f"[MANIFEST] Erro ao ler catálogo: {e}")
+            return None
+        except (json.JSONDecodeError, ValueError):
+            return None
+
+        for base_name, entry in videos.items():
+            referenced = [entry.get("srt_key"), *entry.get("summaries", {}).values(), *entry.get("partials", {}).values()]
+            if key in referenced:
+                break
+        else:
+            return None
+
+        def forget(manifest: dict):
+            if manifest["transcript"].get("srt_key") == key:
+                manifest["transcript"] = {}
+            removed = [slug for slug, s in manifest["summaries"].items() if s.get("key") == key]
+            for slug in removed:
+                del manifest["summaries"][slug]
+            for slug in [slug for slug, partial_key in manifest["partials"].items() if partial_key == key]:
+                del manifest["partials"][slug]
+            return None
+
+        self.update(base_name, forget)
+        return base_name
+
+    def mark_catalog_complete(self):
+        """
+        Marca o catálogo como completo (todo o acervo anterior ao catálogo já foi semeado): a partir
+        daí o frontend deixa de listar os prefixos. Propaga ClientError.
+        """
+
+        def apply(catalog: dict):
+            if catalog.get("complete"):
+                return False
+            catalog.setdefault("videos", {})
+            catalog["version"] = MANIFEST_VERSION
+            catalog["complete"] = True
+            catalog["updated_at"] = now_iso()
+            return True
+
+        update_json_object(self.s3_client, self.bucket, self.catalog_key, apply)
@@ -0,0 +1,83 @@
+"""
+Limitador de taxa e circuit breaker das chamadas ao Bedrock, por container da Lambda.
+
+TokenBucket segura as threads do fan-out (modelos x trechos) para não passar de rate chamadas/s
+com rajadas de até capacity, e desiste com TimeoutError quando a espera ultrapassaria o deadline
+da invocação. CircuitBreaker é mantido por alvo (modelo ou inference profile): um alvo que
+acumula falhas transitórias deixa de receber chamadas por um tempo e a cadeia de fallback segue
+para o próximo, em vez de gastar o tempo da Lambda em retries que vão falhar.
+
+Os dois usam time.monotonic() e um lock próprio; o estado não é compartilhado entre containers.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Limitador de taxa por container: rate tokens/s, até capacity acumulados (rajada)."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = max(rate, 0.001)
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float = None):
+        """Bloqueia até haver um token; levanta TimeoutError se a espera ultrapassar o deadline."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.time() + wait > deadline:
+                raise TimeoutError("Sem tempo restante para aguardar o limitador de taxa")
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um alvo: após threshold falhas seguidas fica aberto por reset_seconds;
+    depois libera uma única tentativa (half-open) entre as threads do container: sucesso fecha o
+    circuito, falha o reabre.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None  # tentativa half-open em curso (uma por vez entre as threads)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at < self.reset_seconds:
+                return False
+            # Half-open: só um chamador testa o alvo; uma sonda sem resultado (erro não transitório)
+            # perde a vez depois de reset_seconds
+            if self.probe_at is not None and now - self.probe_at < self.reset_seconds:
+                return False
+            self.probe_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self.probe_at = None
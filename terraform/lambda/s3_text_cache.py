@@ -0,0 +1,67 @@
+"""
+Cache em memória de objetos texto pequenos do S3 (prompts e configs de modelo por vídeo).
+
+As entradas vivem enquanto o container da Lambda estiver quente. Dentro do TTL a leitura não
+chama o S3; vencido o TTL, o objeto é revalidado com GET condicional (IfNoneMatch com o ETag
+guardado): 304 renova a entrada sem baixar o corpo. Objeto inexistente também é guardado (cache
+negativo), para que vídeos sem prompt ou config próprios não paguem um GET por evento.
+stats conta acertos, revalidações e leituras completas.
+"""
+
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from pipeline_manifest import S3_MISSING_CODES
+
+
+class S3TextCache:
+    """
+    Cache de objetos texto pequenos do S3 por (bucket, key), com TTL, revalidação por ETag
+    e cache negativo para objeto inexistente (S3_MISSING_CODES). get() recebe o client a cada
+    chamada e retorna o texto ou None se o objeto não existe; outros erros do S3 são propagados
+    (ClientError). max_age=0 força a revalidação (GET condicional) mesmo dentro do TTL.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def get(self, s3_client, bucket: str, key: str, max_age: float = None):
+        now = time.time()
+        ttl = self.ttl_seconds if max_age is None else max_age
+        with self._lock:
+            entry = self._entries.get((bucket, key))
+        if entry and now - entry["fetched_at"] < ttl:
+            self.stats["hits"] += 1
+            return entry["text"]
+
+        kwargs = {"Bucket": bucket, "Key": key}
+        if entry and entry["etag"]:
+            kwargs["IfNoneMatch"] = entry["etag"]
+        try:
+            response = s3_client.get_object(**kwargs)
+            text = response["Body"].read().decode("utf-8", errors="ignore")
+            etag = response.get("ETag")
+            self.stats["misses"] += 1
+        except ClientError as e:
+            error_code = e.response.get("Error", {}).get("Code", "")
+            if error_code in ("304", "NotModified"):
+                # Objeto não mudou: renova o TTL sem baixar o corpo
+                self.stats["revalidated"] += 1
+                text, etag = entry["text"], entry["etag"]
+            elif error_code in S3_MISSING_CODES:
+                self.stats["misses"] += 1
+                text, etag = None, None
+            else:
+                raise
+        with self._lock:
+            self._entries[(bucket, key)] = {"text": text, "etag": etag, "fetched_at": now}
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
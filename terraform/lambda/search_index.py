@@ -0,0 +1,135 @@
+"""
+Índice invertido da transcrição com timestamps: termo normalizado → legendas (cues) em que aparece.
+
+Gravado pela Lambda de resumo ao lado da legenda canônica (model/transcribe/{base}.search.json,
+JSON com gzip e Content-Encoding: gzip, descompactado pelo próprio navegador) e consultado pelo app
+para achar em que momento da palestra um assunto apareceu. Formato (version 1):
+
+    {
+      "version": 1,
+      "srt_key": "model/transcribe/palestra.srt",
+      "cues": 1234,                        # número de legendas
+      "starts": [0, 2100, 1800, ...],      # início de cada legenda em ms, codificado em delta
+      "terms": {"bedrock": [3, 40, 2]},    # ordinais das legendas (0-based), codificados em delta
+      "stopwords": ["a", "ao", ...]        # descartadas também na consulta do app
+    }
+
+Normalização (igual no app.js): minúsculas, remoção de acentos (NFD sem marcas combinantes),
+termos [a-z0-9]+ com 2+ caracteres e fora da lista de stopwords (gravada no índice, para o app
+não depender de uma cópia da lista). A construção é uma passada
+sobre as legendas (tempo e memória lineares no tamanho da transcrição).
+"""
+
+import gzip
+import json
+import re
+import unicodedata
+
+SEARCH_INDEX_VERSION = 1
+MIN_TERM_CHARS = 2
+
+_COMBINING_RE = re.compile("[\u0300-\u036f]+")
+_TERM_RE = re.compile(r"[a-z0-9]+")
+
+# Stopwords do português (já sem acento) e hesitações comuns em fala transcrita
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles
+depois do dos e ela elas ele eles em entao entre era eram essa essas esse esses esta estao estas
+estava este estes eu foi for foram ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha
+minhas muito na nao nas nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas
+pelo pelos por pra pro qual quando que quem se sem ser seu seus so sua suas tambem te tem ter
+teu tua tu um uma umas uns voce voces vai vou ai ah eh hum uhum ne ta tipo entendeu assim
+""".split())
+
+
+def fold_text(text: str) -> str:
+    """Minúsculas e sem acentos ('Introdução' → 'introducao')."""
+    text = text.lower()
+    return text if text.isascii() else _COMBINING_RE.sub("", unicodedata.normalize("NFD", text))
+
+
+def iter_terms(text: str):
+    """Termos indexáveis do texto, na ordem em que aparecem (com repetições)."""
+    for term in _TERM_RE.findall(fold_text(text)):
+        if len(term) >= MIN_TERM_CHARS and term not in STOPWORDS:
+            yield term
+
+
+def _delta_encode(values: list) -> list:
+    previous = 0
+    encoded = []
+    for value in values:
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def _delta_decode(values: list) -> list:
+    total = 0
+    decoded = []
+    for value in values:
+        total += value
+        decoded.append(total)
+    return decoded
+
+
+def build_search_index(cues, srt_key: str = None):
+    """
+    Índice a partir das legendas (SrtCue com start_ms/text). Legendas sem tempo herdam o início
+    da anterior; retorna None se nenhuma legenda tem timestamp (texto puro) ou não há termos.
+    """
+    starts, postings = [], {}
+    last_start, timed = 0, False
+    for ordinal, cue in enumerate(cues):
+        if cue.start_ms is not None:
+            last_start, timed = cue.start_ms, True
+        starts.append(last_start)
+        # iter_terms sem a chamada por termo (laço quente: uma iteração por palavra da transcrição)
+        for term in _TERM_RE.findall(fold_text(cue.text)):
+            if len(term) < MIN_TERM_CHARS or term in STOPWORDS:
+                continue
+            ordinals = postings.get(term)
+            if ordinals is None:
+                postings[term] = [ordinal]
+            elif ordinals[-1] != ordinal:
+                ordinals.append(ordinal)
+    if not timed or not postings:
+        return None
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "srt_key": srt_key,
+        "cues": len(starts),
+        "starts": _delta_encode(starts),
+        "terms": {term: _delta_encode(ordinals) for term, ordinals in sorted(postings.items())},
+        "stopwords": sorted(STOPWORDS),
+    }
+
+
+def encode_search_index(index: dict) -> bytes:
+    """JSON compacto com gzip (mtime fixo: mesmo SRT gera os mesmos bytes)."""
+    body = json.dumps(index, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def search(index: dict, query: str) -> list:
+    """
+    Consulta (mesma semântica do app.js): todos os termos devem aparecer na legenda (AND); o
+    último termo casa por prefixo. Retorna [(ordinal, start_ms)] em ordem de tempo.
+    """
+    terms = list(iter_terms(query))
+    if not terms:
+        return []
+    matched = None
+    for position, term in enumerate(terms):
+        if position == len(terms) - 1:
+            keys = [key for key in index["terms"] if key.startswith(term)]
+        else:
+            keys = [term] if term in index["terms"] else []
+        ordinals = set()
+        for key in keys:
+            ordinals.update(_delta_decode(index["terms"][key]))
+        matched = ordinals if matched is None else matched & ordinals
+        if not matched:
+            return []
+    starts = _delta_decode(index["starts"])
+    return [(ordinal, starts[ordinal]) for ordinal in sorted(matched)]
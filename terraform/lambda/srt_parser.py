@@ -0,0 +1,227 @@
+"""
+Parser de legendas SRT em streaming, sem carregar o arquivo inteiro em memória.
+
+parse_srt_stream lê o StreamingBody do S3 em blocos de SRT_READ_CHUNK_BYTES, decodifica bloco a
+bloco (utf-8-sig: o BOM de editores do Windows é descartado) e produz um SrtDocument com as
+legendas estruturadas (SrtCue: índice, início/fim em ms e texto), o tamanho lido e o SHA-256 do
+conteúdo sem o cabeçalho "# Modelo LLM: ..." que versões anteriores da Lambda de resumo
+inseriam no topo da legenda. Arquivo cuja primeira linha não é numeração nem timestamp é tratado
+como texto puro (uma legenda sem tempos por linha).
+
+iter_srt_cues aceita qualquer iterável de linhas (também usado pelos testes e pelo índice de
+busca); extract_plain_text_from_srt é o atalho para um SRT já em memória.
+"""
+
+import codecs
+import hashlib
+import os
+import re
+from io import StringIO
+
+# Tamanho do bloco lido do StreamingBody do S3
+SRT_READ_CHUNK_BYTES = int(os.environ.get("SRT_READ_CHUNK_BYTES", str(256 * 1024)))
+
+MODEL_HEADER_PREFIX = "# Modelo LLM:"
+
+
+class SrtCue:
+    """Legenda do SRT: índice, início/fim em ms (None no texto puro) e texto (linhas unidas por \\n)."""
+
+    __slots__ = ("index", "start_ms", "end_ms", "text")
+
+    def __init__(self, index: int, start_ms, end_ms, text: str):
+        self.index = index
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+
+
+_SRT_TIMING_RE = re.compile(r"(\d+):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{1,3})")
+
+
+def _parse_srt_timing(line: str) -> tuple:
+    """'00:01:02,345 --> 00:01:03,000' → (62345, 63000); (None, None) se o formato não for reconhecido."""
+    match = _SRT_TIMING_RE.search(line)
+    if not match:
+        return None, None
+    h1, m1, s1, ms1, h2, m2, s2, ms2 = map(int, match.groups())
+    return ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1, ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2
+
+
+def iter_srt_cues(lines):
+    """
+    Parser incremental de SRT: consome qualquer iterável de linhas (sem exigir o texto inteiro
+    em memória) e produz SrtCue. Linhas de cabeçalho do modelo e o BOM inicial são ignorados. Se a
+    primeira linha de conteúdo não for numeração nem timestamp, o arquivo é tratado como texto puro
+    (caminho rápido: cada linha não vazia vira uma legenda sem tempos).
+    """
+    plain = None
+    index, start_ms, end_ms, text_lines = None, None, None, []
+    count = 0
+
+    for line in lines:
+        stripped = line.strip()
+
+        # pula linhas vazias (fim da legenda no SRT)
+        if not stripped:
+            if text_lines:
+                count += 1
+                yield SrtCue(index if index is not None else count, start_ms, end_ms, "\n".join(text_lines))
+            # legendas sem texto também encerram aqui
+            index, start_ms, end_ms, text_lines = None, None, None, []
+            continue
+
+        # pula cabeçalho do modelo LLM (inserido pela Lambda)
+        if stripped.startswith(MODEL_HEADER_PREFIX):
+            continue
+
+        if plain is None:
+            # BOM antes da primeira numeração ("\ufeff1") não é texto puro
+            stripped = stripped.lstrip("\ufeff")
+            if not stripped:
+                continue
+            plain = not (stripped.isdigit() or "-->" in stripped)
+        if plain:
+            count += 1
+            yield SrtCue(count, None, None, stripped)
+            continue
+
+        # timestamp --> (Ex: 00:00:01,000 --> 00:00:03,000) abre uma nova legenda
+        if "-->" in stripped:
+            if text_lines:
+                count += 1
+                yield SrtCue(index if index is not None else count, start_ms, end_ms, "\n".join(text_lines))
+                index, text_lines = None, []
+            start_ms, end_ms = _parse_srt_timing(stripped)
+            continue
+
+        # numeração (1, 2, 3...) antes do timestamp
+        if stripped.isdigit() and not text_lines and start_ms is None:
+            index = int(stripped)
+            continue
+
+        # resto é texto da legenda
+        text_lines.append(stripped)
+
+    if text_lines:
+        count += 1
+        yield SrtCue(index if index is not None else count, start_ms, end_ms, "\n".join(text_lines))
+
+
+def cues_to_plain_text(cues) -> str:
+    """Texto das legendas, uma linha por linha de legenda."""
+    return "\n".join(cue.text for cue in cues)
+
+
+def extract_plain_text_from_srt(srt_str: str) -> str:
+    """
+    Remove numeração, timestamps e cabeçalho do modelo do SRT,
+    retornando apenas o texto das legendas.
+    """
+    return cues_to_plain_text(iter_srt_cues(StringIO(srt_str)))
+
+
+class SrtDocument:
+    """
+    SRT lido do S3 em uma única passada: tamanho em bytes, offset do conteúdo após o
+    cabeçalho do modelo (SRTs gravados por versões anteriores), hash SHA-256 desse conteúdo
+    (srt_sha256 do manifesto), legendas estruturadas e ETag do objeto. O corpo não é mantido em memória.
+    source="artifact" quando veio da transcrição limpa persistida (size 0).
+    """
+
+    __slots__ = ("size", "content_offset", "digest", "cues", "etag", "source")
+
+    def __init__(self, size: int, content_offset: int, digest: str, cues: list, etag: str = None, source: str = "srt"):
+        self.size = size
+        self.content_offset = content_offset
+        self.digest = digest
+        self.cues = cues
+        self.etag = etag
+        self.source = source
+
+    def plain_text(self) -> str:
+        return cues_to_plain_text(self.cues)
+
+
+def _iter_stream_chunks(stream, chunk_size: int):
+    if hasattr(stream, "iter_chunks"):
+        yield from stream.iter_chunks(chunk_size)
+        return
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+_MODEL_HEADER_BYTES = MODEL_HEADER_PREFIX.encode("utf-8")
+_ASCII_WHITESPACE = b" \t\r\n\x0b\x0c"
+
+
+def _model_header_content_offset(body: bytearray, final: bool):
+    """
+    Offset do conteúdo após o cabeçalho '# Modelo LLM: ...' inserido pela Lambda (0 se não houver),
+    ou None enquanto os bytes lidos ainda não permitem decidir. Mesmo critério da versão em texto:
+    cabeçalho no início, conteúdo após a primeira linha em branco, sem espaços iniciais.
+    """
+    start = 0
+    while start < len(body) and body[start] in _ASCII_WHITESPACE:
+        start += 1
+    if len(body) - start < len(_MODEL_HEADER_BYTES):
+        if not final and _MODEL_HEADER_BYTES.startswith(body[start:]):
+            return None
+        return 0
+    if not body.startswith(_MODEL_HEADER_BYTES, start):
+        return 0
+    blank = body.find(b"\n\n")
+    if blank < 0:
+        return 0 if final else None
+    offset = blank + 2
+    while offset < len(body) and body[offset] in _ASCII_WHITESPACE:
+        offset += 1
+    if offset == len(body) and not final:
+        return None
+    return offset
+
+
+def parse_srt_stream(stream, chunk_size: int = SRT_READ_CHUNK_BYTES) -> SrtDocument:
+    """
+    Lê o stream (StreamingBody do S3 ou arquivo binário) em blocos, decodificando bloco a bloco
+    para o parser de legendas e calculando o hash do conteúdo sem o cabeçalho do modelo. Só os
+    primeiros bytes ficam em buffer, até decidir onde o cabeçalho termina; o resto é descartado
+    depois de hasheado. Não cria o texto completo nem a lista de linhas do arquivo inteiro.
+    """
+    head = bytearray()
+    hasher = hashlib.sha256()
+    # utf-8-sig: descarta o BOM inicial (SRT salvo por editores no Windows)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="ignore")
+    state = {"content_offset": None, "size": 0}
+
+    def _consume(chunk: bytes, final: bool):
+        state["size"] += len(chunk)
+        if state["content_offset"] is not None:
+            hasher.update(chunk)
+            return
+        head.extend(chunk)
+        offset = _model_header_content_offset(head, final)
+        if offset is None:
+            return
+        state["content_offset"] = offset
+        with memoryview(head) as view, view[offset:] as content:
+            hasher.update(content)
+        head.clear()
+
+    def _lines():
+        pending = ""
+        for chunk in _iter_stream_chunks(stream, chunk_size):
+            _consume(chunk, final=False)
+            lines = (pending + decoder.decode(chunk)).split("\n")
+            pending = lines.pop()
+            yield from lines
+        _consume(b"", final=True)
+        tail = pending + decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    cues = list(iter_srt_cues(_lines()))
+    return SrtDocument(state["size"], state["content_offset"], hasher.hexdigest(), cues)
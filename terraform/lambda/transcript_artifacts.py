@@ -0,0 +1,201 @@
+"""
+Arquivos derivados da legenda de um vídeo, gravados pela Lambda de resumo ao lado da legenda
+canônica em {MODEL_PREFIX}transcribe/:
+
+- {base}.srt: legenda canônica, cópia server-side (copy_object) do meetup-*-timestamp.srt do
+  Transcribe, que é removido depois da cópia
+- {base}.transcript.json.gz: transcrição limpa (legendas estruturadas, SHA-256 do conteúdo e ETag
+  do SRT de origem). Ao reprocessar a legenda canônica, a Lambda lê esse artefato em vez de baixar
+  e parsear o SRT; um ETag diferente do atual invalida o artefato
+- {base}.search.json: índice de busca com timestamps (formato em search_index.py), com gzip e
+  Content-Encoding para o navegador descompactar
+- {base}.video-etag: ETag do vídeo transcrito, para o app saber se a legenda ainda corresponde ao
+  vídeo (o manifesto guarda o mesmo valor; ver pipeline_manifest.py)
+
+Tudo é derivado da legenda: falhas de gravação são logadas e não falham o resumo, e a próxima
+leitura volta ao SRT quando o artefato falta ou está desatualizado.
+"""
+
+import gzip
+import json
+import time
+
+from botocore.exceptions import ClientError
+
+from pipeline_manifest import S3_MISSING_CODES
+from search_index import build_search_index, encode_search_index
+from srt_parser import SrtCue, SrtDocument
+
+TRANSCRIPT_ARTIFACT_VERSION = 1
+
+
+def encode_transcript_artifact(srt_doc: SrtDocument, srt_key: str, srt_etag: str, estimated_tokens: int = None) -> bytes:
+    """Legendas (índice, início, fim, texto), hash do conteúdo e ETag do SRT em JSON com gzip."""
+    artifact = {
+        "version": TRANSCRIPT_ARTIFACT_VERSION,
+        "srt_key": srt_key,
+        "srt_etag": srt_etag,
+        "srt_sha256": srt_doc.digest,
+        "srt_bytes": srt_doc.size - srt_doc.content_offset,
+        "estimated_tokens": estimated_tokens,
+        "cues": [[cue.index, cue.start_ms, cue.end_ms, cue.text] for cue in srt_doc.cues],
+    }
+    body = json.dumps(artifact, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def decode_transcript_artifact(data: bytes, srt_etag: str):
+    """SrtDocument a partir do artefato, ou None se a versão ou o ETag do SRT não conferem."""
+    artifact = json.loads(gzip.decompress(data).decode("utf-8"))
+    if artifact.get("version") != TRANSCRIPT_ARTIFACT_VERSION or artifact.get("srt_etag") != srt_etag:
+        return None
+    cues = [SrtCue(*cue) for cue in artifact["cues"]]
+    return SrtDocument(0, 0, artifact["srt_sha256"], cues, etag=srt_etag, source="artifact")
+
+
+class TranscriptArtifacts:
+    """
+    Leitura e gravação dos derivados da legenda de um bucket. metrics é o MetricsRecorder da Lambda
+    (observability.py); log recebe as mensagens de depuração (as de erro são sempre impressas).
+    """
+
+    def __init__(self, s3_client, bucket: str, model_prefix: str, metrics, log=print):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.model_prefix = model_prefix
+        self.metrics = metrics
+        self._log = log
+
+    def canonical_srt_key(self, base_name: str) -> str:
+        """Legenda canônica: model/transcribe/{base}.srt (relaciona legenda ao vídeo)."""
+        return f"{self.model_prefix}transcribe/{base_name}.srt"
+
+    def transcript_key(self, base_name: str) -> str:
+        return f"{self.model_prefix}transcribe/{base_name}.transcript.json.gz"
+
+    def search_index_key(self, base_name: str) -> str:
+        return f"{self.model_prefix}transcribe/{base_name}.search.json"
+
+    def video_etag_key(self, base_name: str) -> str:
+        return f"{self.model_prefix}transcribe/{base_name}.video-etag"
+
+    def read_transcript(self, key: str, base_name: str, event_etag: str = None):
+        """Transcrição limpa validada pelo ETag do SRT (do evento; head_object se o evento não traz)."""
+        artifact_key = self.transcript_key(base_name)
+        try:
+            srt_etag = event_etag or self.s3_client.head_object(Bucket=self.bucket, Key=key).get("ETag", "")
+            with self.metrics.timed("s3_get_transcript_artifact"):
+                data = self.s3_client.get_object(Bucket=self.bucket, Key=artifact_key)["Body"].read()
+            srt_doc = decode_transcript_artifact(data, srt_etag.strip('"'))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in S3_MISSING_CODES:
+                print(f"Erro ao ler transcrição limpa {artifact_key} (lendo o SRT): {e}")
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Transcrição limpa {artifact_key} inválida (lendo o SRT): {e}")
+            return None
+        if srt_doc is None:
+            print(f"[CACHE] Transcrição limpa desatualizada (ETag do SRT mudou): {artifact_key}")
+            self.metrics.count("TranscriptArtifactStale")
+            return None
+        print(f"[CACHE] Transcrição limpa reaproveitada: {artifact_key} ({len(data)} bytes, {len(srt_doc.cues)} legendas)")
+        self.metrics.count("TranscriptArtifactHits")
+        self.metrics.count("TranscriptArtifactBytes", len(data), "Bytes")
+        return srt_doc
+
+    def write_transcript(self, base_name: str, srt_doc: SrtDocument, srt_etag: str, estimated_tokens: int = None):
+        """Grava {base}.transcript.json.gz (erros não falham o job: o próximo evento lê o SRT)."""
+        artifact_key = self.transcript_key(base_name)
+        body = encode_transcript_artifact(srt_doc, self.canonical_srt_key(base_name), srt_etag, estimated_tokens)
+        try:
+            self.s3_client.put_object(Bucket=self.bucket, Key=artifact_key, Body=body, ContentType="application/gzip")
+            self._log(f"Transcrição limpa gravada em s3://{self.bucket}/{artifact_key} ({len(body)} bytes)")
+        except ClientError as e:
+            print(f"Erro ao gravar transcrição limpa (não crítico): {e}")
+
+    def copy_canonical_srt(self, key: str, base_name: str, timed=None) -> tuple:
+        """
+        Evento do arquivo do Transcribe (meetup-*-timestamp.srt): cria a legenda canônica com copy_object
+        no próprio S3, sem regravar o corpo, e só então remove o original. Retorna (canônica criada?,
+        ETag da legenda canônica ou None). Erros não falham o job. timed(nome) mede cada passo
+        (padrão: metrics.timed).
+        """
+        timed = timed or self.metrics.timed
+        canonical_srt_key = self.canonical_srt_key(base_name)
+        try:
+            with timed("copy_canonical_srt"):
+                response = self.s3_client.copy_object(
+                    Bucket=self.bucket,
+                    Key=canonical_srt_key,
+                    CopySource={"Bucket": self.bucket, "Key": key},
+                    MetadataDirective="REPLACE",
+                    ContentType="text/plain; charset=utf-8",
+                )
+            self._log(f"Legenda canônica criada em s3://{self.bucket}/{canonical_srt_key}")
+        except ClientError as e:
+            print(f"Erro ao criar legenda canônica: {e}")
+            # Não falha o job - o resumo é o principal
+            return False, None
+        # Remove o arquivo original (meetup-*-timestamp.srt) para evitar duplicata na listagem
+        try:
+            with timed("delete_original_srt"):
+                self.s3_client.delete_object(Bucket=self.bucket, Key=key)
+            self._log(f"Arquivo original removido: s3://{self.bucket}/{key}")
+        except ClientError as e:
+            self._log(f"Erro ao remover arquivo original (não crítico): {e}")
+        return True, response.get("CopyObjectResult", {}).get("ETag", "").strip('"')
+
+    def write_search_index(self, base_name: str, srt_doc: SrtDocument):
+        """
+        Índice invertido (termo → início das legendas) ao lado da legenda canônica. Retorna a key
+        gravada ou None (SRT sem timestamps ou erro; não falha o job).
+        """
+        started = time.perf_counter()
+        index = build_search_index(srt_doc.cues, self.canonical_srt_key(base_name))
+        if index is None:
+            self._log(f"SRT de {base_name} sem timestamps/termos; índice de busca não gerado")
+            return None
+        body = encode_search_index(index)
+        build_ms = (time.perf_counter() - started) * 1000
+        index_key = self.search_index_key(base_name)
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=index_key,
+                Body=body,
+                ContentType="application/json",
+                ContentEncoding="gzip",
+                Metadata={"srt-sha256": srt_doc.digest},
+            )
+        except ClientError as e:
+            print(f"Erro ao gravar índice de busca (não crítico): {e}")
+            return None
+        self.metrics.count("SearchIndexBytes", len(body), "Bytes")
+        print(
+            f"[INDEX] Índice de busca gravado em s3://{self.bucket}/{index_key}: termos={len(index['terms'])} "
+            f"legendas={index['cues']} bytes={len(body)} build_ms={build_ms:.1f}"
+        )
+        return index_key
+
+    def head_video_etag(self, base_name: str):
+        """ETag atual do vídeo (None se o vídeo não existir mais)."""
+        video_key = f"{self.model_prefix}video/{base_name}.mp4"
+        try:
+            video_head = self.s3_client.head_object(Bucket=self.bucket, Key=video_key)
+            return video_head.get("ETag", "").strip('"')
+        except ClientError:
+            return None  # Vídeo pode ter sido removido; não falha o job
+
+    def store_video_etag(self, base_name: str, video_etag: str):
+        """Grava {base}.video-etag com o ETag do vídeo no momento da transcrição."""
+        etag_key = self.video_etag_key(base_name)
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=etag_key,
+                Body=video_etag.encode("utf-8"),
+                ContentType="text/plain",
+            )
+            self._log(f"ETag do vídeo armazenado em s3://{self.bucket}/{etag_key}")
+        except ClientError:
+            pass  # não falha o job
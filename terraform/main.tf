@@ -82,6 +82,39 @@ resource "aws_s3_bucket_notification" "main_eventbridge" {
   eventbridge = true
 }
 
+# Expiração por idade dos artefatos internos do pipeline (um único recurso de lifecycle por bucket)
+resource "aws_s3_bucket_lifecycle_configuration" "main_lifecycle" {
+  bucket = data.aws_s3_bucket.main.id
+
+  # Marcadores do ledger de idempotência: só importam dentro de IDEMPOTENCY_TTL_SECONDS
+  rule {
+    id     = "expire-idempotency-ledger"
+    status = "Enabled"
+
+    filter {
+      prefix = "model/ledger/"
+    }
+
+    expiration {
+      days = var.ledger_expiration_days
+    }
+  }
+
+  # Cache de resumos: limite de idade (o limite de tamanho fica com a Lambda, numa amostra das gravações)
+  rule {
+    id     = "expire-summary-cache"
+    status = "Enabled"
+
+    filter {
+      prefix = "model/cache/summary/"
+    }
+
+    expiration {
+      days = var.summary_cache_max_age_days
+    }
+  }
+}
+
 ########################
 # COGNITO IDENTITY POOL
 ########################
@@ -133,11 +166,22 @@ resource "aws_iam_role_policy" "cognito_unauth_s3_policy" {
               "model/transcribe/*",
               "model/resumo/*",
               "model/prompts/*",
-              "model/models/*"
+              "model/models/*",
+              "model/manifest/*",
+              "model/catalog.json"
             ]
           }
         }
       },
+      # Catálogo e manifestos por vídeo (somente leitura; mantidos pelas Lambdas)
+      {
+        Effect = "Allow",
+        Action = ["s3:GetObject"],
+        Resource = [
+          "${data.aws_s3_bucket.main.arn}/model/manifest/*",
+          "${data.aws_s3_bucket.main.arn}/model/catalog.json"
+        ]
+      },
       {
         Effect = "Allow",
         Action = [
@@ -211,10 +255,24 @@ resource "aws_iam_role_policy" "lambda_transcribe_policy" {
         Effect = "Allow",
         Action = [
           "transcribe:StartTranscriptionJob",
-          "transcribe:GetTranscriptionJob"
+          "transcribe:GetTranscriptionJob",
+          "transcribe:ListTranscriptionJobs",
+          # Tag video-etag no job (deduplicação de reenvios do mesmo vídeo)
+          "transcribe:TagResource"
         ],
         Resource = "*"
       },
+      {
+        Effect = "Allow",
+        Action = [
+          "sqs:SendMessage",
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:ChangeMessageVisibility",
+          "sqs:GetQueueAttributes"
+        ],
+        Resource = aws_sqs_queue.transcribe_pending.arn
+      },
       {
         Effect   = "Allow",
         Action   = ["s3:GetObject"],
@@ -222,9 +280,31 @@ resource "aws_iam_role_policy" "lambda_transcribe_policy" {
       },
       {
         Effect   = "Allow",
-        Action   = ["s3:PutObject"],
+        Action   = ["s3:GetObject", "s3:PutObject"],
         Resource = "${data.aws_s3_bucket.main.arn}/model/transcribe/*"
       },
+      # Vídeo novo ainda não tem legenda canônica nem .video-etag: com ListBucket o GET responde 404
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/transcribe/*"] } }
+      },
+      # Manifesto por vídeo e catálogo (escritas condicionais; ListBucket faz objeto ausente responder 404)
+      {
+        Effect = "Allow",
+        Action = ["s3:GetObject", "s3:PutObject"],
+        Resource = [
+          "${data.aws_s3_bucket.main.arn}/model/manifest/*",
+          "${data.aws_s3_bucket.main.arn}/model/catalog.json"
+        ]
+      },
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/manifest/*", "model/catalog.json"] } }
+      },
       {
         Effect = "Allow",
         Action = [
@@ -238,6 +318,13 @@ resource "aws_iam_role_policy" "lambda_transcribe_policy" {
   })
 }
 
+# Pedidos de transcrição acima do teto de jobs simultâneos (drenados pela própria Lambda)
+resource "aws_sqs_queue" "transcribe_pending" {
+  name                       = "transcribe-pending-jobs"
+  visibility_timeout_seconds = 120
+  message_retention_seconds  = 1209600
+}
+
 resource "aws_lambda_function" "start_transcribe" {
   function_name = "start-transcribe-on-s3-upload"
   role          = aws_iam_role.lambda_transcribe_role.arn
@@ -251,11 +338,16 @@ resource "aws_lambda_function" "start_transcribe" {
 
   environment {
     variables = {
-      TRANSCRIBE_OUTPUT_BUCKET = data.aws_s3_bucket.main.bucket
-      TRANSCRIBE_OUTPUT_PREFIX = "model/transcribe/"
-      TRANSCRIBE_LANGUAGE_CODE = "pt-BR"
-      OBSERVABILITY_DEBUG     = var.observability_debug
-      OBSERVABILITY_TRACE     = var.observability_trace
+      TRANSCRIBE_OUTPUT_BUCKET       = data.aws_s3_bucket.main.bucket
+      TRANSCRIBE_OUTPUT_PREFIX       = "model/transcribe/"
+      TRANSCRIBE_LANGUAGE_CODE       = "pt-BR"
+      TRANSCRIBE_QUEUE_URL           = aws_sqs_queue.transcribe_pending.url
+      TRANSCRIBE_MAX_CONCURRENT_JOBS = tostring(var.transcribe_max_concurrent_jobs)
+      MODEL_PREFIX                   = "model/"
+      PIPELINE_MANIFEST_ENABLED      = var.pipeline_manifest_enabled
+      OBSERVABILITY_DEBUG            = var.observability_debug
+      OBSERVABILITY_TRACE            = var.observability_trace
+      OBSERVABILITY_METRICS          = var.observability_metrics
     }
   }
 }
@@ -293,12 +385,60 @@ resource "aws_iam_role_policy" "lambda_bedrock_summary_policy" {
           "${data.aws_s3_bucket.main.arn}/model/video/*"
         ]
       },
+      # Prompt e config do modelo são opcionais: com ListBucket o objeto ausente responde 404 (cache negativo)
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/prompts/*", "model/models/*"] } }
+      },
+      # Resumos (.md) e resumos parciais em streaming (.partial.md, removidos ao final)
       {
         Effect   = "Allow",
-        Action   = ["s3:PutObject"],
+        Action   = ["s3:PutObject", "s3:DeleteObject"],
         Resource = "${data.aws_s3_bucket.main.arn}/model/resumo/*"
       },
-      # Permite atualizar .srt com cabeçalho do modelo LLM e remover duplicatas (meetup-*-timestamp.srt)
+      # Ledger de idempotência (marcadores de trabalhos concluídos/em andamento; escrita condicional)
+      {
+        Effect   = "Allow",
+        Action   = ["s3:GetObject", "s3:PutObject", "s3:DeleteObject"],
+        Resource = "${data.aws_s3_bucket.main.arn}/model/ledger/*"
+      },
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/ledger/*"] } }
+      },
+      # Cache de resumos endereçado por conteúdo (leitura via copy, gravação e evicção)
+      {
+        Effect   = "Allow",
+        Action   = ["s3:GetObject", "s3:PutObject", "s3:DeleteObject"],
+        Resource = "${data.aws_s3_bucket.main.arn}/model/cache/summary/*"
+      },
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/cache/summary/*"] } }
+      },
+      # Manifesto por vídeo e catálogo (escritas condicionais; ListBucket faz objeto ausente responder 404)
+      {
+        Effect = "Allow",
+        Action = ["s3:GetObject", "s3:PutObject"],
+        Resource = [
+          "${data.aws_s3_bucket.main.arn}/model/manifest/*",
+          "${data.aws_s3_bucket.main.arn}/model/catalog.json"
+        ]
+      },
+      {
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = data.aws_s3_bucket.main.arn,
+        Condition = { StringLike = { "s3:prefix" = ["model/manifest/*", "model/catalog.json"] } }
+      },
+      # Legenda canônica (cópia do arquivo do Transcribe), remoção de duplicatas (meetup-*-timestamp.srt),
+      # transcrição limpa (.transcript.json.gz) e índice de busca (.search.json)
       {
         Effect   = "Allow",
         Action   = ["s3:PutObject", "s3:DeleteObject"],
@@ -355,7 +495,7 @@ resource "aws_lambda_function" "bedrock_summary" {
   filename         = "${path.module}/build/bedrock_summary.zip"
   source_code_hash = filebase64sha256("${path.module}/build/bedrock_summary.zip")
 
-  timeout = 120
+  timeout = var.bedrock_summary_timeout_seconds
 
   environment {
     variables = {
@@ -365,8 +505,11 @@ resource "aws_lambda_function" "bedrock_summary" {
       BEDROCK_MODEL_ID          = var.bedrock_model_id
       BEDROCK_REGION            = var.bedrock_region
       BEDROCK_INFERENCE_PROFILE = var.bedrock_inference_profile
-      OBSERVABILITY_DEBUG      = var.observability_debug
-      OBSERVABILITY_TRACE      = var.observability_trace
+      OBSERVABILITY_DEBUG       = var.observability_debug
+      OBSERVABILITY_TRACE       = var.observability_trace
+      OBSERVABILITY_METRICS     = var.observability_metrics
+      PIPELINE_MANIFEST_ENABLED = var.pipeline_manifest_enabled
+      LAMBDA_TIMEOUT_SECONDS    = var.bedrock_summary_timeout_seconds
     }
   }
 }
@@ -410,6 +553,55 @@ resource "aws_lambda_permission" "allow_eventbridge_invoke" {
   source_arn    = aws_cloudwatch_event_rule.s3_video_upload.arn
 }
 
+# Fim de job do Transcribe -> Lambda Transcribe (drena a fila de pedidos pendentes)
+resource "aws_cloudwatch_event_rule" "transcribe_job_finished" {
+  name        = "transcribe-job-finished-drain-queue"
+  description = "Drena a fila de transcrição quando um job termina"
+
+  event_pattern = jsonencode({
+    "source" : ["aws.transcribe"],
+    "detail-type" : ["Transcribe Job State Change"],
+    "detail" : {
+      "TranscriptionJobStatus" : ["COMPLETED", "FAILED"]
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "transcribe_job_finished_lambda" {
+  rule      = aws_cloudwatch_event_rule.transcribe_job_finished.name
+  target_id = "invoke-lambda-start-transcribe-drain"
+  arn       = aws_lambda_function.start_transcribe.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_invoke_transcribe_drain" {
+  statement_id  = "AllowExecutionFromEventBridgeTranscribeDrain"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.start_transcribe.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.transcribe_job_finished.arn
+}
+
+# Drenagem periódica (rede de segurança se algum evento de fim de job se perder)
+resource "aws_cloudwatch_event_rule" "transcribe_queue_drain_schedule" {
+  name                = "transcribe-queue-drain-schedule"
+  description         = "Drena periodicamente a fila de transcrição"
+  schedule_expression = "rate(5 minutes)"
+}
+
+resource "aws_cloudwatch_event_target" "transcribe_queue_drain_schedule_lambda" {
+  rule      = aws_cloudwatch_event_rule.transcribe_queue_drain_schedule.name
+  target_id = "invoke-lambda-start-transcribe-schedule"
+  arn       = aws_lambda_function.start_transcribe.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_invoke_transcribe_schedule" {
+  statement_id  = "AllowExecutionFromEventBridgeTranscribeSchedule"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.start_transcribe.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.transcribe_queue_drain_schedule.arn
+}
+
 # .srt -> Lambda Bedrock
 resource "aws_cloudwatch_event_rule" "s3_srt_created" {
   name        = "s3-srt-created-to-bedrock-summary"
@@ -423,8 +615,10 @@ resource "aws_cloudwatch_event_rule" "s3_srt_created" {
           "name" : [data.aws_s3_bucket.main.bucket]
         },
       "object" : {
+        # Só .srt: transcript.json.gz, search.json e o JSON do job do Transcribe também ficam em
+        # transcribe/ e, sem o sufixo, cada um seria uma invocação cobrada e ignorada
         "key" : [{
-          "prefix" : "model/transcribe/"
+          "wildcard" : "model/transcribe/*.srt"
         }]
       }
     }
@@ -445,6 +639,39 @@ resource "aws_lambda_permission" "allow_eventbridge_invoke_bedrock_summary" {
   source_arn    = aws_cloudwatch_event_rule.s3_srt_created.arn
 }
 
+# Legenda/resumo excluído -> Lambda Bedrock (remove do manifesto e do catálogo)
+resource "aws_cloudwatch_event_rule" "s3_output_deleted" {
+  name        = "s3-output-deleted-to-bedrock-summary"
+  description = "Atualiza manifesto/catálogo ao excluir .srt ou .md em transcribe/ e resumo/"
+
+  event_pattern = jsonencode({
+    "source" : ["aws.s3"],
+    "detail-type" : ["Object Deleted"],
+    "detail" : {
+      "bucket" : {
+        "name" : [data.aws_s3_bucket.main.bucket]
+      },
+      "object" : {
+        "key" : [{ "wildcard" : "model/transcribe/*.srt" }, { "wildcard" : "model/resumo/*.md" }]
+      }
+    }
+  })
+}
+
+resource "aws_cloudwatch_event_target" "s3_output_deleted_lambda" {
+  rule      = aws_cloudwatch_event_rule.s3_output_deleted.name
+  target_id = "invoke-lambda-bedrock-summary-deleted"
+  arn       = aws_lambda_function.bedrock_summary.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_invoke_bedrock_summary_deleted" {
+  statement_id  = "AllowExecutionFromEventBridgeBedrockSummaryDeleted"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.bedrock_summary.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.s3_output_deleted.arn
+}
+
 ########################
 # BEDROCK MODEL INVOCATION LOGGING (análises posteriores, auditoria)
 # CloudWatch Logs + S3 para dados >100KB (transcrições longas não aparecem sem isso)
@@ -73,3 +73,39 @@ variable "observability_trace" {
   type        = string
   default     = "0"
 }
+
+variable "observability_metrics" {
+  description = "Feature flag: 1 = métricas por etapa/modelo (latência, tokens, cold start) em CloudWatch Embedded Metric Format, namespace Meetup/Pipeline. 0 = desligado."
+  type        = string
+  default     = "1"
+}
+
+variable "pipeline_manifest_enabled" {
+  description = "1 = Lambdas mantêm model/manifest/{base}.json e model/catalog.json (lidos pelo app com um GET). 0 = desligado (app volta a listar os prefixos)."
+  type        = string
+  default     = "1"
+}
+
+variable "transcribe_max_concurrent_jobs" {
+  description = "Teto de jobs simultâneos do Transcribe iniciados pelo pipeline; excedentes esperam na fila SQS transcribe-pending-jobs. Mantenha abaixo da cota da conta."
+  type        = number
+  default     = 20
+}
+
+variable "ledger_expiration_days" {
+  description = "Dias até o S3 expirar os marcadores do ledger de idempotência (model/ledger/). Deve cobrir IDEMPOTENCY_TTL_SECONDS (6h por padrão)."
+  type        = number
+  default     = 2
+}
+
+variable "summary_cache_max_age_days" {
+  description = "Dias até o S3 expirar os resumos do cache endereçado por conteúdo (model/cache/summary/)."
+  type        = number
+  default     = 30
+}
+
+variable "bedrock_summary_timeout_seconds" {
+  description = "Timeout da Lambda de resumo (s). Também limita o timeout de leitura do Bedrock (menos BEDROCK_DEADLINE_RESERVE_SECONDS)."
+  type        = number
+  default     = 120
+}
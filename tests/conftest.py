@@ -0,0 +1,44 @@
+"""
+Testes de comportamento das Lambdas com clients AWS em memória (benchmark/fake_aws.py).
+
+Rodam sem AWS, só com `boto3` e `pytest` instalados (na raiz do repositório):
+
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "terraform", "lambda"))
+sys.path.insert(0, os.path.join(ROOT_DIR, "benchmark"))
+
+BUCKET = "meetup-tests"
+# Mesmo ambiente que o Terraform configura nas Lambdas (ver terraform/main.tf)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-2")
+os.environ.setdefault("TRANSCRIBE_OUTPUT_BUCKET", BUCKET)
+os.environ.setdefault("TRANSCRIBE_OUTPUT_PREFIX", "model/transcribe/")
+os.environ.setdefault("SUMMARY_OUTPUT_BUCKET", BUCKET)
+os.environ.setdefault("SUMMARY_OUTPUT_PREFIX", "model/resumo/")
+os.environ.setdefault("MODEL_PREFIX", "model/")
+os.environ.setdefault("BEDROCK_RATE_PER_SECOND", "1000000")
+os.environ.setdefault("BEDROCK_BURST", "1000000")
+
+import lambda_bedrock_summary as summary  # noqa: E402
+import lambda_function as transcribe  # noqa: E402
+from fake_aws import FakeAws  # noqa: E402
+
+
+@pytest.fixture
+def aws():
+    """Fakes novos instalados nas duas Lambdas, sem estado de container quente de outro teste."""
+    summary._CONFIG_CACHE.clear()
+    summary._PROMPT_CACHE_REJECTED.clear()
+    with summary._CIRCUIT_BREAKERS_LOCK:
+        summary._CIRCUIT_BREAKERS.clear()
+    fakes = FakeAws()
+    fakes.install(summary)
+    fakes.install(transcribe)
+    return fakes
@@ -0,0 +1,41 @@
+from conftest import summary
+
+CHUNKING = {"chunkTokens": 500, "overlapTokens": 0, "concurrency": 4, "thresholdTokens": 500}
+# ~9 chunks de 500 tokens (uma legenda por linha)
+TRANSCRIPT = "\n".join(f"legenda {i} sobre o pipeline serverless na AWS" for i in range(320))
+
+
+def _summarize(monkeypatch, budget: int) -> str:
+    monkeypatch.setattr(summary, "get_single_call_budget", lambda model_id, params=None: budget)
+    config = {"id": "amazon.nova-lite-v1:0"}
+    return summary._summarize_chunked(TRANSCRIPT, "regras", config, CHUNKING)
+
+
+def test_partials_that_fit_go_straight_to_the_final_reduce(aws, monkeypatch):
+    chunks = len(summary.split_transcript_into_chunks(TRANSCRIPT, 500, 0))
+
+    _summarize(monkeypatch, 100_000)
+
+    assert aws.calls["bedrock.converse"] == chunks + 1
+
+
+def test_partials_over_budget_are_reduced_in_batches_first(aws, monkeypatch):
+    partials = len(summary.split_transcript_into_chunks(TRANSCRIPT, 500, 0))
+    expected_calls = partials + 1
+    # Cada parcial do fake tem ~1150 tokens: lotes de 2 por nível até sobrarem 2 (cabem em 2500)
+    while partials > 2:
+        partials = (partials + 1) // 2
+        expected_calls += partials
+
+    text = _summarize(monkeypatch, 2500)
+
+    assert text.startswith("# Resumo")
+    assert aws.calls["bedrock.converse"] == expected_calls
+
+
+def test_batches_keep_order_and_isolate_oversized_partials():
+    small, big = "a" * 350, "b" * 35_000  # ~100 e ~10000 tokens
+
+    batches = summary._batch_partials([small, small, big, small], 300)
+
+    assert batches == [[small, small], [big], [small]]
@@ -0,0 +1,28 @@
+from conftest import summary
+
+TRANSCRIPT = "\n".join([
+    "O problema é, na verdade, simples.",
+    "Então, concluímos que... hum, né, tipo, funciona funciona.",
+    "Bom, assim, éé o resultado.",
+])
+
+
+def test_default_steps_keep_fillers_and_collapse_repeated_words():
+    compacted = summary.compact_transcript(TRANSCRIPT, "dedupe,merge,whitespace")
+
+    assert "hum, né, tipo," in compacted
+    assert "funciona funciona" not in compacted
+    assert "\n" not in compacted  # legendas curtas juntas num parágrafo
+
+
+def test_fillers_step_keeps_copula_and_discourse_markers():
+    compacted = summary.compact_transcript(TRANSCRIPT, "fillers,whitespace")
+
+    assert "O problema é, na verdade, simples." in compacted
+    assert compacted.count("Então,") == 1 and "Bom, assim," in compacted
+    for filler in ("hum", "né", "tipo", "éé"):
+        assert filler not in compacted.split()
+
+
+def test_off_returns_text_unchanged():
+    assert summary.compact_transcript(TRANSCRIPT, "off") == TRANSCRIPT
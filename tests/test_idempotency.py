@@ -0,0 +1,92 @@
+import pytest
+from fake_aws import FakeLambdaContext, s3_object_created_event
+from idempotency import LocalIdempotencyStore
+from synthetic import generate_srt
+
+from conftest import BUCKET, summary
+
+SRT_KEY = "model/transcribe/Talk.srt"
+
+
+@pytest.fixture
+def srt_event(aws):
+    aws.s3.put_object(Bucket=BUCKET, Key=SRT_KEY, Body=generate_srt(3).encode("utf-8"))
+    return s3_object_created_event(BUCKET, SRT_KEY)
+
+
+def test_duplicate_event_is_skipped_without_calling_the_model(aws, srt_event):
+    first = summary.lambda_handler(srt_event, FakeLambdaContext())
+    second = summary.lambda_handler(srt_event, FakeLambdaContext())
+
+    assert first["status"] == "summary_created"
+    assert second["status"] == "skipped_duplicate"
+    assert second["idempotency_key"] == first["idempotency_key"]
+    assert second["duplicate_count"] == 1
+    assert aws.calls["bedrock.converse"] == 1
+
+
+def test_concurrent_delivery_loses_the_conditional_claim(aws, srt_event, monkeypatch):
+    """Outra entrega grava o marcador entre a leitura do ledger e a escrita: esta vira duplicada."""
+    partition = summary._partition_by_idempotency
+
+    def racing_partition(store, *args):
+        pending, skipped = partition(store, *args)
+        for _, idempotency_key, _ in pending:
+            store.put(idempotency_key, {"status": "in_progress", "expires_at": 4102444800})
+        return pending, skipped
+
+    monkeypatch.setattr(summary, "_partition_by_idempotency", racing_partition)
+    result = summary.lambda_handler(srt_event, FakeLambdaContext())
+
+    assert result["status"] == "skipped_duplicate"
+    assert aws.calls["bedrock.converse"] == 0
+
+
+def test_new_prompt_is_not_a_duplicate(aws, srt_event):
+    summary.lambda_handler(srt_event, FakeLambdaContext())
+    aws.s3.put_object(Bucket=BUCKET, Key="model/prompts/Talk.txt", Body="Resuma em tópicos.".encode("utf-8"))
+
+    result = summary.lambda_handler(srt_event, FakeLambdaContext())
+
+    assert result["status"] == "summary_created"
+    assert aws.calls["bedrock.converse"] == 2
+
+
+def test_expired_lease_is_reclaimed():
+    store = LocalIdempotencyStore()
+    store.put("chave", {"status": "in_progress", "expires_at": 0})
+
+    record, version = store.get_versioned("chave")
+
+    assert summary.check_idempotency(store, "chave") is None
+    assert store.claim("chave", {"status": "in_progress", "expires_at": 4102444800}, version)
+    assert not store.claim("chave", {"status": "in_progress"}, version)
+
+
+def test_canonical_srt_is_not_rewritten_after_summarizing(aws, srt_event):
+    """Regravar model/transcribe/*.srt dispararia a Lambda de novo: os modelos vão só para o manifesto."""
+    before = aws.s3.head_object(Bucket=BUCKET, Key=SRT_KEY)
+
+    summary.lambda_handler(srt_event, FakeLambdaContext())
+
+    assert aws.s3.head_object(Bucket=BUCKET, Key=SRT_KEY) == before
+    manifest = aws.s3.get_object(Bucket=BUCKET, Key="model/manifest/Talk.json")["Body"].read().decode("utf-8")
+    assert summary.MODEL_ID in manifest
+
+
+def test_duplicate_is_detected_from_the_event_etag_without_reading_the_srt(aws, monkeypatch):
+    aws.s3.put_object(Bucket=BUCKET, Key=SRT_KEY, Body=generate_srt(3).encode("utf-8"))
+    event = s3_object_created_event(BUCKET, SRT_KEY, aws.s3.head_object(Bucket=BUCKET, Key=SRT_KEY)["ETag"])
+    summary.lambda_handler(event, FakeLambdaContext())
+    get_object, read_keys = aws.s3.get_object, []
+
+    def tracking_get_object(Bucket, Key, **kwargs):
+        read_keys.append(Key)
+        return get_object(Bucket=Bucket, Key=Key, **kwargs)
+
+    monkeypatch.setattr(aws.s3, "get_object", tracking_get_object)
+    result = summary.lambda_handler(event, FakeLambdaContext())
+
+    assert result["status"] == "skipped_duplicate"
+    # Nem a legenda nem a transcrição limpa (.transcript.json.gz) são lidas
+    assert not [key for key in read_keys if key.startswith("model/transcribe/")]
@@ -0,0 +1,51 @@
+import json
+
+from pipeline_manifest import PipelineManifest, update_json_object
+
+from conftest import BUCKET
+
+KEY = "model/manifest/Talk.json"
+
+
+def _read(aws, key: str) -> dict:
+    return json.loads(aws.s3.get_object(Bucket=BUCKET, Key=key)["Body"].read())
+
+
+def test_conflicting_write_is_retried_on_the_fresh_document(aws):
+    """Outra Lambda grava entre a leitura e a escrita: a mudança dela não se perde."""
+    attempts = []
+
+    def add_haiku(doc):
+        attempts.append(dict(doc))
+        if len(attempts) == 1:
+            aws.s3.put_object(Bucket=BUCKET, Key=KEY, Body=json.dumps({"summaries": {"Novalt": 1}}).encode("utf-8"))
+        doc.setdefault("summaries", {})["haiku45"] = 1
+
+    update_json_object(aws.s3, BUCKET, KEY, add_haiku)
+
+    assert len(attempts) == 2
+    assert _read(aws, KEY)["summaries"] == {"Novalt": 1, "haiku45": 1}
+
+
+def test_unchanged_document_is_not_written(aws):
+    update_json_object(aws.s3, BUCKET, KEY, lambda doc: doc.update(a=1))
+    aws.counter.reset()
+
+    update_json_object(aws.s3, BUCKET, KEY, lambda doc: False)
+
+    assert aws.calls["s3.put_object"] == 0
+
+
+def test_update_propagates_to_catalog_and_remove_object_forgets_it(aws):
+    manifests = PipelineManifest(aws.s3, BUCKET)
+    summary_key = "model/resumo/Talk-Novalt.md"
+
+    def add_summary(manifest):
+        manifest["summaries"]["Novalt"] = {"key": summary_key, "status": "created"}
+
+    manifests.update("Talk", add_summary)
+    assert _read(aws, manifests.catalog_key)["videos"]["Talk"]["summaries"] == {"Novalt": summary_key}
+
+    assert manifests.remove_object(summary_key) == "Talk"
+    assert _read(aws, manifests.catalog_key)["videos"]["Talk"]["summaries"] == {}
+    assert _read(aws, KEY)["summaries"] == {}
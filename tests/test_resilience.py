@@ -0,0 +1,66 @@
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+from resilience import CircuitBreaker
+
+from conftest import summary
+
+NOVA_LITE = "amazon.nova-lite-v1:0"
+NOVA_MICRO = "amazon.nova-micro-v1:0"
+
+
+def _throttle_first_target(aws, monkeypatch):
+    converse, targets = aws.bedrock.converse, []
+
+    def flaky_converse(modelId, **kwargs):
+        targets.append(modelId)
+        if modelId == NOVA_LITE:
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "lento"}}, "Converse")
+        return converse(modelId=modelId, **kwargs)
+
+    monkeypatch.setattr(aws.bedrock, "converse", flaky_converse)
+    return targets
+
+
+def test_backoff_past_the_deadline_moves_to_the_next_target(aws, monkeypatch):
+    targets = _throttle_first_target(aws, monkeypatch)
+    monkeypatch.setattr(summary, "_backoff_delay", lambda attempt: 30.0)
+    deadline = time.time() + summary.BEDROCK_DEADLINE_RESERVE_SECONDS + 5
+
+    text, _ = summary._invoke_model("texto", "regras", {"id": NOVA_LITE, "fallback": [NOVA_MICRO]}, deadline=deadline)
+
+    assert text.startswith("# Resumo")
+    assert targets == [NOVA_LITE, NOVA_MICRO]
+
+
+def test_no_time_left_raises_timeout_without_calling_the_model(aws):
+    deadline = time.time() + summary.BEDROCK_DEADLINE_RESERVE_SECONDS - 1
+
+    with pytest.raises(TimeoutError):
+        summary._invoke_model("texto", "regras", {"id": NOVA_LITE}, deadline=deadline)
+    assert aws.calls["bedrock.converse"] == 0
+
+
+def test_half_open_circuit_lets_a_single_probe_through():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.01)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.02)
+
+    assert breaker.allow()
+    assert not breaker.allow()  # segunda thread enquanto a sonda está em curso
+
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert not breaker.allow()
@@ -0,0 +1,56 @@
+from conftest import summary
+
+NOVA_LITE = "amazon.nova-lite-v1:0"
+NOVA_2_LITE = "amazon.nova-2-lite-v1:0"
+CANDIDATES = ["anthropic.claude-haiku-4-5-20251001-v1:0", NOVA_LITE, NOVA_2_LITE]
+
+
+def test_routing_varies_with_transcript_length():
+    assert summary.select_model_for_transcript(5_000, candidates=CANDIDATES) == NOVA_LITE
+    assert summary.select_model_for_transcript(400_000, candidates=CANDIDATES) == NOVA_2_LITE
+
+
+def test_routing_falls_back_to_fastest_when_nothing_fits():
+    assert summary.select_model_for_transcript(5_000_000, candidates=CANDIDATES) == NOVA_LITE
+
+
+def test_only_auto_configs_are_routed():
+    pinned = {"id": "deepseek.r1-v1:0", "temperature": 0.3}
+    routed = summary.route_model_configs([{"id": NOVA_LITE, "auto": True}, pinned], 400_000)
+
+    assert routed[0]["id"] == NOVA_2_LITE
+    assert routed[0]["routed"] is True and "auto" not in routed[0]
+    assert routed[1] == pinned
+
+
+def test_default_config_keeps_bedrock_model_id_unless_routing_is_enabled(monkeypatch):
+    assert summary._default_model_config()["id"] == summary.MODEL_ID
+    assert "auto" not in summary._default_model_config()
+
+    monkeypatch.setattr(summary, "MODEL_ROUTING", True)
+    assert summary._default_model_config()["auto"] is True
+
+
+def test_max_tokens_scales_only_for_routed_configs():
+    pinned = summary.get_max_output_tokens(NOVA_LITE, {"id": NOVA_LITE}, 40_000)
+    routed = summary.get_max_output_tokens(NOVA_LITE, {"id": NOVA_LITE, "routed": True}, 40_000)
+    explicit = summary.get_max_output_tokens(NOVA_LITE, {"id": NOVA_LITE, "maxTokens": 3000, "routed": True}, 40_000)
+
+    assert pinned == summary.SUMMARY_OUTPUT_MIN_TOKENS
+    assert routed == min(int(40_000 * summary.SUMMARY_OUTPUT_RATIO), summary.SUMMARY_OUTPUT_MAX_TOKENS)
+    assert explicit == 3000
+
+
+def test_registry_slugs_are_unique():
+    specs = {spec["id"]: spec for spec in summary._MODEL_REGISTRY.values()}
+    slugs = [spec["slug"] for spec in specs.values()]
+
+    assert all(slugs)
+    assert len(set(slugs)) == len(slugs)
+
+
+def test_region_prefixed_ids_share_the_base_model_slug():
+    assert summary.get_model_slug("anthropic.claude-haiku-4-5-20251001-v1:0") == "haiku45"
+    assert summary.get_model_slug("us.anthropic.claude-haiku-4-5-20251001-v1:0") == "haiku45"
+    assert summary.get_model_slug("us.amazon.nova-2-lite-v1:0") == "Nova2lt"
+    assert summary.get_model_slug("us.meta.llama3-70b-instruct-v1:0") == "us-meta"
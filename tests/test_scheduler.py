@@ -0,0 +1,74 @@
+from conftest import BUCKET, transcribe
+
+
+def _request(base_name: str, video_etag: str = "etag") -> dict:
+    return {"bucket": BUCKET, "key": f"model/video/{base_name}.mp4", "base_name": base_name, "video_etag": video_etag}
+
+
+def _fill(aws, jobs: int):
+    for i in range(jobs):
+        aws.transcribe.jobs[f"meetup-outro-{i}-1763239925"] = "IN_PROGRESS"
+
+
+def test_starts_job_when_below_ceiling(aws):
+    result = transcribe.TranscribeScheduler(transcribe.LocalJobQueue(), max_concurrent=2).submit(_request("a"))
+
+    assert result["status"] == "started"
+    assert aws.calls["transcribe.start_transcription_job"] == 1
+
+
+def test_queues_above_ceiling_and_drains_in_fifo_order(aws):
+    queue = transcribe.LocalJobQueue()
+    _fill(aws, 2)
+    for base_name in ("a", "b", "c"):
+        assert transcribe.TranscribeScheduler(queue, max_concurrent=2).submit(_request(base_name))["status"] == "queued"
+
+    aws.transcribe.complete("meetup-outro-0-1763239925")
+    drained = transcribe.TranscribeScheduler(queue, max_concurrent=2).drain()
+
+    assert drained["started_keys"] == ["model/video/a.mp4"]
+    assert queue.depth() == 2
+
+
+def test_video_with_job_in_flight_is_not_started_twice(aws):
+    aws.transcribe.jobs["meetup-a-1763239925"] = "IN_PROGRESS"
+
+    result = transcribe.TranscribeScheduler(transcribe.LocalJobQueue(), max_concurrent=5).submit(_request("a"))
+
+    assert result["status"] == "duplicate"
+    assert aws.calls["transcribe.start_transcription_job"] == 0
+
+
+def test_limit_exceeded_keeps_request_queued(aws):
+    aws.transcribe.max_concurrent = 0
+    queue = transcribe.LocalJobQueue()
+
+    result = transcribe.TranscribeScheduler(queue, max_concurrent=5).submit(_request("a"))
+
+    assert result["status"] == "queued"
+    assert queue.depth() == 1
+
+
+def test_reupload_with_new_etag_waits_for_the_running_job(aws):
+    queue = transcribe.LocalJobQueue()
+    job_name = "meetup-a-1763239925"
+    aws.transcribe.jobs[job_name] = "IN_PROGRESS"
+    aws.transcribe.tags[job_name] = [{"Key": transcribe.VIDEO_ETAG_TAG, "Value": "v1"}]
+
+    result = transcribe.TranscribeScheduler(queue, max_concurrent=5).submit(_request("a", "v2"))
+    assert result["status"] == "queued"
+    assert transcribe.TranscribeScheduler(queue, max_concurrent=5).submit(_request("a", "v1"))["status"] == "duplicate"
+
+    aws.transcribe.complete(job_name)
+    assert transcribe.TranscribeScheduler(queue, max_concurrent=5).drain()["started_keys"] == ["model/video/a.mp4"]
+    assert queue.depth() == 0
+
+
+def test_long_base_names_keep_the_timestamp_and_still_dedupe(aws):
+    base_name = "palestra-" + "x" * 250
+    scheduler = transcribe.TranscribeScheduler(transcribe.LocalJobQueue(), max_concurrent=5)
+    scheduler.submit(_request(base_name))
+    (job_name,) = aws.transcribe.jobs
+
+    assert len(job_name) <= 200 and job_name.rsplit("-", 1)[1].isdigit()
+    assert transcribe.TranscribeScheduler(transcribe.LocalJobQueue(), max_concurrent=5).submit(_request(base_name))["status"] == "duplicate"
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+from search_index import build_search_index, encode_search_index, search
+from srt_parser import iter_srt_cues
+
+SRT = "\n".join([
+    "1", "00:00:01,000 --> 00:00:03,000", "Introdução ao pipeline serverless", "",
+    "2", "00:00:04,000 --> 00:00:06,000", "o Transcribe gera a legenda", "",
+    "3", "00:00:07,500 --> 00:00:09,000", "a Lambda chama o Bedrock e gera o resumo", "",
+])
+
+
+def _index():
+    return build_search_index(list(iter_srt_cues(SRT.splitlines())), "model/transcribe/Talk.srt")
+
+
+def test_search_folds_accents_and_returns_cue_start_times():
+    assert search(_index(), "introducao") == [(0, 1000)]
+    assert search(_index(), "INTRODUÇÃO") == [(0, 1000)]
+
+
+def test_all_terms_must_match_and_last_term_is_a_prefix():
+    assert search(_index(), "gera") == [(1, 4000), (2, 7500)]
+    assert search(_index(), "gera bedr") == [(2, 7500)]
+    assert search(_index(), "transcribe bedrock") == []
+
+
+def test_stopwords_only_query_returns_nothing():
+    assert search(_index(), "a o e") == []
+
+
+def test_plain_text_without_timestamps_has_no_index():
+    cues = list(iter_srt_cues(["só texto", "sem tempos"]))
+
+    assert build_search_index(cues) is None
+
+
+def test_encoded_index_is_deterministic_gzip_json():
+    encoded = encode_search_index(_index())
+
+    assert encoded == encode_search_index(_index())
+    assert json.loads(gzip.decompress(encoded))["srt_key"] == "model/transcribe/Talk.srt"
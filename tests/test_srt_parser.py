@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from srt_parser import MODEL_HEADER_PREFIX, extract_plain_text_from_srt, parse_srt_stream
+from synthetic import generate_srt
+
+SRT = generate_srt(2)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+def test_stream_parse_matches_text_parse_for_any_chunk_size(chunk_size):
+    doc = parse_srt_stream(io.BytesIO(SRT.encode("utf-8")), chunk_size)
+
+    assert doc.plain_text() == extract_plain_text_from_srt(SRT)
+    assert doc.size == len(SRT.encode("utf-8"))
+    assert doc.cues[0].start_ms == 0 and doc.cues[0].end_ms > 0
+
+
+@pytest.mark.parametrize("chunk_size", [3, 4096])
+def test_model_header_is_excluded_from_the_digest(chunk_size):
+    plain = parse_srt_stream(io.BytesIO(SRT.encode("utf-8")), chunk_size)
+    header = f"{MODEL_HEADER_PREFIX} amazon.nova-lite-v1:0\n\n".encode("utf-8")
+    with_header = parse_srt_stream(io.BytesIO(header + SRT.encode("utf-8")), chunk_size)
+
+    assert with_header.digest == plain.digest
+    assert with_header.content_offset == len(header)
+    assert with_header.plain_text() == plain.plain_text()
+
+
+def test_document_does_not_keep_the_body():
+    doc = parse_srt_stream(io.BytesIO(SRT.encode("utf-8")))
+
+    assert not hasattr(doc, "body")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4096])
+def test_utf8_bom_does_not_turn_the_srt_into_plain_text(chunk_size):
+    plain = parse_srt_stream(io.BytesIO(SRT.encode("utf-8")), chunk_size)
+    with_bom = parse_srt_stream(io.BytesIO(SRT.encode("utf-8-sig")), chunk_size)
+
+    assert with_bom.plain_text() == plain.plain_text()
+    assert with_bom.cues[0].start_ms == 0
+    assert extract_plain_text_from_srt("\ufeff" + SRT) == extract_plain_text_from_srt(SRT)
@@ -0,0 +1,56 @@
+import time
+
+from fake_aws import FakeLambdaContext, s3_object_created_event
+from synthetic import generate_srt
+
+from conftest import BUCKET, summary
+
+
+def _put_cache_entries(aws, count: int, size: int):
+    for i in range(count):
+        aws.s3.put_object(Bucket=BUCKET, Key=f"{summary.SUMMARY_CACHE_PREFIX}{i}.md", Body=b"x" * size)
+        time.sleep(0.002)  # LastModified crescente: 0 é o mais antigo
+
+
+def _cache_keys(aws) -> list:
+    response = aws.s3.list_objects_v2(Bucket=BUCKET, Prefix=summary.SUMMARY_CACHE_PREFIX)
+    return sorted(obj["Key"].rsplit("/", 1)[-1] for obj in response.get("Contents", []))
+
+
+def test_eviction_removes_oldest_until_under_max_bytes(aws, monkeypatch):
+    monkeypatch.setattr(summary, "SUMMARY_CACHE_MAX_BYTES", 250)
+    _put_cache_entries(aws, 5, 100)
+
+    assert summary.evict_summary_cache(BUCKET) == 3
+    assert _cache_keys(aws) == ["3.md", "4.md"]
+
+
+def test_eviction_keeps_everything_under_the_limit(aws):
+    _put_cache_entries(aws, 3, 100)
+
+    assert summary.evict_summary_cache(BUCKET) == 0
+    assert aws.calls["s3.delete_objects"] == 0
+
+
+def test_eviction_runs_only_on_sampled_stores(aws, monkeypatch):
+    monkeypatch.setattr(summary, "SUMMARY_CACHE_EVICTION_SAMPLE_RATE", 0.0)
+    aws.s3.put_object(Bucket=BUCKET, Key="model/transcribe/Talk.srt", Body=generate_srt(2).encode("utf-8"))
+
+    result = summary.lambda_handler(s3_object_created_event(BUCKET, "model/transcribe/Talk.srt"), FakeLambdaContext())
+
+    assert result["summary_cache"]["evicted"] == 0
+    assert aws.calls["s3.list_objects_v2"] == 0
+
+
+def test_cached_summary_is_copied_without_calling_the_model(aws):
+    aws.s3.put_object(Bucket=BUCKET, Key="model/transcribe/Talk.srt", Body=generate_srt(2).encode("utf-8"))
+    event = s3_object_created_event(BUCKET, "model/transcribe/Talk.srt")
+    summary.lambda_handler(event, FakeLambdaContext())
+    ledger = aws.s3.list_objects_v2(Bucket=BUCKET, Prefix=summary.IDEMPOTENCY_PREFIX)["Contents"]
+    for item in ledger:
+        aws.s3.delete_object(Bucket=BUCKET, Key=item["Key"])
+
+    result = summary.lambda_handler(event, FakeLambdaContext())
+
+    assert result["summary_cache"]["hit"] is True
+    assert aws.calls["bedrock.converse"] == 1